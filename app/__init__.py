@@ -1,62 +1,73 @@
+"""
+TaskFlow application package.
+
+Importing it does no work: ``create_app`` builds the app, and the entry
+points (``main_app``, ``wsgi``, ``asgi``) call it once per process. Flask and
+the blueprints are imported by the factory, so scripts and worker hooks that
+only need a submodule do not pay for them.
+"""
+
 import os
 import logging
-from flask import Flask
-from flask_login import LoginManager
-import mongoengine
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 def create_app():
+    from flask import Flask
+    from flask_login import LoginManager
+    from app.json_provider import TaskFlowJSONProvider
+    from app.log_pipeline import init_logging
+
     app = Flask(__name__)
+    app.json = TaskFlowJSONProvider(app)
 
     # Configuration
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "your-super-secret-key-change-this")
     app.config["MONGODB_URI"] = os.getenv("MONGODB_URI")
+    app.config["TASKS_PAGE_SIZE"] = int(os.getenv("TASKS_PAGE_SIZE", 50))
+    app.config["TASKS_MAX_PAGE_SIZE"] = int(os.getenv("TASKS_MAX_PAGE_SIZE", 200))
+    app.config["TASKS_BULK_MAX_ITEMS"] = int(os.getenv("TASKS_BULK_MAX_ITEMS", 500))
+    app.config["TASKS_IMPORT_BATCH_SIZE"] = int(os.getenv("TASKS_IMPORT_BATCH_SIZE", 500))
+    app.config["TASKS_IMPORT_WORKERS"] = int(os.getenv("TASKS_IMPORT_WORKERS", 0))
+    app.config["USER_CACHE_SIZE"] = int(os.getenv("USER_CACHE_SIZE", 1024))
+    app.config["USER_CACHE_TTL"] = float(os.getenv("USER_CACHE_TTL", 60))
+    app.config["API_KEY_CACHE_SIZE"] = int(os.getenv("API_KEY_CACHE_SIZE", 1024))
+    app.config["API_KEY_CACHE_TTL"] = float(os.getenv("API_KEY_CACHE_TTL", 30))
+    app.config["CACHE_BACKEND"] = os.getenv("CACHE_BACKEND", "null")
+    app.config["CACHE_DEFAULT_TTL"] = int(os.getenv("CACHE_DEFAULT_TTL", 30))
+    app.config["CACHE_SIZE"] = int(os.getenv("CACHE_SIZE", 2048))
+    app.config["REDIS_URL"] = os.getenv("REDIS_URL")
+    app.config["METRICS_DIR"] = os.getenv("METRICS_DIR")
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+    app.config["SWAGGER_ENABLED"] = os.getenv("SWAGGER_ENABLED", "true").lower() == "true"
+    app.config["LOG_FILE"] = os.getenv("LOG_FILE")
+    app.config["LOG_QUEUE_SIZE"] = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    app.config["LOG_BATCH_SIZE"] = int(os.getenv("LOG_BATCH_SIZE", 100))
+    app.config["LOG_REQUEST_SAMPLE_RATE"] = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", 1.0))
+
+    # Logging through a queue and a writer thread (see app.log_pipeline)
+    init_logging(app, log_file=app.config["LOG_FILE"])
 
     # Initialize extensions
     login_manager = LoginManager()
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
 
-    # MongoDB connection with Azure-optimized parameters and retry logic
-    if app.config["MONGODB_URI"]:
-        import time
-        from mongoengine.connection import get_db
-
-        # Optimize connection string for Azure App Service
-        connection_string = app.config["MONGODB_URI"]
-        if "?" in connection_string:
-            connection_string += (
-                "&maxPoolSize=20&minPoolSize=5&maxIdleTimeMS=60000&serverSelectionTimeoutMS=30000&connectTimeoutMS=10000"
-            )
-        else:
-            connection_string += (
-                "?maxPoolSize=20&minPoolSize=5&maxIdleTimeMS=60000&serverSelectionTimeoutMS=30000&connectTimeoutMS=10000"
-            )
-        # Implement connection retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                mongoengine.connect(
-                    host=connection_string,
-                    serverSelectionTimeoutMS=30000,
-                    connectTimeoutMS=30000,
-                    socketTimeoutMS=30000,
-                )
-                logger.info(f"MongoDB connection established on attempt {attempt + 1}")
-                break
-            except Exception as e:
-                logger.error(f"MongoDB connection attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    logger.error(f"Failed to connect to MongoDB after {max_retries} attempts")
-                    logger.info("MongoDB connection skipped - continuing without database")
-                else:
-                    time.sleep(2**attempt)  # Exponential backoff
-    else:
-        logger.info("MongoDB connection skipped - no URI provided")
+    # Prometheus request metrics, first so that request timing covers the other hooks
+    from app.prometheus import init_prometheus
+
+    init_prometheus(app)
+
+    # MongoDB: registered here, connected lazily in each process (see app.db)
+    from app.db import init_db
+
+    init_db(app)
+
+    # Response/data cache backend
+    from app.cache import init_cache
+
+    init_cache(app)
 
     # Import and register blueprints
     try:
@@ -73,38 +84,49 @@ def create_app():
     except Exception as e:
         logger.error(f"Error registering blueprints: {e}")
 
-    # Initialize Swagger API
-    try:
-        from app.routes.swagger_api import init_app as init_swagger
+    # Monitoring dashboard (/monitoring) and the per-worker metrics it reads
+    from app.dashboard_monitoring import init_monitoring_dashboard
 
-        init_swagger(app)
-        logger.info("Swagger API initialized")
-    except Exception as e:
-        logger.error(f"Error initializing Swagger: {e}")
+    init_monitoring_dashboard(app)
 
-    # User loader for Flask-Login
+    # Initialize Swagger API; flask_restx is the slowest import at start-up
+    if app.config["SWAGGER_ENABLED"]:
+        try:
+            from app.routes.swagger_api import init_app as init_swagger
+
+            init_swagger(app)
+            logger.info("Swagger API initialized")
+        except Exception as e:
+            logger.error(f"Error initializing Swagger: {e}")
+
+    # Register CLI commands
+    from app.commands import register_commands
+
+    register_commands(app)
+
+    # User loader for Flask-Login, backed by a per-worker cache
     try:
-        from app.models import User
-        from bson import ObjectId
+        from app.user_cache import configure_user_cache, load_user as load_cached_user
+
+        configure_user_cache(app.config["USER_CACHE_SIZE"], app.config["USER_CACHE_TTL"])
 
         @login_manager.user_loader
         def load_user(user_id):
             try:
-                return User.objects(id=ObjectId(user_id)).first()
-            except:
+                return load_cached_user(user_id)
+            except Exception as e:
+                logger.error(f"Error loading user {user_id}: {e}")
                 return None
 
+        # Requests without a session may authenticate with an X-API-KEY header
+        from app.api_keys import configure_api_key_cache, load_user_from_request
+
+        configure_api_key_cache(app.config["API_KEY_CACHE_SIZE"], app.config["API_KEY_CACHE_TTL"])
+        login_manager.request_loader(load_user_from_request)
+
         logger.info("User loader configured")
     except Exception as e:
         logger.error(f"Error configuring user loader: {e}")
 
     logger.info("TaskFlow application initialized successfully")
     return app
-
-
-# Create the application instance
-app = create_app()
-db = mongoengine
-
-if __name__ == "__main__":
-    app.run(debug=True)
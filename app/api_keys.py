@@ -0,0 +1,117 @@
+"""
+API keys for TaskFlow service integrations.
+
+A key is shown to its owner once, at creation; only its SHA-256 hash is
+stored. Keys are long random tokens, so a fast hash is enough: unlike
+passwords they cannot be guessed from a dictionary.
+
+Requests authenticate with an ``X-API-KEY`` header. Validated keys are kept
+in a per-worker LRU cache mapping the key hash to its owner's id, and the
+owner comes from the user cache, so the hot path sends no queries. Revoking
+a key evicts it in the worker that handled the revocation; other workers
+stop accepting it once their cache entry expires, so ``API_KEY_CACHE_TTL``
+bounds how long a revoked key keeps working.
+"""
+
+import hashlib
+import secrets
+
+from pymongo import ReturnDocument
+
+from app.lru_cache import TTLCache
+from app.models import ApiKey
+from app.task_store import to_object_id, utcnow
+from app.user_cache import load_user
+
+API_KEY_HEADER = "X-API-KEY"
+KEY_PREFIX = "tf_"
+API_KEY_CACHE_SIZE = 1024
+API_KEY_CACHE_TTL = 30
+
+api_key_cache = TTLCache(API_KEY_CACHE_SIZE, API_KEY_CACHE_TTL)
+
+KEY_PROJECTION = {"prefix": 1, "name": 1, "created_at": 1, "revoked_at": 1}
+
+
+def configure_api_key_cache(maxsize=API_KEY_CACHE_SIZE, ttl=API_KEY_CACHE_TTL):
+    api_key_cache.configure(maxsize, ttl)
+
+
+def generate_key():
+    return KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def hash_key(key):
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def key_from_doc(doc):
+    """Public view of a stored key; never includes the hash."""
+    return {
+        "id": str(doc["_id"]),
+        "name": doc.get("name"),
+        "prefix": doc.get("prefix"),
+        "created_at": doc["created_at"].isoformat() if doc.get("created_at") else None,
+        "revoked_at": doc["revoked_at"].isoformat() if doc.get("revoked_at") else None,
+    }
+
+
+def create_api_key(user_id, name=None):
+    """Create a key for ``user_id``; return ``(stored document, plaintext key)``."""
+    key = generate_key()
+    doc = {
+        "key_hash": hash_key(key),
+        "prefix": key[: len(KEY_PREFIX) + 6],
+        "name": name,
+        "user": user_id,
+        "created_at": utcnow(),
+        "revoked_at": None,
+    }
+    doc["_id"] = ApiKey._get_collection().insert_one(doc).inserted_id
+    return doc, key
+
+
+def list_api_keys(user_id):
+    """Return ``user_id``'s keys, newest first."""
+    return list(ApiKey._get_collection().find({"user": user_id}, KEY_PROJECTION).sort("created_at", -1))
+
+
+def revoke_api_key(user_id, key_id):
+    """Revoke one of ``user_id``'s keys; return its document, or None if it does not exist."""
+    oid = to_object_id(key_id)
+    if oid is None:
+        return None
+
+    doc = ApiKey._get_collection().find_one_and_update(
+        {"_id": oid, "user": user_id},
+        {"$set": {"revoked_at": utcnow()}},
+        projection=dict(KEY_PROJECTION, key_hash=1),
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is not None:
+        api_key_cache.invalidate(doc.pop("key_hash"))
+    return doc
+
+
+def authenticate_api_key(key):
+    """Return the CachedUser that owns an active ``key``, or None."""
+    if not key or not key.startswith(KEY_PREFIX):
+        return None
+
+    key_hash = hash_key(key)
+    user_id = api_key_cache.get(key_hash)
+    if user_id is None:
+        doc = ApiKey._get_collection().find_one({"key_hash": key_hash, "revoked_at": None}, {"user": 1})
+        if doc is None:
+            return None
+        user_id = str(doc["user"])
+        api_key_cache.set(key_hash, user_id)
+
+    # The owner comes from the user cache, so user changes and deletions
+    # apply to key-authenticated requests exactly as to session logins
+    return load_user(user_id)
+
+
+def load_user_from_request(request):
+    """Flask-Login ``request_loader`` for the ``X-API-KEY`` header."""
+    return authenticate_api_key(request.headers.get(API_KEY_HEADER))
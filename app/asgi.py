@@ -0,0 +1,325 @@
+"""
+ASGI entry point for TaskFlow.
+
+The task and dashboard endpoints of the JSON API are served by async
+handlers on motor (app.async_store), so one worker keeps serving other
+requests while it waits on MongoDB. Every other request, including any the
+async handlers cannot authenticate, is passed to the Flask app through a
+WSGI adapter, so pages, auth, exports, imports, bulk operations and Swagger
+work exactly as under gunicorn.
+
+Async requests still run inside a Flask request context: URL matching,
+argument parsing, the session cookie, Flask-Login checks, request hooks and
+response building are all Flask's. Only the I/O differs, so both modes
+return the same responses. The async handlers do not use the response cache
+(app.cache) but do retire its entries on writes.
+
+Requires motor, a2wsgi and an ASGI server::
+
+    uvicorn asgi:app
+"""
+
+import functools
+import io
+import logging
+
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import current_app, g, jsonify, make_response, request, request_started, session
+from flask_login import current_user
+from flask_login.config import COOKIE_NAME
+
+from app import async_store
+from app.api_keys import API_KEY_HEADER
+from app.conditional import is_not_modified, set_validators, user_validators
+from app.models import Task
+from app.pagination import parse_page_args
+from app.serializers import parse_fields, task_from_doc, task_from_model, task_projection, task_summary
+from app.task_store import validate_task_fields
+
+logger = logging.getLogger(__name__)
+
+VALID_STATUSES = ["To Do", "In Progress", "Completed"]
+
+
+def conditional_get(view):
+    """Async app.conditional.conditional_get."""
+
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        etag, last_modified = user_validators(current_user.id, await async_store.get_version(current_user.id))
+        if is_not_modified(etag, last_modified):
+            return set_validators(current_app.response_class(status=304), etag, last_modified)
+
+        response = make_response(await view(*args, **kwargs))
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+
+    return wrapper
+
+
+# Handlers for the app.routes.api endpoints of the same name
+
+
+@conditional_get
+async def get_tasks():
+    status_filter = request.args.get("status")
+
+    try:
+        limit, position = parse_page_args(request.args)
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = {"user": current_user.id}
+    if status_filter:
+        query["status"] = status_filter
+
+    docs, next_cursor = await async_store.paginate(query, limit, position, task_projection(fields))
+
+    return jsonify({"tasks": [task_from_doc(doc, fields) for doc in docs], "next_cursor": next_cursor}), 200
+
+
+async def create_task():
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    title = data.get("title")
+    description = data.get("description", "")
+    status = data.get("status", "To Do")
+
+    if not title:
+        return jsonify({"error": "Title is required"}), 400
+
+    if status not in VALID_STATUSES:
+        return jsonify({"error": "Invalid status"}), 400
+
+    task = Task(title=title, description=description, status=status, user=current_user.id)
+
+    try:
+        await async_store.insert_task(task)
+        await async_store.record_created(current_user.id, task.status)
+
+        return jsonify({"message": "Task created successfully", "task": task_from_model(task)}), 201
+    except Exception as e:
+        return jsonify({"error": "Failed to create task"}), 500
+
+
+@conditional_get
+async def get_task(task_id):
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    doc = await async_store.find_task(current_user.id, task_id, task_projection(fields))
+
+    if not doc:
+        return jsonify({"error": "Task not found"}), 404
+
+    return jsonify({"task": task_from_doc(doc, fields)}), 200
+
+
+async def update_task(task_id):
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    fields, error = validate_task_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        doc = await async_store.update_task_fields(current_user.id, task_id, fields)
+    except Exception as e:
+        return jsonify({"error": "Failed to update task"}), 500
+
+    if not doc:
+        return jsonify({"error": "Task not found"}), 404
+
+    return jsonify({"message": "Task updated successfully", "task": task_from_doc(doc)}), 200
+
+
+async def delete_task(task_id):
+    try:
+        doc = await async_store.delete_task_doc(current_user.id, task_id)
+    except Exception as e:
+        return jsonify({"error": "Failed to delete task"}), 500
+
+    if not doc:
+        return jsonify({"error": "Task not found"}), 404
+
+    return jsonify({"message": "Task deleted successfully"}), 200
+
+
+async def update_task_status(task_id):
+    data = request.get_json()
+
+    if not data or "status" not in data:
+        return jsonify({"error": "Status is required"}), 400
+
+    if data["status"] not in VALID_STATUSES:
+        return jsonify({"error": "Invalid status"}), 400
+
+    try:
+        doc = await async_store.update_task_fields(current_user.id, task_id, {"status": data["status"]})
+    except Exception as e:
+        return jsonify({"error": "Failed to update task status"}), 500
+
+    if not doc:
+        return jsonify({"error": "Task not found"}), 404
+
+    return jsonify({"message": "Task status updated successfully", "task": task_from_doc(doc)}), 200
+
+
+@conditional_get
+async def get_dashboard():
+    stats, recent_tasks = await async_store.get_dashboard_stats(current_user.id)
+
+    return jsonify({"stats": stats, "recent_tasks": [task_summary(task) for task in recent_tasks]}), 200
+
+
+# Flask endpoint -> async handler; every other endpoint is served by Flask
+ASYNC_VIEWS = {
+    "api.get_tasks": get_tasks,
+    "api.create_task": create_task,
+    "api.get_task": get_task,
+    "api.update_task": update_task,
+    "api.delete_task": delete_task,
+    "api.update_task_status": update_task_status,
+    "api.get_dashboard": get_dashboard,
+}
+
+
+async def authenticate():
+    """Async Flask-Login user loading for the session cookie and ``X-API-KEY``.
+
+    Returns None whenever Flask-Login would do more than load the user (remember
+    cookies, disabled logins, session protection failures) or finds no user; the
+    request then goes to Flask, which answers it exactly as it would under WSGI.
+    """
+    app = current_app._get_current_object()
+    if app.config.get("LOGIN_DISABLED") or "_remember" in session:
+        return None
+    if app.login_manager._session_protection_failed():
+        return None
+
+    user_id = session.get("_user_id")
+    if user_id is not None:
+        return await async_store.load_user(user_id)
+
+    if app.config.get("REMEMBER_COOKIE_NAME", COOKIE_NAME) in request.cookies:
+        return None
+    return await async_store.authenticate_api_key(request.headers.get(API_KEY_HEADER))
+
+
+class TaskFlowASGI:
+    """ASGI app serving ``ASYNC_VIEWS`` itself and everything else through Flask."""
+
+    def __init__(self, flask_app, wsgi_workers=10):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_workers)
+        async_store.configure(flask_app.config.get("MONGODB_URI"))
+        if not async_store.is_configured():
+            logger.warning("MONGODB_URI is not set; all requests will be served by Flask")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http" and async_store.is_configured() and scope["method"] not in ("HEAD", "OPTIONS"):
+            await self.handle(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                async_store.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle(self, scope, receive, send):
+        app = self.flask_app
+        environ = build_environ(scope, io.BytesIO())
+        # Pushing the context matches the URL against Flask's routes; the context
+        # lives in this request's task, so it stays put across awaits
+        ctx = app.request_context(environ)
+        ctx.push()
+        try:
+            view = None if request.routing_exception else ASYNC_VIEWS.get(request.endpoint)
+            user = await authenticate() if view else None
+        except BaseException:
+            ctx.pop()
+            raise
+        if user is None:
+            ctx.pop()
+            return await self.wsgi(scope, receive, send)
+
+        error = None
+        try:
+            # The body has not been read yet, so it can still be swapped in
+            environ["wsgi.input"] = io.BytesIO(await read_body(receive))
+            environ["wsgi.input_terminated"] = True
+            g._login_user = user
+            try:
+                response = await self.dispatch(view)
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            await send_response(response, environ, send)
+        finally:
+            ctx.pop(error)
+
+    async def dispatch(self, view):
+        """Flask's ``full_dispatch_request`` around an async view."""
+        app = self.flask_app
+        try:
+            request_started.send(app, _async_wrapper=app.ensure_sync)
+            rv = app.preprocess_request()
+            if rv is None:
+                rv = await view(**request.view_args)
+        except Exception as e:
+            rv = app.handle_user_exception(e)
+        return app.finalize_request(rv)
+
+
+async def read_body(receive):
+    body = []
+    while True:
+        message = await receive()
+        body.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(body)
+
+
+async def send_response(response, environ, send):
+    app_iter, status, headers = response.get_wsgi_response(environ)
+    try:
+        body = b"".join(app_iter)
+    finally:
+        if hasattr(app_iter, "close"):
+            app_iter.close()
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": int(status.split(" ", 1)[0]),
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(flask_app=None):
+    if flask_app is None:
+        from app import create_app
+
+        flask_app = create_app()
+    return TaskFlowASGI(flask_app)
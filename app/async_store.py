@@ -0,0 +1,239 @@
+"""
+Async (motor) data access for the ASGI entry point (app.asgi).
+
+These are the awaitable counterparts of the task, counter, dashboard and
+login lookups the JSON API makes. Filters, projections, sort orders and
+counter updates come from the sync modules (app.pagination, app.task_store,
+app.counters, app.stats), so both entry points read and write the same
+documents, and logins share the per-worker user and API key caches.
+
+motor is only imported when the client is first used, so the Flask app runs
+without it.
+"""
+
+import asyncio
+
+from bson import ObjectId
+from mongoengine.connection import DEFAULT_DATABASE_NAME
+from pymongo import ReturnDocument
+
+from app.api_keys import KEY_PREFIX, api_key_cache, hash_key
+from app.cache import bump_user_generation, get_cache
+from app.counters import (
+    COUNTER_FIELDS,
+    VERSION_FIELDS,
+    count_by_status_pipeline,
+    counts_from_rows,
+    counts_to_counters,
+    delta_update,
+    reseed_update,
+    seed_update,
+    status_change_delta,
+    status_delta,
+)
+from app.db import mongo_connection_string
+from app.models import ApiKey, Task, TaskCounter, User
+from app.pagination import SORT, page_query, split_page
+from app.serializers import TASK_PROJECTION
+from app.stats import RECENT_TASK_PROJECTION, RECENT_TASKS_LIMIT, build_dashboard_pipeline, recent_task_from_doc
+from app.task_store import to_object_id, utcnow
+from app.user_cache import USER_FIELDS, CachedUser, user_cache
+
+_uri = None
+_client = None
+
+
+def configure(uri):
+    """Set the MongoDB URI; the client is created on first use, inside the running event loop."""
+    global _uri
+    _uri = uri
+
+
+def is_configured():
+    return _uri is not None
+
+
+def close():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def _collection(model):
+    global _client
+    if _client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        _client = AsyncIOMotorClient(mongo_connection_string(_uri))
+    return _client.get_default_database(DEFAULT_DATABASE_NAME)[model._get_collection_name()]
+
+
+# Logins
+
+
+async def load_user(user_id):
+    """Async app.user_cache.load_user: a CachedUser, or None if the user is gone."""
+    if not ObjectId.is_valid(user_id):
+        return None
+    oid = ObjectId(user_id)
+
+    user = user_cache.get(oid)
+    if user is None:
+        doc = await _collection(User).find_one({"_id": oid}, {field: 1 for field in USER_FIELDS})
+        if doc is None:
+            return None
+        user = CachedUser.from_doc(doc)
+        user_cache.set(oid, user)
+    return user
+
+
+async def authenticate_api_key(key):
+    """Async app.api_keys.authenticate_api_key."""
+    if not key or not key.startswith(KEY_PREFIX):
+        return None
+
+    key_hash = hash_key(key)
+    user_id = api_key_cache.get(key_hash)
+    if user_id is None:
+        doc = await _collection(ApiKey).find_one({"key_hash": key_hash, "revoked_at": None}, {"user": 1})
+        if doc is None:
+            return None
+        user_id = str(doc["user"])
+        api_key_cache.set(key_hash, user_id)
+
+    return await load_user(user_id)
+
+
+# Counters
+
+
+async def apply_delta(user_id, delta):
+    """Async app.counters.apply_delta."""
+    await _collection(TaskCounter).update_one({"_id": user_id}, delta_update(delta))
+    if get_cache().enabled:
+        # The cache backend is synchronous; keep Redis round trips off the event loop
+        await asyncio.to_thread(bump_user_generation, user_id)
+
+
+async def record_created(user_id, status):
+    await apply_delta(user_id, status_delta(status, 1))
+
+
+async def record_deleted(user_id, status):
+    await apply_delta(user_id, status_delta(status, -1))
+
+
+async def get_counters(user_id, fields=COUNTER_FIELDS):
+    return await _collection(TaskCounter).find_one({"_id": user_id}, {field: 1 for field in fields})
+
+
+async def count_by_status(user_id):
+    rows = await _collection(Task).aggregate(count_by_status_pipeline({"user": user_id})).to_list(None)
+    return counts_from_rows(rows).get(user_id, {})
+
+
+async def seed_counters(user_id, counts):
+    """Async app.counters.seed_counters, including its recount after creating the counters."""
+    result = await _collection(TaskCounter).update_one({"_id": user_id}, seed_update(counts), upsert=True)
+    if result.upserted_id is None:
+        return counts
+
+    counts = await count_by_status(user_id)
+    await _collection(TaskCounter).update_one({"_id": user_id}, reseed_update(counts))
+    return counts
+
+
+async def get_version(user_id):
+    """Async app.counters.get_version."""
+    doc = await get_counters(user_id, VERSION_FIELDS)
+    if doc is None:
+        await seed_counters(user_id, await count_by_status(user_id))
+        doc = await get_counters(user_id, VERSION_FIELDS)
+    return doc
+
+
+# Tasks
+
+
+async def paginate(query, limit, position=None, projection=None):
+    """Async app.pagination.paginate."""
+    query, projection = page_query(query, position, projection)
+    docs = await _collection(Task).find(query, projection).sort(SORT).limit(limit + 1).to_list(limit + 1)
+    return split_page(docs, limit)
+
+
+async def find_task(user_id, task_id, projection=None):
+    """Async app.task_store.find_task."""
+    oid = to_object_id(task_id)
+    if oid is None:
+        return None
+    return await _collection(Task).find_one({"_id": oid, "user": user_id}, projection)
+
+
+async def insert_task(task):
+    """Validate and insert a new mongoengine Task, setting its id.
+
+    Raises mongoengine's ValidationError like ``Task.save()`` does.
+    """
+    task.validate()
+    result = await _collection(Task).insert_one(task.to_mongo())
+    task.id = result.inserted_id
+    return task
+
+
+async def update_task_fields(user_id, task_id, fields):
+    """Async app.task_store.update_task_fields."""
+    oid = to_object_id(task_id)
+    if oid is None:
+        return None
+
+    changes = dict(fields, updated_at=utcnow())
+    before = await _collection(Task).find_one_and_update(
+        {"_id": oid, "user": user_id},
+        {"$set": changes},
+        projection=TASK_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None
+
+    await apply_delta(user_id, status_change_delta(before.get("status"), changes.get("status", before.get("status"))))
+    return dict(before, **changes)
+
+
+async def delete_task_doc(user_id, task_id):
+    """Async app.task_store.delete_task_doc."""
+    oid = to_object_id(task_id)
+    if oid is None:
+        return None
+
+    doc = await _collection(Task).find_one_and_delete({"_id": oid, "user": user_id}, projection={"status": 1})
+    if doc is not None:
+        await record_deleted(user_id, doc.get("status"))
+    return doc
+
+
+# Dashboard
+
+
+async def get_dashboard_stats(user_id, recent_limit=RECENT_TASKS_LIMIT):
+    """Async app.stats.get_dashboard_stats, without the data cache."""
+    counters = await get_counters(user_id)
+
+    if counters is None:
+        rows = await _collection(Task).aggregate(build_dashboard_pipeline(user_id, recent_limit)).to_list(1)
+        result = rows[0] if rows else {"counts": [], "recent": []}
+        counts = {row["_id"]: row["count"] for row in result["counts"]}
+        stats, recent = counts_to_counters(await seed_counters(user_id, counts)), result["recent"]
+    else:
+        stats = {field: counters.get(field, 0) for field in COUNTER_FIELDS}
+        recent = (
+            await _collection(Task)
+            .find({"user": user_id}, RECENT_TASK_PROJECTION)
+            .sort("created_at", -1)
+            .limit(recent_limit)
+            .to_list(recent_limit)
+        )
+
+    return stats, [recent_task_from_doc(doc) for doc in recent]
@@ -0,0 +1,288 @@
+"""
+Response and data caching for TaskFlow.
+
+``CACHE_BACKEND`` selects where entries live:
+
+* ``null`` (default): nothing is cached.
+* ``memory``: a per-worker LRU with a TTL.
+* ``redis``: shared by all workers, at ``REDIS_URL``.
+
+Entries scoped to a user are keyed by that user's cache generation, an
+opaque token replaced on every task write (app.counters.apply_delta). Entries
+from older generations are never read again and simply age out. With the
+memory backend each worker has its own generations, so another worker's
+writes only show up once entries expire. Use redis when running more than
+one worker, or keep ``CACHE_DEFAULT_TTL`` short.
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+
+import functools
+import hashlib
+import logging
+import pickle
+import uuid
+
+from flask import current_app, g, has_app_context, make_response, request
+from flask_login import current_user
+
+from app.lru_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+DEFAULT_TTL = 30
+DEFAULT_SIZE = 2048
+# Generations outlive the entries keyed by them; losing one only costs misses
+GENERATION_TTL = 24 * 60 * 60
+KEY_PREFIX = "taskflow:"
+
+
+class NullCache:
+    """Caches nothing."""
+
+    name = "null"
+    enabled = False
+
+    def get(self, key):
+        return MISSING
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def add(self, key, value, ttl=None):
+        return False
+
+    def stats(self):
+        return {"backend": self.name}
+
+
+class MemoryCache:
+    """Per-worker LRU cache with a TTL."""
+
+    name = "memory"
+    enabled = True
+
+    def __init__(self, maxsize=DEFAULT_SIZE, ttl=DEFAULT_TTL):
+        self.entries = TTLCache(maxsize, ttl)
+
+    def get(self, key):
+        return self.entries.get(key, MISSING)
+
+    def set(self, key, value, ttl=None):
+        self.entries.set(key, value, ttl)
+
+    def delete(self, key):
+        self.entries.invalidate(key)
+
+    def add(self, key, value, ttl=None):
+        return self.entries.add(key, value, ttl)
+
+    def stats(self):
+        return dict(self.entries.stats(), backend=self.name)
+
+
+class RedisCache:
+    """Cache shared by all workers. Values are pickled.
+
+    Redis errors are logged and treated as misses, so an unavailable Redis
+    slows requests down instead of failing them.
+    """
+
+    name = "redis"
+    enabled = True
+
+    def __init__(self, client, ttl=DEFAULT_TTL):
+        self.client = client
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url, ttl=DEFAULT_TTL):
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5), ttl)
+
+    def _error(self, operation, error):
+        self.errors += 1
+        logger.warning(f"Redis cache {operation} failed: {error}")
+
+    def get(self, key):
+        try:
+            data = self.client.get(key)
+            value = MISSING if data is None else pickle.loads(data)
+        except Exception as e:
+            self._error("get", e)
+            return MISSING
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ex=int(self.ttl if ttl is None else ttl))
+        except Exception as e:
+            self._error("set", e)
+
+    def delete(self, key):
+        try:
+            self.client.delete(key)
+        except Exception as e:
+            self._error("delete", e)
+
+    def add(self, key, value, ttl=None):
+        try:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            return bool(self.client.set(key, data, ex=int(self.ttl if ttl is None else ttl), nx=True))
+        except Exception as e:
+            self._error("add", e)
+            return False
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": self.name,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        try:
+            # Evictions happen server-side and are shared by every worker
+            stats["evictions"] = self.client.info("stats").get("evicted_keys", 0)
+        except Exception:
+            stats["evictions"] = None
+        return stats
+
+
+_backend = NullCache()
+
+
+def get_cache():
+    return _backend
+
+
+def create_backend(config):
+    backend = (config.get("CACHE_BACKEND") or "null").lower()
+    ttl = config.get("CACHE_DEFAULT_TTL", DEFAULT_TTL)
+    if backend == "memory":
+        return MemoryCache(config.get("CACHE_SIZE", DEFAULT_SIZE), ttl)
+    if backend == "redis":
+        return RedisCache.from_url(config.get("REDIS_URL") or "redis://localhost:6379/0", ttl)
+    if backend != "null":
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+    return NullCache()
+
+
+def init_cache(app):
+    """Select the cache backend from the app config."""
+    global _backend
+    _backend = create_backend(app.config)
+    app.logger.info(f"Cache backend: {_backend.name}")
+    return _backend
+
+
+def _generation_key(user_id):
+    return f"{KEY_PREFIX}gen:{user_id}"
+
+
+def user_generation(user_id):
+    """Return the user's current cache generation, starting one if needed."""
+    backend = _backend
+    key = _generation_key(user_id)
+    generation = backend.get(key)
+    if generation is MISSING:
+        # add() so that concurrent first readers agree on one generation
+        generation = uuid.uuid4().hex
+        if not backend.add(key, generation, GENERATION_TTL):
+            stored = backend.get(key)
+            generation = generation if stored is MISSING else stored
+    return generation
+
+
+def bump_user_generation(user_id):
+    """Retire every cache entry scoped to ``user_id``."""
+    backend = _backend
+    if backend.enabled:
+        backend.set(_generation_key(user_id), uuid.uuid4().hex, GENERATION_TTL)
+
+
+def make_key(namespace, user_id=None, *parts):
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    if user_id is None:
+        return f"{KEY_PREFIX}{namespace}:{digest}"
+    return f"{KEY_PREFIX}{namespace}:{user_id}:{user_generation(user_id)}:{digest}"
+
+
+def cached(namespace, ttl=None, per_user=True):
+    """Cache a function's return value.
+
+    With ``per_user`` the first positional argument is the user id, and the
+    entry is retired by that user's next task write. Inside ``conditional_get``
+    the entry is also keyed by the version that produced the ETag, as in
+    ``cached_view``, so a new ETag never carries a value cached before the
+    write that changed it.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            backend = _backend
+            if not backend.enabled:
+                return fn(*args, **kwargs)
+
+            if per_user:
+                version = g.get("user_version") if has_app_context() else None
+                key = make_key(namespace, args[0], args[1:], sorted(kwargs.items()), version)
+            else:
+                key = make_key(namespace, None, args, sorted(kwargs.items()))
+            value = backend.get(key)
+            if value is MISSING:
+                value = fn(*args, **kwargs)
+                backend.set(key, value, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def cached_view(ttl=None):
+    """Cache a view's successful responses per user and URL.
+
+    For GET views that return the same body for the same user and query
+    string. Apply inside ``login_required``, and inside ``conditional_get``
+    when both are used: entries are then also keyed by the version that
+    produced the ETag.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            backend = _backend
+            if not backend.enabled or request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = make_key(f"view:{request.endpoint}", current_user.id, request.full_path, g.get("user_version"))
+            entry = backend.get(key)
+            if entry is not MISSING:
+                body, status, mimetype = entry
+                return current_app.response_class(body, status=status, mimetype=mimetype)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                backend.set(key, (response.get_data(), response.status_code, response.mimetype), ttl)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,116 @@
+"""
+Flask CLI commands for TaskFlow database maintenance.
+
+Run with ``flask --app main_app <command>``.
+"""
+
+from datetime import datetime
+
+import click
+from bson import ObjectId
+from flask.cli import with_appcontext
+
+from app.counters import rebuild_counters
+from app.db import ensure_registered
+from app.models import ApiKey, User, Task, TaskCounter
+from app.pagination import keyset_filter
+
+# Query shapes issued by the routes, as (name, model, filter, sort). The values
+# are placeholders: only the shape matters to the query planner.
+_SAMPLE_USER = ObjectId()
+_PAGE_ORDER = [("created_at", -1), ("_id", -1)]
+
+QUERY_SHAPES = [
+    ("tasks list", Task, {"user": _SAMPLE_USER}, _PAGE_ORDER),
+    ("tasks list by status", Task, {"user": _SAMPLE_USER, "status": "To Do"}, _PAGE_ORDER),
+    ("tasks list next page", Task, dict(keyset_filter(datetime.utcnow(), ObjectId()), user=_SAMPLE_USER), _PAGE_ORDER),
+    # Relevance order comes from the text index itself, so there is no sort to check
+    ("task search", Task, {"user": _SAMPLE_USER, "$text": {"$search": "report"}}, None),
+    ("task by id", Task, {"_id": ObjectId(), "user": _SAMPLE_USER}, None),
+    ("dashboard total", Task, {"user": _SAMPLE_USER}, None),
+    ("dashboard status count", Task, {"user": _SAMPLE_USER, "status": "Completed"}, None),
+    ("dashboard counters", TaskCounter, {"_id": _SAMPLE_USER}, None),
+    ("dashboard recent", Task, {"user": _SAMPLE_USER}, [("created_at", -1)]),
+    ("user by username", User, {"username": "sample"}, None),
+    ("user by email", User, {"email": "sample@example.com"}, None),
+    ("api key by hash", ApiKey, {"key_hash": "0" * 64, "revoked_at": None}, None),
+    ("api keys list", ApiKey, {"user": _SAMPLE_USER}, [("created_at", -1)]),
+]
+
+
+def summarize_plan(plan):
+    """Flatten a winning plan into its stage names and the indexes it uses."""
+    stages, indexes = [], []
+    pending = [plan]
+
+    while pending:
+        node = pending.pop()
+        stages.append(node.get("stage", "?"))
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        if "inputStage" in node:
+            pending.append(node["inputStage"])
+        pending.extend(node.get("inputStages", []))
+
+    return stages, indexes
+
+
+def explain_query(model, query, sort=None):
+    """Return the winning plan for a query shape against the model's collection."""
+    cursor = model._get_collection().find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    return cursor.explain()["queryPlanner"]["winningPlan"]
+
+
+@click.command("ensure-indexes")
+@click.option("--explain/--no-explain", default=True, help="Print the query plan for each route query shape.")
+@with_appcontext
+def ensure_indexes_command(explain):
+    """Create declared indexes, verify them and explain route queries."""
+    ensure_registered()
+    ok = True
+
+    for model in (User, Task, ApiKey):
+        model.ensure_indexes()
+        diff = model.compare_indexes()
+        name = model._get_collection_name()
+        click.echo(f"{name}: {', '.join(sorted(model._get_collection().index_information()))}")
+        if diff["missing"]:
+            ok = False
+            click.echo(f"  missing: {diff['missing']}", err=True)
+        if diff["extra"]:
+            click.echo(f"  extra (not declared): {diff['extra']}")
+
+    if explain:
+        for label, model, query, sort in QUERY_SHAPES:
+            stages, indexes = summarize_plan(explain_query(model, query, sort))
+            scanned = "COLLSCAN" not in stages and "SORT" not in stages
+            ok = ok and scanned
+            click.echo(f"{'OK  ' if scanned else 'FAIL'} {label}: {' <- '.join(stages)} [{', '.join(indexes) or 'no index'}]")
+
+    if not ok:
+        raise SystemExit(1)
+
+
+@click.command("reconcile-counters")
+@click.option("--username", default=None, help="Only rebuild this user's counters.")
+@with_appcontext
+def reconcile_counters_command(username):
+    """Rebuild per-user task counters from the tasks collection."""
+    ensure_registered()
+    user_id = None
+    if username:
+        user = User.objects(username=username).only("id").first()
+        if not user:
+            raise click.ClickException(f"No user named {username}")
+        user_id = user.id
+
+    rebuilt = rebuild_counters(user_id)
+    click.echo(f"Rebuilt task counters for {rebuilt} user(s)")
+
+
+def register_commands(app):
+    """Register CLI commands on the Flask app."""
+    app.cli.add_command(ensure_indexes_command)
+    app.cli.add_command(reconcile_counters_command)
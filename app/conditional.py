@@ -0,0 +1,89 @@
+"""
+Conditional GETs for per-user task resources.
+
+Every task write bumps the user's ``version`` and ``last_modified`` in their
+counters document (app.counters), so one indexed ``_id`` lookup tells whether
+anything a user can see has changed. ``conditional_get`` answers
+``If-None-Match`` / ``If-Modified-Since`` with ``304 Not Modified`` from that
+lookup alone, before the view queries or serializes anything.
+
+The ETag is weak and covers all of a user's tasks, so any write invalidates
+every list, task and dashboard response for that user. That is coarser than
+per-resource tags but costs nothing to maintain.
+"""
+
+import functools
+from datetime import datetime, timezone
+
+from flask import current_app, g, make_response, request
+from flask_login import current_user
+
+from app.counters import get_version
+
+
+def user_etag(user_id, version):
+    return f"{user_id}.{version}"
+
+
+def last_modified_header(last_modified, now=None):
+    """The Last-Modified value for a change time, or None if it cannot be sent yet.
+
+    HTTP dates have one-second resolution. While the second of the latest write
+    is still in progress another write could land in it unnoticed, so the
+    header is only sent once that second has passed.
+    """
+    if last_modified is None:
+        return None
+    last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+    now = (now or datetime.utcnow()).replace(microsecond=0, tzinfo=timezone.utc)
+    return last_modified if last_modified < now else None
+
+
+def is_not_modified(etag, last_modified):
+    """Whether the request's validators match the current state."""
+    if request.if_none_match:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110)
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def user_validators(user_id, state):
+    """Return ``(etag, last_modified)`` for a user's ``get_version`` state.
+
+    Also stores the version as ``g.user_version``: cached_view keys on it, so a
+    cached body always matches its ETag.
+    """
+    g.user_version = state.get("version", 0)
+    return user_etag(user_id, g.user_version), last_modified_header(state.get("last_modified"))
+
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Responses are per user: browsers may keep them but must revalidate
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional_get(view):
+    """Serve 304 for unchanged per-user resources; tag 200 responses with validators.
+
+    Apply inside ``login_required``.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        etag, last_modified = user_validators(current_user.id, get_version(current_user.id))
+        if is_not_modified(etag, last_modified):
+            return set_validators(current_app.response_class(status=304), etag, last_modified)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+
+    return wrapper
@@ -0,0 +1,174 @@
+"""
+Per-user task counters for TaskFlow.
+
+Each user has one ``task_counters`` document holding task totals by status.
+Every task write adjusts it with a single ``$inc``, so dashboards can read
+one small document instead of counting the ``tasks`` collection.
+
+Writers never upsert: an ``$inc`` on a missing document would create partial
+totals. Instead the document is seeded from a full count the first time it
+is read, and ``flask reconcile-counters`` rebuilds all of them from scratch.
+
+The same update also bumps ``version`` and sets ``last_modified``, even when no
+count changes, so the document doubles as a change marker for all of a
+user's tasks (see app.conditional). Writers change the tasks first and the
+counters second, so a reader that checks the version before reading tasks
+can only ever pair an old version with newer data, never the reverse.
+"""
+
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.cache import bump_user_generation
+from app.models import STATUS_KEYS, Task, TaskCounter
+
+COUNTER_FIELDS = ["total"] + list(STATUS_KEYS.values())
+
+# Change marker fields, bumped by every task write
+VERSION_FIELDS = ["version", "last_modified"]
+
+
+def _collection():
+    return TaskCounter._get_collection()
+
+
+def delta_update(delta):
+    """The counters update that adds ``delta`` (``{field: n}``) and bumps the version."""
+    delta = {field: n for field, n in delta.items() if n}
+    delta["version"] = 1
+    return {"$inc": delta, "$set": {"last_modified": datetime.utcnow()}}
+
+
+def apply_delta(user_id, delta):
+    """Atomically add ``delta`` to a user's counters and bump their version.
+
+    Also retires the user's cached responses (app.cache).
+    """
+    _collection().update_one({"_id": user_id}, delta_update(delta))
+    bump_user_generation(user_id)
+
+
+def status_delta(status, sign):
+    """Counter changes for adding (``sign=1``) or removing (``-1``) one task."""
+    delta = {"total": sign}
+    if status in STATUS_KEYS:
+        delta[STATUS_KEYS[status]] = sign
+    return delta
+
+
+def record_created(user_id, status):
+    apply_delta(user_id, status_delta(status, 1))
+
+
+def record_deleted(user_id, status):
+    apply_delta(user_id, status_delta(status, -1))
+
+
+def status_change_delta(old_status, new_status):
+    """Counter changes for moving one task between statuses; empty if unchanged."""
+    delta = {}
+    if old_status != new_status:
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            if status in STATUS_KEYS:
+                delta[STATUS_KEYS[status]] = delta.get(STATUS_KEYS[status], 0) + sign
+    return delta
+
+
+def record_status_change(user_id, old_status, new_status):
+    """Move one task between status counts; with no status change, only bump the version."""
+    apply_delta(user_id, status_change_delta(old_status, new_status))
+
+
+def counts_to_counters(counts):
+    """Convert ``{status: count}`` into counter fields."""
+    counters = {"total": sum(counts.values())}
+    counters.update({key: counts.get(status, 0) for status, key in STATUS_KEYS.items()})
+    return counters
+
+
+def seed_update(counts):
+    """The upsert that creates counters from ``{status: count}`` unless they already exist."""
+    return {"$setOnInsert": dict(counts_to_counters(counts), version=0, last_modified=datetime.utcnow())}
+
+
+def reseed_update(counts):
+    """The update that resets just-seeded counters to a fresh ``{status: count}``."""
+    return {"$set": dict(counts_to_counters(counts), last_modified=datetime.utcnow()), "$inc": {"version": 1}}
+
+
+def seed_counters(user_id, counts):
+    """Create a user's counters from ``{status: count}`` unless they already exist.
+
+    Writers do not upsert, so a task write that lands between counting and
+    seeding leaves the new counters behind. When this call creates the
+    document, the tasks are counted again and the counters set from that
+    count. Returns the counts the counters were last set from.
+    """
+    result = _collection().update_one({"_id": user_id}, seed_update(counts), upsert=True)
+    if result.upserted_id is None:
+        return counts
+
+    counts = count_by_status({"user": user_id}).get(user_id, {})
+    _collection().update_one({"_id": user_id}, reseed_update(counts))
+    return counts
+
+
+def get_counters(user_id, fields=COUNTER_FIELDS):
+    """Return a user's counter document, or None if it has not been seeded yet."""
+    return _collection().find_one({"_id": user_id}, {field: 1 for field in fields})
+
+
+def get_version(user_id):
+    """Return ``{"version", "last_modified"}`` for a user, seeding the counters if needed."""
+    doc = get_counters(user_id, VERSION_FIELDS)
+    if doc is None:
+        seed_counters(user_id, count_by_status({"user": user_id}).get(user_id, {}))
+        doc = get_counters(user_id, VERSION_FIELDS)
+    return doc
+
+
+def count_by_status_pipeline(match):
+    return [
+        {"$match": match},
+        {"$group": {"_id": {"user": "$user", "status": "$status"}, "count": {"$sum": 1}}},
+    ]
+
+
+def counts_from_rows(rows):
+    """Fold ``count_by_status_pipeline`` rows into ``{user_id: {status: count}}``."""
+    counts = {}
+    for row in rows:
+        counts.setdefault(row["_id"]["user"], {})[row["_id"]["status"]] = row["count"]
+    return counts
+
+
+def count_by_status(match):
+    """Return ``{user_id: {status: count}}`` for tasks matching ``match``."""
+    return counts_from_rows(Task._get_collection().aggregate(count_by_status_pipeline(match)))
+
+
+def rebuild_counters(user_id=None):
+    """Recompute counters from the tasks collection; return the number of users rebuilt.
+
+    Writes that land while the rebuild runs may be lost, so run it when the
+    counters are known to be wrong or traffic is low.
+    """
+    counts = count_by_status({"user": user_id} if user_id is not None else {})
+    if user_id is not None:
+        counts.setdefault(user_id, {})
+
+    def rebuild(counters):
+        return {"$set": dict(counters, last_modified=datetime.utcnow()), "$inc": {"version": 1}}
+
+    requests = [
+        UpdateOne({"_id": uid}, rebuild(counts_to_counters(by_status)), upsert=True) for uid, by_status in counts.items()
+    ]
+    if requests:
+        _collection().bulk_write(requests, ordered=False)
+
+    if user_id is None:
+        # Users whose tasks are all gone no longer appear in the aggregation
+        _collection().update_many({"_id": {"$nin": list(counts)}}, rebuild(counts_to_counters({})))
+
+    return len(counts)
@@ -9,30 +9,65 @@ This module provides a comprehensive monitoring dashboard with:
 - System health monitoring
 """
 
-import json
+import os
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from flask import Blueprint, render_template, jsonify, request, g
 from flask_login import login_required, current_user
+from werkzeug.exceptions import HTTPException
 from app.monitoring import log_user_activity, log_api_usage
+from app.cache import get_cache
+from app.metrics_store import MetricsStore, StoreGroup, claim_slot, open_slots
 
 # Create monitoring dashboard blueprint
 monitoring_bp = Blueprint("monitoring", __name__, url_prefix="/monitoring")
 
-# In-memory storage for metrics (in production, use Redis or database)
-_metrics_storage = {"requests": [], "errors": [], "security_events": [], "performance": [], "user_activity": []}
+# Per-worker, fixed-size metrics (see app.metrics_store), in a slot file under
+# METRICS_DIR when one is configured so that they outlive the worker
+_directory = None
+_store = None
 
+FIVE_MINUTES = 5 * 60
+ONE_HOUR = 60 * 60
+ONE_DAY = 24 * 60 * 60
 
-def add_metric(metric_type, data):
-    """Add a metric to storage."""
-    timestamp = datetime.utcnow()
-    metric = {"timestamp": timestamp.isoformat(), "type": metric_type, "data": data}
 
-    _metrics_storage[metric_type].append(metric)
+def configure(directory):
+    """Keep metrics in slot files under ``directory`` (None keeps them in memory)."""
+    global _directory, _store
+    _directory = directory
+    _store = None
 
-    # Keep only last 1000 metrics per type
-    if len(_metrics_storage[metric_type]) > 1000:
-        _metrics_storage[metric_type] = _metrics_storage[metric_type][-1000:]
+
+def get_store():
+    """This process's MetricsStore, claimed on first use after start-up or fork."""
+    global _store
+    if _store is None:
+        _store = claim_slot(_directory) if _directory else MetricsStore()
+    return _store
+
+
+def metrics_view():
+    """This process's store together with every other worker's slot file."""
+    store = get_store()
+    if not _directory:
+        return StoreGroup([store])
+    return StoreGroup([store] + open_slots(_directory, exclude=store.regions.path))
+
+
+def _after_fork_in_child():
+    global _store
+    # The slot file and its lock belong to the parent
+    _store = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def summary_to_dict(summary):
+    """Counts and durations of a metrics_store.Summary, with its average."""
+    return dict(summary._asdict(), avg_duration=summary.duration_sum / summary.count if summary.count else 0)
 
 
 @monitoring_bp.route("/dashboard")
@@ -42,24 +77,23 @@ def monitoring_dashboard():
     log_user_activity(current_user.id, "view_monitoring_dashboard")
 
     # Calculate metrics for the last 24 hours
-    now = datetime.utcnow()
-    yesterday = now - timedelta(days=1)
-
-    # Filter metrics for last 24 hours
-    recent_requests = [m for m in _metrics_storage["requests"] if datetime.fromisoformat(m["timestamp"]) > yesterday]
-    recent_errors = [m for m in _metrics_storage["errors"] if datetime.fromisoformat(m["timestamp"]) > yesterday]
-    recent_security = [m for m in _metrics_storage["security_events"] if datetime.fromisoformat(m["timestamp"]) > yesterday]
+    view = metrics_view()
+    now = time.time()
+    requests = view.requests.summary(ONE_DAY, now)
+    errors = view.errors.summary(ONE_DAY, now)
+    security = view.security_events.summary(ONE_DAY, now)
 
-    # Calculate statistics
     stats = {
-        "total_requests": len(recent_requests),
-        "total_errors": len(recent_errors),
-        "security_events": len(recent_security),
-        "error_rate": (len(recent_errors) / max(len(recent_requests), 1)) * 100,
-        "avg_response_time": calculate_avg_response_time(recent_requests),
-        "top_endpoints": get_top_endpoints(recent_requests),
-        "recent_errors": recent_errors[-10:],  # Last 10 errors
-        "recent_security_events": recent_security[-10:],  # Last 10 security events
+        "total_requests": requests.count,
+        "total_errors": errors.count,
+        "security_events": security.count,
+        "error_rate": (errors.count / max(requests.count, 1)) * 100,
+        "avg_response_time": summary_to_dict(requests)["avg_duration"],
+        "top_endpoints": view.top_endpoints(ONE_DAY, now=now),
+        "latency": view.latency_percentiles(ONE_DAY, now),
+        "recent_errors": list(view.recent["errors"]),  # Last 10 errors
+        "recent_security_events": list(view.recent["security_events"]),  # Last 10 security events
+        "cache": get_cache().stats(),
     }
 
     return render_template("monitoring/dashboard.html", stats=stats)
@@ -71,23 +105,34 @@ def get_metrics():
     """API endpoint to get current metrics."""
     log_api_usage("/monitoring/api/metrics", "GET", 200)
 
-    # Get metrics for the last hour
-    now = datetime.utcnow()
-    hour_ago = now - timedelta(hours=1)
+    # Latency percentiles cover ?window= seconds (default one hour, at most a day)
+    window = min(max(request.args.get("window", ONE_HOUR, type=int), 1), ONE_DAY)
 
-    recent_metrics = {}
-    for metric_type, metrics in _metrics_storage.items():
-        recent_metrics[metric_type] = [m for m in metrics if datetime.fromisoformat(m["timestamp"]) > hour_ago]
+    # Per-minute buckets for the last hour
+    view = metrics_view()
+    now = time.time()
+    series = {
+        "requests": view.requests,
+        "errors": view.errors,
+        "security_events": view.security_events,
+    }
+    recent_metrics = {
+        name: [dict(summary_to_dict(bucket), timestamp=start) for start, bucket in metric.buckets(ONE_HOUR, now)]
+        for name, metric in series.items()
+    }
+    totals = {name: metric.summary(ONE_HOUR, now) for name, metric in series.items()}
 
     return jsonify(
         {
-            "timestamp": now.isoformat(),
+            "timestamp": now,
             "metrics": recent_metrics,
             "summary": {
-                "requests_per_minute": len(recent_metrics["requests"]) / 60,
-                "errors_per_minute": len(recent_metrics["errors"]) / 60,
-                "security_events_per_minute": len(recent_metrics["security_events"]) / 60,
+                "requests_per_minute": totals["requests"].count / 60,
+                "errors_per_minute": totals["errors"].count / 60,
+                "security_events_per_minute": totals["security_events"].count / 60,
             },
+            "latency": {"window": window, "endpoints": view.latency_percentiles(window, now)},
+            "cache": get_cache().stats(),
         }
     )
 
@@ -100,49 +145,43 @@ def get_alerts():
 
     alerts = []
     now = datetime.utcnow()
+    epoch = time.time()
 
     # Check for high error rate
-    recent_requests = [
-        m for m in _metrics_storage["requests"] if datetime.fromisoformat(m["timestamp"]) > now - timedelta(minutes=5)
-    ]
-    recent_errors = [
-        m for m in _metrics_storage["errors"] if datetime.fromisoformat(m["timestamp"]) > now - timedelta(minutes=5)
-    ]
-
-    if recent_requests and len(recent_errors) / len(recent_requests) > 0.1:  # 10% error rate
+    view = metrics_view()
+    recent_requests = view.requests.summary(FIVE_MINUTES, epoch)
+    recent_errors = view.errors.summary(FIVE_MINUTES, epoch)
+
+    if recent_requests.count and recent_errors.count / recent_requests.count > 0.1:  # 10% error rate
         alerts.append(
             {
                 "type": "error_rate_high",
                 "severity": "high",
-                "message": f"High error rate detected: {(len(recent_errors) / len(recent_requests)) * 100:.1f}%",
+                "message": f"High error rate detected: {(recent_errors.count / recent_requests.count) * 100:.1f}%",
                 "timestamp": now.isoformat(),
             }
         )
 
     # Check for security events
-    recent_security = [
-        m for m in _metrics_storage["security_events"] if datetime.fromisoformat(m["timestamp"]) > now - timedelta(minutes=5)
-    ]
+    recent_security = view.security_events.summary(FIVE_MINUTES, epoch)
 
-    if recent_security:
+    if recent_security.count:
         alerts.append(
             {
                 "type": "security_events",
                 "severity": "medium",
-                "message": f"{len(recent_security)} security events in the last 5 minutes",
+                "message": f"{recent_security.count} security events in the last 5 minutes",
                 "timestamp": now.isoformat(),
             }
         )
 
-    # Check for slow response times
-    slow_requests = [m for m in recent_requests if m["data"].get("duration", 0) > 2.0]  # Over 2 seconds
-
-    if slow_requests:
+    # Check for slow response times (over app.metrics_store.SLOW_REQUEST_SECONDS)
+    if recent_requests.slow:
         alerts.append(
             {
                 "type": "slow_responses",
                 "severity": "medium",
-                "message": f"{len(slow_requests)} slow requests detected",
+                "message": f"{recent_requests.slow} slow requests detected",
                 "timestamp": now.isoformat(),
             }
         )
@@ -150,76 +189,43 @@ def get_alerts():
     return jsonify({"alerts": alerts, "total_alerts": len(alerts)})
 
 
-def calculate_avg_response_time(requests):
-    """Calculate average response time from request metrics."""
-    if not requests:
-        return 0
-
-    total_time = sum(m["data"].get("duration", 0) for m in requests)
-    return total_time / len(requests)
-
-
-def get_top_endpoints(requests):
-    """Get top endpoints by request count."""
-    endpoint_counts = {}
-
-    for request in requests:
-        endpoint = request["data"].get("endpoint", "unknown")
-        endpoint_counts[endpoint] = endpoint_counts.get(endpoint, 0) + 1
-
-    # Sort by count and return top 10
-    sorted_endpoints = sorted(endpoint_counts.items(), key=lambda x: x[1], reverse=True)
-    return sorted_endpoints[:10]
-
-
 # Metrics collection functions
 def record_request(endpoint, method, status_code, duration):
     """Record a request metric."""
-    add_metric(
-        "requests",
-        {
-            "endpoint": endpoint,
-            "method": method,
-            "status_code": status_code,
-            "duration": duration,
-            "timestamp": datetime.utcnow().isoformat(),
-        },
-    )
+    get_store().record_request(endpoint, method, status_code, duration)
 
 
 def record_error(error_type, error_message, endpoint=None):
     """Record an error metric."""
-    add_metric(
-        "errors",
-        {"type": error_type, "message": error_message, "endpoint": endpoint, "timestamp": datetime.utcnow().isoformat()},
-    )
+    get_store().record_error(error_type, error_message, endpoint)
 
 
 def record_security_event(event_type, details):
     """Record a security event."""
-    add_metric("security_events", {"type": event_type, "details": details, "timestamp": datetime.utcnow().isoformat()})
+    get_store().record_security_event(event_type, details)
 
 
 def record_performance_metric(metric_name, value):
     """Record a performance metric."""
-    add_metric("performance", {"name": metric_name, "value": value, "timestamp": datetime.utcnow().isoformat()})
+    get_store().record_performance(metric_name, value)
 
 
 # Health check endpoint for monitoring
 @monitoring_bp.route("/health")
 def monitoring_health():
     """Health check endpoint for monitoring system."""
+    view = metrics_view()
     return jsonify(
         {
             "status": "healthy",
             "timestamp": datetime.utcnow().isoformat(),
             "metrics_count": {
-                "requests": len(_metrics_storage["requests"]),
-                "errors": len(_metrics_storage["errors"]),
-                "security_events": len(_metrics_storage["security_events"]),
-                "performance": len(_metrics_storage["performance"]),
-                "user_activity": len(_metrics_storage["user_activity"]),
+                "requests": view.requests.summary(ONE_DAY).count,
+                "errors": view.errors.summary(ONE_DAY).count,
+                "security_events": view.security_events.summary(ONE_DAY).count,
+                "performance": view.performance_count(ONE_DAY),
             },
+            "cache": get_cache().stats(),
         }
     )
 
@@ -227,6 +233,7 @@ def monitoring_health():
 # Initialize monitoring dashboard
 def init_monitoring_dashboard(app):
     """Initialize the monitoring dashboard."""
+    configure(app.config.get("METRICS_DIR"))
     app.register_blueprint(monitoring_bp)
 
     # Register request logging
@@ -244,6 +251,9 @@ def init_monitoring_dashboard(app):
     # Register error logging
     @app.errorhandler(Exception)
     def handle_exception(e):
+        # 404s, 405s and abort() keep their own status and response
+        if isinstance(e, HTTPException):
+            return e
         record_error(type(e).__name__, str(e), request.endpoint if request else None)
         return jsonify({"error": "Internal server error"}), 500
 
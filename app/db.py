@@ -0,0 +1,142 @@
+"""
+MongoDB connection management for TaskFlow.
+
+``create_app`` does not touch MongoDB. Each process registers the connection
+settings with mongoengine the first time a request or command needs the
+database, and pymongo creates its client on the first operation. Registering
+can block, because a ``mongodb+srv://`` URI is resolved through DNS, but
+``/health`` never waits for it. A gunicorn ``--preload`` master therefore
+never hands a client to its workers. pymongo clients are not fork-safe, so a
+child that inherits one anyway drops its copy and makes its own.
+
+The first request in each process also starts a daemon thread that connects
+and pings the server, retrying with exponential backoff. The pool is usually
+connected before requests need it, and ``/health`` reports progress in the
+meantime.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import mongoengine
+from flask import request
+from mongoengine import Document
+from mongoengine.base.common import _get_documents_by_db
+from mongoengine.connection import DEFAULT_CONNECTION_NAME, _connections, _dbs, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Connection pool options, tuned for Azure App Service
+MONGODB_POOL_OPTIONS = "maxPoolSize=20&minPoolSize=5&maxIdleTimeMS=60000&serverSelectionTimeoutMS=30000&connectTimeoutMS=10000"
+MONGODB_TIMEOUT_MS = 30000
+
+RETRY_INITIAL_DELAY = 1
+RETRY_MAX_DELAY = 30
+
+# Endpoints that answer without the database, even before it is registered
+NO_DB_ENDPOINTS = {"main.health", "api.health_check", "static"}
+
+_lock = threading.Lock()
+_state = {"uri": None, "registered": False, "pid": None, "status": "disabled", "attempts": 0, "error": None}
+
+
+def mongo_connection_string(uri):
+    """Append the app's connection pool options to a MongoDB URI."""
+    return uri + ("&" if "?" in uri else "?") + MONGODB_POOL_OPTIONS
+
+
+def init_db(app):
+    """Set up lazy MongoDB connections for the app; return whether a URI is configured."""
+    uri = app.config.get("MONGODB_URI")
+    if not uri:
+        logger.info("MongoDB connection skipped - no URI provided")
+        return False
+
+    _state.update(uri=uri, status="pending")
+    app.before_request(_before_request)
+    return True
+
+
+def ensure_registered():
+    """Register the connection settings with mongoengine unless this process already has."""
+    if _state["registered"] or not _state["uri"]:
+        return
+
+    with _lock:
+        if _state["registered"]:
+            return
+        mongoengine.register_connection(
+            DEFAULT_CONNECTION_NAME,
+            host=mongo_connection_string(_state["uri"]),
+            serverSelectionTimeoutMS=MONGODB_TIMEOUT_MS,
+            connectTimeoutMS=MONGODB_TIMEOUT_MS,
+            socketTimeoutMS=MONGODB_TIMEOUT_MS,
+            # pymongo starts no threads or sockets until the first operation
+            connect=False,
+        )
+        _state["registered"] = True
+
+
+def start_warmup():
+    """Start this process's connection warm-up unless it is running or done."""
+    pid = os.getpid()
+    if not _state["uri"] or _state["pid"] == pid:
+        return
+
+    with _lock:
+        if _state["pid"] == pid:
+            return
+        _state.update(pid=pid, status="connecting", attempts=0, error=None)
+        threading.Thread(target=_warm_up, name="mongodb-warmup", daemon=True).start()
+
+
+def _before_request():
+    start_warmup()
+    if request.endpoint not in NO_DB_ENDPOINTS:
+        ensure_registered()
+
+
+def _warm_up():
+    delay = RETRY_INITIAL_DELAY
+    while True:
+        _state["attempts"] += 1
+        try:
+            ensure_registered()
+            get_connection().admin.command("ping")
+        except Exception as e:
+            _state["error"] = str(e)
+            logger.error(f"MongoDB connection attempt {_state['attempts']} failed: {e}; retrying in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX_DELAY)
+        else:
+            _state.update(status="connected", error=None)
+            logger.info(f"MongoDB connection established on attempt {_state['attempts']}")
+            return
+
+
+def db_status():
+    """This process's connection state: ``disabled``, ``pending``, ``connecting`` or ``connected``."""
+    return {"status": _state["status"], "attempts": _state["attempts"], "error": _state["error"]}
+
+
+def _after_fork_in_child():
+    global _lock
+    # Forget, without closing, any client inherited from the parent: closing
+    # would talk to the server over the parent's sockets
+    _connections.clear()
+    _dbs.clear()
+    for doc_cls in _get_documents_by_db(DEFAULT_CONNECTION_NAME, DEFAULT_CONNECTION_NAME):
+        if issubclass(doc_cls, Document):
+            doc_cls._disconnect()
+
+    # The parent's warm-up thread does not exist here, and may have held the lock.
+    # The child warms up on its first request: pool processes that never use
+    # the database never connect.
+    _lock = threading.Lock()
+    _state.update(pid=None, status="pending" if _state["uri"] else "disabled", attempts=0, error=None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,86 @@
+"""
+Log-linear latency histograms.
+
+Bucket boundaries are fixed: every power of two between ``2**MIN_EXPONENT``
+seconds (about 0.12ms) and ``2**MAX_EXPONENT`` seconds is split into
+``SUB_BUCKETS`` equal-width buckets, with one bucket below and one above.
+A duration lands in its bucket in constant time and is reported with at
+most 1/SUB_BUCKETS relative error, and two histograms merge by adding
+their counts, so per-minute, per-endpoint or per-worker histograms can be
+combined into any window without keeping individual requests.
+"""
+
+import math
+from array import array
+
+SUB_BUCKETS = 8
+MIN_EXPONENT = -13
+MAX_EXPONENT = 7
+BUCKETS = (MAX_EXPONENT - MIN_EXPONENT) * SUB_BUCKETS + 2
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def bucket_index(seconds):
+    """Index of the bucket holding ``seconds``."""
+    if seconds < 2.0**MIN_EXPONENT:
+        return 0
+    mantissa, exponent = math.frexp(seconds)  # seconds = mantissa * 2**exponent, 0.5 <= mantissa < 1
+    octave = exponent - 1 - MIN_EXPONENT
+    if octave >= MAX_EXPONENT - MIN_EXPONENT:
+        return BUCKETS - 1
+    return 1 + octave * SUB_BUCKETS + int((mantissa * 2 - 1) * SUB_BUCKETS)
+
+
+def bucket_upper(index):
+    """Upper bound, in seconds, of bucket ``index``."""
+    if index == 0:
+        return 2.0**MIN_EXPONENT
+    if index == BUCKETS - 1:
+        return math.inf
+    octave, sub = divmod(index - 1, SUB_BUCKETS)
+    return 2.0 ** (MIN_EXPONENT + octave) * (1 + (sub + 1) / SUB_BUCKETS)
+
+
+class Histogram:
+    """Bucket counts plus the exact maximum of the durations added."""
+
+    __slots__ = ("counts", "maximum")
+
+    def __init__(self, counts=None, maximum=0.0):
+        self.counts = counts if counts is not None else array("q", [0]) * BUCKETS
+        self.maximum = maximum
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def add(self, seconds):
+        self.counts[bucket_index(seconds)] += 1
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def merge(self, other):
+        """Add ``other``'s counts (any sequence of BUCKETS counts) into this histogram."""
+        self.counts = array("q", map(int.__add__, self.counts, other.counts))
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile, capped at the maximum."""
+        total = self.count
+        if not total:
+            return 0.0
+
+        rank = max(math.ceil(q * total), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_upper(index), self.maximum)
+        return self.maximum
+
+    def percentiles(self):
+        """``count``, ``p50``, ``p90``, ``p99`` and ``max``, in seconds."""
+        result = {name: self.quantile(q) for name, q in PERCENTILES.items()}
+        return dict(result, count=self.count, max=self.maximum)
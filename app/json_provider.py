@@ -0,0 +1,75 @@
+"""
+JSON encoding for TaskFlow responses.
+
+Uses orjson when it is installed and the standard library otherwise. Both
+paths encode ObjectIds as hex strings and datetimes as ISO 8601, so handlers
+can return raw documents and serializer dicts without formatting each field.
+Keys keep their insertion order instead of being sorted.
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+
+from bson import ObjectId
+from flask import current_app
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(obj):
+    """Encode the types the JSON encoders do not handle themselves."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, indent=False):
+    """Encode ``obj`` as UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+    return json.dumps(obj, default=_default, indent=2 if indent else None, separators=None if indent else (",", ":")).encode()
+
+
+class TaskFlowJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson when it is available."""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Callers asking for stdlib options (sort_keys, cls, ...) get the stdlib encoder
+            kwargs.setdefault("default", _default)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj, indent=self._app.debug) + b"\n", mimetype="application/json")
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX representation that encodes through the app's JSON provider."""
+    response = current_app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
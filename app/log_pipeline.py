@@ -0,0 +1,239 @@
+"""
+Asynchronous logging for TaskFlow.
+
+Request threads never write log output themselves. The root logger has a
+single ``QueueHandler`` that puts records on a bounded queue without
+blocking; a ``QueueListener`` thread formats them and writes them to the
+console (and optionally a file) in batches, with one write and flush per
+batch or whenever the queue runs empty. When the queue is full, records are
+dropped and counted rather than holding up the request.
+
+Records are queued unformatted: the message's ``%`` arguments, the
+``fields`` passed with ``extra`` and any traceback are only turned into a
+JSON line on the listener thread. Routine per-request logs can be sampled
+with ``LOG_REQUEST_SAMPLE_RATE`` (see ``sample_routine``); warnings, errors
+and audit events are always kept.
+
+The queue and listener are created once per process and rebuilt in a
+forked child, whose copy of the listener thread does not exist.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 100
+
+_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+_handlers = []
+_sample_rate = 1.0
+
+
+def _dumps(entry):
+    if orjson:
+        return orjson.dumps(entry, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(entry, default=str)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, with the record's ``fields`` as top-level keys."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return _dumps(entry)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queues records as they are, and drops them when the queue is full."""
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # QueueHandler.prepare formats the message here, on the caller's
+        # thread; the listener is in the same process, so it can do that
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Batching:
+    """Buffers formatted lines; ``flush`` writes them with a single write."""
+
+    def __init__(self, *args, batch_size=BATCH_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_size = batch_size
+        self._lines = []
+
+    def emit(self, record):
+        try:
+            self._lines.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._lines and self.stream:
+                lines, self._lines = self._lines, []
+                self.stream.write("".join(lines))
+            super().flush()
+        finally:
+            self.release()
+
+
+class BatchStreamHandler(_Batching, logging.StreamHandler):
+    """Batched writes to ``stream``, or to whatever ``sys.stderr`` is when flushing."""
+
+    def __init__(self, stream=None, batch_size=BATCH_SIZE):
+        super().__init__(stream, batch_size=batch_size)
+        self._stream = stream
+
+    @property
+    def stream(self):
+        return self._stream or sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        self._stream = value
+
+
+class BatchFileHandler(_Batching, logging.FileHandler):
+    """Batched appends to a log file."""
+
+
+class BatchingQueueListener(QueueListener):
+    """Flushes its handlers whenever it has emptied the queue."""
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            self.flush()
+            return self.queue.get(block)
+
+    def enqueue_sentinel(self):
+        # Waits for room: the listener is still draining the queue
+        self.queue.put(self._sentinel)
+
+    def flush(self):
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                # A failing stream must not stop the listener thread
+                traceback.print_exc(file=sys.__stderr__)
+
+
+def init_logging(app, log_file=None):
+    """Send the root logger's records through the queue, adding ``log_file`` as a target."""
+    global _sample_rate
+    _sample_rate = min(max(float(app.config.get("LOG_REQUEST_SAMPLE_RATE", 1.0)), 0.0), 1.0)
+    batch_size = int(app.config.get("LOG_BATCH_SIZE", BATCH_SIZE))
+
+    with _lock:
+        if _queue_handler is None:
+            _handlers.append(BatchStreamHandler(batch_size=batch_size))
+            _start(queue.Queue(int(app.config.get("LOG_QUEUE_SIZE", QUEUE_SIZE))))
+            atexit.register(stop)
+
+            root = logging.getLogger()
+            root.addHandler(_queue_handler)
+            root.setLevel(logging.INFO)
+
+        if log_file and not any(getattr(h, "baseFilename", None) == os.path.abspath(log_file) for h in _handlers):
+            # The listener's handlers are fixed, so swap in a new listener on the same queue
+            stop()
+            _handlers.append(BatchFileHandler(log_file, encoding="utf-8", batch_size=batch_size))
+            _start(_queue_handler.queue)
+
+
+def _start(records):
+    global _queue_handler, _listener
+    formatter = JSONFormatter()
+    for handler in _handlers:
+        handler.setFormatter(formatter)
+
+    if _queue_handler is None:
+        _queue_handler = DroppingQueueHandler(records)
+    else:
+        _queue_handler.queue = records
+    _listener = BatchingQueueListener(records, *_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop():
+    """Write out everything queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.flush()
+        _listener = None
+
+
+def sample_routine():
+    """Whether to log this routine request, at the configured sample rate."""
+    return _sample_rate >= 1.0 or random.random() < _sample_rate
+
+
+def stats():
+    """Queue depth, capacity, dropped records and sample rate for this process."""
+    if _queue_handler is None:
+        return {"queued": 0, "capacity": 0, "dropped": 0, "sample_rate": _sample_rate}
+    records = _queue_handler.queue
+    return {
+        "queued": records.qsize(),
+        "capacity": records.maxsize,
+        "dropped": _queue_handler.dropped,
+        "sample_rate": _sample_rate,
+    }
+
+
+def _after_fork_in_child():
+    # The listener thread was not copied into the child, and the parent may
+    # have held the queue's lock, so the child gets a new queue and listener.
+    # Lines the parent had buffered are the parent's to write.
+    if _queue_handler is not None:
+        for handler in _handlers:
+            handler._lines = []
+        _start(queue.Queue(_queue_handler.queue.maxsize))
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,414 @@
+"""
+Fixed-memory, time-bucketed metrics for the monitoring dashboard.
+
+Events are not kept. Each one is folded into the current one-second and
+one-minute bucket of a ring buffer: a count, an error count, a slow count
+and the sum and max of its duration, held in parallel ``array`` columns and
+keyed by epoch seconds. Memory does not grow with traffic, and a window
+query reads one bucket per second (windows up to ``SECOND_BUCKETS``
+seconds) or per minute (up to ``MINUTE_BUCKETS`` minutes), however many
+requests it covers.
+
+Request latencies also go into log-linear histograms (app.histogram) per
+endpoint and status class, one per minute for the last hour and one per
+quarter hour for the last day. Percentiles for a window come from merging
+the histograms it covers.
+
+The columns are typed views of regions in an app.mmap_values.RegionFile.
+Given a directory, each worker claims the first slot file,
+``dashboard-<n>.store``, that no running process holds a lock on. A worker
+replacing a recycled one therefore reopens its predecessor's buckets and
+carries on. Recording writes straight into the mapping, with no snapshot
+step, and ``StoreGroup`` answers queries over every slot file, so the
+dashboard shows all workers. Only the last few error and security events
+are kept in process memory.
+"""
+
+import functools
+import glob
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from collections import deque, namedtuple
+
+from app.histogram import BUCKETS, Histogram, bucket_index
+from app.mmap_values import RegionFile
+
+SECOND_BUCKETS = 600
+MINUTE_BUCKETS = 1440
+# (bucket width in seconds, buckets) for each latency histogram ring
+LATENCY_RINGS = ((60, 60), (900, 96))
+RECENT_EVENTS = 10
+SLOW_REQUEST_SECONDS = 2.0
+
+Summary = namedtuple("Summary", "count errors slow duration_sum duration_max")
+EMPTY = Summary(0, 0, 0, 0.0, 0.0)
+ZERO_COUNTS = array("I", [0]) * BUCKETS
+SLOT_PATTERN = "dashboard-{}.store"
+
+
+def merge(a, b):
+    """Combine two summaries, as if their events had been counted together."""
+    return Summary(
+        a.count + b.count,
+        a.errors + b.errors,
+        a.slow + b.slow,
+        a.duration_sum + b.duration_sum,
+        max(a.duration_max, b.duration_max),
+    )
+
+
+def _columns(region, size, formats):
+    """Split a region into consecutive typed columns of ``size`` items each."""
+    columns, position = [], 0
+    for fmt in formats:
+        nbytes = size * array(fmt).itemsize
+        columns.append(region[position : position + nbytes].cast(fmt))
+        position += nbytes
+    return columns
+
+
+def window_numbers(width, size, now, seconds):
+    """Numbers (epoch // width) of the buckets covering the last ``seconds``, at most ``size`` of them."""
+    last = int(now // width)
+    first = max(last - math.ceil(seconds / width) + 1, last - size + 1)
+    return range(first, last + 1)
+
+
+def status_class(status_code):
+    return f"{status_code // 100}xx"
+
+
+class BucketRing:
+    """``size`` buckets of ``width`` seconds; bucket ``n`` (epoch // width) lives in slot ``n % size``.
+
+    A slot whose number is 0 has never been used.
+    """
+
+    FORMATS = "qqqqdd"
+
+    def __init__(self, width, size, region=None):
+        self.width = width
+        self.size = size
+        region = region if region is not None else memoryview(bytearray(self.nbytes(size)))
+        (
+            self.numbers,
+            self.count,
+            self.errors,
+            self.slow,
+            self.duration_sum,
+            self.duration_max,
+        ) = _columns(region, size, self.FORMATS)
+
+    @classmethod
+    def nbytes(cls, size):
+        return size * 8 * len(cls.FORMATS)
+
+    def _slot(self, number):
+        slot = number % self.size
+        if self.numbers[slot] != number:
+            # The slot still holds a bucket from one lap ago
+            self.numbers[slot] = number
+            self.count[slot] = self.errors[slot] = self.slow[slot] = 0
+            self.duration_sum[slot] = self.duration_max[slot] = 0.0
+        return slot
+
+    def add(self, now, duration, error, slow):
+        slot = self._slot(int(now // self.width))
+        self.count[slot] += 1
+        self.errors[slot] += error
+        self.slow[slot] += slow
+        self.duration_sum[slot] += duration
+        if duration > self.duration_max[slot]:
+            self.duration_max[slot] = duration
+
+    def span(self):
+        return self.width * self.size
+
+    def numbers_in(self, now, seconds):
+        """Bucket numbers covering the last ``seconds`` before ``now``, oldest first."""
+        return window_numbers(self.width, self.size, now, seconds)
+
+    def bucket(self, number):
+        slot = number % self.size
+        if self.numbers[slot] != number:
+            return EMPTY
+        return Summary(self.count[slot], self.errors[slot], self.slow[slot], self.duration_sum[slot], self.duration_max[slot])
+
+    def summary(self, now, seconds):
+        """All buckets in the window folded into one Summary."""
+        count = errors = slow = 0
+        duration_sum = duration_max = 0.0
+        for number in self.numbers_in(now, seconds):
+            slot = number % self.size
+            if self.numbers[slot] == number and self.count[slot]:
+                count += self.count[slot]
+                errors += self.errors[slot]
+                slow += self.slow[slot]
+                duration_sum += self.duration_sum[slot]
+                duration_max = max(duration_max, self.duration_max[slot])
+        return Summary(count, errors, slow, duration_sum, duration_max)
+
+
+class Series:
+    """One metric at per-second and per-minute resolution."""
+
+    def __init__(self, second_buckets=SECOND_BUCKETS, minute_buckets=MINUTE_BUCKETS, regions=None, key=None):
+        self.rings = tuple(
+            BucketRing(width, size, regions and regions.region(json.dumps([*key, width, size]), BucketRing.nbytes(size)))
+            for width, size in ((1, second_buckets), (60, minute_buckets))
+        )
+        self.lock = threading.Lock()
+
+    def add(self, duration=0.0, error=False, now=None):
+        now = time.time() if now is None else now
+        slow = duration > SLOW_REQUEST_SECONDS
+        with self.lock:
+            for ring in self.rings:
+                ring.add(now, duration, error, slow)
+
+    def ring_for(self, seconds):
+        """The finest ring that covers ``seconds``; the coarsest one caps the window."""
+        return next((ring for ring in self.rings if ring.span() >= seconds), self.rings[-1])
+
+    def buckets(self, seconds, now=None):
+        """``(bucket start epoch, Summary)`` for each bucket in the window, oldest first."""
+        now = time.time() if now is None else now
+        ring = self.ring_for(seconds)
+        with self.lock:
+            return [(number * ring.width, ring.bucket(number)) for number in ring.numbers_in(now, seconds)]
+
+    def summary(self, seconds, now=None):
+        now = time.time() if now is None else now
+        ring = self.ring_for(seconds)
+        with self.lock:
+            return ring.summary(now, seconds)
+
+
+class HistogramRing:
+    """A latency histogram per time bucket, in one flat column of ``size * BUCKETS`` counts."""
+
+    def __init__(self, width, size, region=None):
+        self.width = width
+        self.size = size
+        region = region if region is not None else memoryview(bytearray(self.nbytes(size)))
+        self.numbers, self.maxima = _columns(region[: size * 16], size, "qd")
+        self.counts = region[size * 16 :].cast("I")
+
+    @classmethod
+    def nbytes(cls, size):
+        return size * (16 + 4 * BUCKETS)
+
+    def span(self):
+        return self.width * self.size
+
+    def add(self, now, seconds, index):
+        number = int(now // self.width)
+        slot = number % self.size
+        base = slot * BUCKETS
+        if self.numbers[slot] != number:
+            self.numbers[slot] = number
+            self.counts[base : base + BUCKETS] = ZERO_COUNTS
+            self.maxima[slot] = 0.0
+        self.counts[base + index] += 1
+        if seconds > self.maxima[slot]:
+            self.maxima[slot] = seconds
+
+    def window(self, now, seconds):
+        """The histograms of the buckets in the window, merged."""
+        histogram = Histogram()
+        for number in window_numbers(self.width, self.size, now, seconds):
+            slot = number % self.size
+            if self.numbers[slot] == number:
+                base = slot * BUCKETS
+                histogram.merge(Histogram(self.counts[base : base + BUCKETS], self.maxima[slot]))
+        return histogram
+
+
+class LatencySeries:
+    """Latency histograms for one endpoint and status class."""
+
+    def __init__(self, rings=LATENCY_RINGS, regions=None, key=None):
+        self.rings = tuple(
+            HistogramRing(width, size, regions and regions.region(json.dumps([*key, width, size]), HistogramRing.nbytes(size)))
+            for width, size in rings
+        )
+        self.lock = threading.Lock()
+
+    def add(self, seconds, now=None):
+        now = time.time() if now is None else now
+        index = bucket_index(seconds)
+        with self.lock:
+            for ring in self.rings:
+                ring.add(now, seconds, index)
+
+    def window(self, seconds, now=None):
+        now = time.time() if now is None else now
+        ring = next((ring for ring in self.rings if ring.span() >= seconds), self.rings[-1])
+        with self.lock:
+            return ring.window(now, seconds)
+
+
+class MetricsStore:
+    """Request, error and security event series, per endpoint where it matters.
+
+    ``regions`` (an app.mmap_values.RegionFile) holds the buckets; reopening
+    a file brings back every series recorded in it.
+    """
+
+    def __init__(self, second_buckets=SECOND_BUCKETS, minute_buckets=MINUTE_BUCKETS, regions=None):
+        self.regions = regions
+        self._sizes = (second_buckets, minute_buckets)
+        self._lock = threading.Lock()
+        self.requests = self._new_series(["requests"])
+        self.errors = self._new_series(["errors"])
+        self.security_events = self._new_series(["security_events"])
+        self.endpoints = {}
+        self.latency = {}
+        self.performance = {}
+        self.recent = {"errors": deque(maxlen=RECENT_EVENTS), "security_events": deque(maxlen=RECENT_EVENTS)}
+
+        for key in regions.keys() if regions else ():
+            kind, name = json.loads(key)[:2]
+            if kind in ("endpoints", "performance"):
+                self._series(getattr(self, kind), name)
+            elif kind == "latency":
+                self._latency_series(tuple(name))
+
+    def _new_series(self, key):
+        return Series(*self._sizes, regions=self.regions, key=key)
+
+    def _series(self, table, name):
+        series = table.get(name)
+        if series is None:
+            kind = "endpoints" if table is self.endpoints else "performance"
+            with self._lock:
+                series = table.get(name) or table.setdefault(name, self._new_series([kind, name]))
+        return series
+
+    def _latency_series(self, key):
+        series = self.latency.get(key)
+        if series is None:
+            with self._lock:
+                series = self.latency.get(key) or self.latency.setdefault(
+                    key, LatencySeries(regions=self.regions, key=["latency", list(key)])
+                )
+        return series
+
+    def record_request(self, endpoint, method, status_code, duration, now=None):
+        now = time.time() if now is None else now
+        error = status_code >= 500
+        self.requests.add(duration, error, now)
+        self._series(self.endpoints, endpoint).add(duration, error, now)
+        self._latency_series((endpoint, status_class(status_code))).add(duration, now)
+
+    def record_error(self, error_type, message, endpoint=None, now=None):
+        now = time.time() if now is None else now
+        self.errors.add(now=now)
+        self.recent["errors"].append({"timestamp": now, "type": error_type, "message": message, "endpoint": endpoint})
+
+    def record_security_event(self, event_type, details, now=None):
+        now = time.time() if now is None else now
+        self.security_events.add(now=now)
+        self.recent["security_events"].append({"timestamp": now, "type": event_type, "details": details})
+
+    def record_performance(self, name, value, now=None):
+        """Track a named measurement; its Summary reports the values' count, sum and max."""
+        self._series(self.performance, name).add(value, now=now)
+
+    def top_endpoints(self, seconds, limit=10, now=None):
+        return StoreGroup([self]).top_endpoints(seconds, limit, now)
+
+    def latency_percentiles(self, seconds, now=None):
+        return StoreGroup([self]).latency_percentiles(seconds, now)
+
+
+class SeriesGroup:
+    """The same series from several stores, queried as one."""
+
+    def __init__(self, series):
+        self.series = series
+
+    def summary(self, seconds, now=None):
+        total = EMPTY
+        for series in self.series:
+            total = merge(total, series.summary(seconds, now))
+        return total
+
+    def buckets(self, seconds, now=None):
+        now = time.time() if now is None else now
+        rows = [series.buckets(seconds, now) for series in self.series]
+        return [(bucket[0][0], functools.reduce(merge, (summary for _, summary in bucket))) for bucket in zip(*rows)]
+
+
+class StoreGroup:
+    """Queries over several MetricsStores, such as every worker's slot file.
+
+    Recent events come from the first store, the current process's.
+    """
+
+    def __init__(self, stores):
+        self.stores = stores
+        self.requests = SeriesGroup([store.requests for store in stores])
+        self.errors = SeriesGroup([store.errors for store in stores])
+        self.security_events = SeriesGroup([store.security_events for store in stores])
+        self.recent = stores[0].recent
+
+    def performance_count(self, seconds, now=None):
+        return sum(series.summary(seconds, now).count for store in self.stores for series in list(store.performance.values()))
+
+    def top_endpoints(self, seconds, limit=10, now=None):
+        """``(endpoint, request count)`` for the busiest endpoints in the window."""
+        counts = {}
+        for store in self.stores:
+            for endpoint, series in list(store.endpoints.items()):
+                counts[endpoint] = counts.get(endpoint, 0) + series.summary(seconds, now).count
+        counts = [item for item in counts.items() if item[1]]
+        return sorted(counts, key=lambda item: item[1], reverse=True)[:limit]
+
+    def latency_percentiles(self, seconds, now=None):
+        """Per endpoint, busiest first: count, p50, p90, p99 and max overall and by status class."""
+        by_endpoint = {}
+        for store in self.stores:
+            for (endpoint, klass), series in list(store.latency.items()):
+                histogram = series.window(seconds, now)
+                if histogram.count:
+                    classes = by_endpoint.setdefault(endpoint, {})
+                    classes[klass] = classes[klass].merge(histogram) if klass in classes else histogram
+
+        rows = []
+        for endpoint, classes in by_endpoint.items():
+            total = Histogram()
+            for histogram in classes.values():
+                total.merge(histogram)
+            by_status = {klass: histogram.percentiles() for klass, histogram in sorted(classes.items())}
+            rows.append(dict(total.percentiles(), endpoint=endpoint, by_status=by_status))
+        return sorted(rows, key=lambda row: row["count"], reverse=True)
+
+
+def claim_slot(directory, second_buckets=SECOND_BUCKETS, minute_buckets=MINUTE_BUCKETS):
+    """A store over the first slot file in ``directory`` that no live process holds."""
+    os.makedirs(directory, exist_ok=True)
+    for n in itertools.count():
+        try:
+            regions = RegionFile(os.path.join(directory, SLOT_PATTERN.format(n)), exclusive=True)
+        except BlockingIOError:
+            continue
+        return MetricsStore(second_buckets, minute_buckets, regions)
+
+
+def open_slots(directory, exclude=None, second_buckets=SECOND_BUCKETS, minute_buckets=MINUTE_BUCKETS):
+    """Read-only stores over the slot files in ``directory``, other than ``exclude``."""
+    stores = []
+    for path in sorted(glob.glob(os.path.join(directory, SLOT_PATTERN.format("*")))):
+        if path == exclude:
+            continue
+        try:
+            stores.append(MetricsStore(second_buckets, minute_buckets, RegionFile(path, readonly=True)))
+        except (OSError, ValueError):
+            continue  # removed, or not yet sized by its new owner
+    return stores
@@ -0,0 +1,200 @@
+"""
+Named arrays of float64 values, or raw regions, in a memory-mapped file.
+
+Layout: an 8-byte header holding the number of bytes in use, then one
+entry per key: key length and value count (two uint32), the UTF-8 key
+padded to 8 bytes, and the values. Entries are only ever appended, and the
+header is written after the entry, so another process reading the file
+never sees a partial entry. Values are aligned 8-byte words, so a reader
+sees each one either before or after a concurrent write, never half of it.
+
+Only the owning process writes to a file; any process may read it with
+``read_values``.
+
+``RegionFile`` uses the same layout for regions that callers view through
+typed memoryviews (app.metrics_store). Those views would stop the mapping
+from being resized, so a region file is created at a fixed, sparse size:
+pages that are never written take no disk or memory.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+
+HEADER = struct.Struct("<Q")
+ENTRY = struct.Struct("<II")
+VALUE = struct.Struct("<d")
+INITIAL_SIZE = 1 << 16
+REGION_CAPACITY = 32 << 20
+
+logger = logging.getLogger(__name__)
+
+
+def _padded(length):
+    return (length + 7) & ~7
+
+
+def iter_entries(buffer):
+    """``(key, values offset, value count)`` for each entry in a mapped or read file."""
+    used = HEADER.unpack_from(buffer, 0)[0] if len(buffer) >= HEADER.size else 0
+    position = HEADER.size
+    while position < used:
+        key_length, count = ENTRY.unpack_from(buffer, position)
+        key_start = position + ENTRY.size
+        key = bytes(buffer[key_start : key_start + key_length]).decode("utf-8")
+        values = key_start + _padded(key_length)
+        yield key, values, count
+        position = values + count * VALUE.size
+
+
+def read_values(path):
+    """``{key: [values]}`` from a file written by another process."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return {key: list(struct.unpack_from(f"<{count}d", data, offset)) for key, offset, count in iter_entries(data)}
+
+
+class ValueFile:
+    """A process's own value file; ``path=None`` keeps the values in anonymous memory."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        if path:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            size = max(os.fstat(self._fd).st_size, INITIAL_SIZE)
+            os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+        else:
+            self._fd = None
+            self._map = mmap.mmap(-1, INITIAL_SIZE)
+
+        self._used = HEADER.unpack_from(self._map, 0)[0] or HEADER.size
+        # Reopening a file picks up the keys it already holds
+        self._offsets = {key: offset for key, offset, _ in iter_entries(self._map)}
+
+    def offset(self, key, count):
+        """Offset of the first of ``key``'s ``count`` values, adding the key if it is new."""
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+
+        with self._lock:
+            if key in self._offsets:
+                return self._offsets[key]
+            encoded = key.encode("utf-8")
+            offset = self._used + ENTRY.size + _padded(len(encoded))
+            end = offset + count * VALUE.size
+            if end > len(self._map):
+                self._grow(end)
+            ENTRY.pack_into(self._map, self._used, len(encoded), count)
+            self._map[self._used + ENTRY.size : self._used + ENTRY.size + len(encoded)] = encoded
+            self._used = end
+            HEADER.pack_into(self._map, 0, end)
+            self._offsets[key] = offset
+            return offset
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        if self._fd is not None:
+            os.ftruncate(self._fd, size)
+            self._map.close()
+            self._map = mmap.mmap(self._fd, size)
+        else:
+            grown = mmap.mmap(-1, size)
+            grown[: len(self._map)] = self._map[:]
+            self._map.close()
+            self._map = grown
+
+    def add(self, *increments):
+        """Add each ``(offset, amount)`` pair to the value at that offset."""
+        with self._lock:
+            for offset, amount in increments:
+                VALUE.pack_into(self._map, offset, VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def values(self):
+        """``{key: [values]}`` for this file."""
+        with self._lock:
+            return {
+                key: list(struct.unpack_from(f"<{count}d", self._map, offset))
+                for key, offset, count in iter_entries(self._map)
+            }
+
+    def close(self):
+        self._map.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class RegionFile:
+    """Named, zero-initialised byte regions in one mapped file, kept across reopening.
+
+    ``exclusive`` takes a non-blocking flock on the file for as long as the
+    process runs (raising BlockingIOError if another process holds it), and
+    ``readonly`` maps another process's file for reading. Without a path the
+    regions live in anonymous memory.
+    """
+
+    def __init__(self, path=None, capacity=REGION_CAPACITY, exclusive=False, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._fd = None
+        if path is None:
+            self._map = mmap.mmap(-1, capacity)
+        elif readonly:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            if exclusive:
+                try:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(self._fd)
+                    raise
+            size = max(os.fstat(self._fd).st_size, capacity)
+            os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+
+        self._used = HEADER.unpack_from(self._map, 0)[0] or HEADER.size
+        self._regions = {key: (offset, count * VALUE.size) for key, offset, count in iter_entries(self._map)}
+        self._full = False
+
+    def keys(self):
+        return list(self._regions)
+
+    def region(self, key, nbytes):
+        """A writable (or, for ``readonly``, read-only) view of ``key``'s ``nbytes`` bytes.
+
+        Missing keys are added, except in read-only files; there, and once
+        the file is full, the view is of zeroed memory that is not saved.
+        """
+        nbytes = _padded(nbytes)
+        with self._lock:
+            found = self._regions.get(key)
+            if found is not None and found[1] == nbytes:
+                return memoryview(self._map)[found[0] : found[0] + nbytes]
+            if self.readonly or found is not None:
+                return memoryview(bytearray(nbytes))
+
+            encoded = key.encode("utf-8")
+            offset = self._used + ENTRY.size + _padded(len(encoded))
+            if offset + nbytes > len(self._map):
+                if not self._full:
+                    logger.warning(f"{self.path or 'metrics memory'} is full; new metrics will not be saved")
+                    self._full = True
+                return memoryview(bytearray(nbytes))
+
+            ENTRY.pack_into(self._map, self._used, len(encoded), nbytes // VALUE.size)
+            self._map[self._used + ENTRY.size : self._used + ENTRY.size + len(encoded)] = encoded
+            self._used = offset + nbytes
+            HEADER.pack_into(self._map, 0, self._used)
+            self._regions[key] = (offset, nbytes)
+            return memoryview(self._map)[offset : offset + nbytes]
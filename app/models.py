@@ -1,9 +1,12 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
-from mongoengine import Document, StringField, DateTimeField, ReferenceField, ObjectIdField
+from mongoengine import Document, StringField, DateTimeField, ReferenceField, ObjectIdField, IntField
 from bson import ObjectId
 
+# Maps stored task statuses to the keys used in stats and counters
+STATUS_KEYS = {"To Do": "todo", "In Progress": "in_progress", "Completed": "completed"}
+
 
 class User(UserMixin, Document):
     meta = {"collection": "users"}
@@ -24,7 +27,25 @@ class User(UserMixin, Document):
 
 
 class Task(Document):
-    meta = {"collection": "tasks"}
+    meta = {
+        "collection": "tasks",
+        # Every task query is scoped to one user and ordered newest first, so the
+        # user prefix plus the (created_at, _id) sort key lets lists, keyset pages
+        # and dashboard counts run as index scans with no in-memory sort.
+        "indexes": [
+            ("user", "status", "-created_at", "-id"),
+            ("user", "-created_at", "-id"),
+            # The user prefix keeps each search inside one user's entries; text
+            # queries must then match user by equality, which ours always do.
+            {
+                "fields": ["user", "$title", "$description"],
+                "name": "task_text_search",
+                "weights": {"title": 5, "description": 1},
+                "default_language": "english",
+            },
+        ],
+    }
+
     title = StringField(max_length=100, required=True)
     description = StringField()
     status = StringField(max_length=20, default="To Do")  # To Do, In Progress, Completed
@@ -34,3 +55,39 @@ class Task(Document):
 
     def __repr__(self):
         return f"<Task {self.title}>"
+
+
+class TaskCounter(Document):
+    """Per-user task totals, kept in step with task writes by app.counters."""
+
+    meta = {"collection": "task_counters"}
+    user = ObjectIdField(primary_key=True)
+    total = IntField(default=0)
+    todo = IntField(default=0)
+    in_progress = IntField(default=0)
+    completed = IntField(default=0)
+
+    def __repr__(self):
+        return f"<TaskCounter {self.user}>"
+
+
+class ApiKey(Document):
+    """An API key for service integrations; only a SHA-256 hash of the key is stored."""
+
+    meta = {
+        "collection": "api_keys",
+        "indexes": [
+            {"fields": ["key_hash"], "unique": True},
+            ("user", "-created_at"),
+        ],
+    }
+
+    key_hash = StringField(max_length=64, required=True)
+    prefix = StringField(max_length=16)
+    name = StringField(max_length=100)
+    user = ReferenceField(User, required=True)
+    created_at = DateTimeField(default=datetime.utcnow)
+    revoked_at = DateTimeField()
+
+    def __repr__(self):
+        return f"<ApiKey {self.prefix}>"
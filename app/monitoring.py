@@ -6,6 +6,7 @@ for the TaskFlow application following DevSecOps best practices.
 """
 
 import logging
+import os
 import time
 import functools
 from datetime import datetime
@@ -13,80 +14,78 @@ from flask import request, g, current_app
 from werkzeug.exceptions import HTTPException
 import json
 
+from app.log_pipeline import init_logging, sample_routine
+
 
 # Configure structured logging
 def setup_logging(app):
-    """Configure comprehensive logging for the application."""
-
-    # Create formatter for structured logging
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-
-    # Configure file handler
-    file_handler = logging.FileHandler("taskflow.log")
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-
-    # Configure console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-
-    # Configure application logger
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(console_handler)
+    """Add the log file to the queued logging pipeline (see app.log_pipeline)."""
+    init_logging(app, log_file=app.config.get("LOG_FILE") or "taskflow.log")
     app.logger.setLevel(logging.INFO)
 
     # Log application startup
     app.logger.info("TaskFlow application started")
-    app.logger.info(f"Environment: {app.config.get('ENV', 'development')}")
-    app.logger.info(f"Debug mode: {app.debug}")
+    app.logger.info("Environment: %s", app.config.get("ENV", "development"))
+    app.logger.info("Debug mode: %s", app.debug)
 
 
 def log_request_info():
     """Log detailed request information for monitoring."""
     if request:
         g.start_time = time.time()
-        current_app.logger.info(
-            f"Request: {request.method} {request.path} - "
-            f"IP: {request.remote_addr} - "
-            f"User-Agent: {request.headers.get('User-Agent', 'Unknown')}"
-        )
+        # Routine request lines are sampled; the arguments are only formatted by the log listener
+        if sample_routine():
+            current_app.logger.info(
+                "Request: %s %s",
+                request.method,
+                request.path,
+                extra={
+                    "fields": {
+                        "method": request.method,
+                        "path": request.path,
+                        "ip_address": request.remote_addr,
+                        "user_agent": request.headers.get("User-Agent", "Unknown"),
+                    }
+                },
+            )
 
 
 def log_response_info(response):
     """Log response information and performance metrics."""
     if hasattr(g, "start_time"):
         duration = time.time() - g.start_time
-        current_app.logger.info(f"Response: {response.status_code} - " f"Duration: {duration:.3f}s - " f"Path: {request.path}")
+        fields = {"path": request.path, "status_code": response.status_code, "duration": round(duration, 3)}
+        if sample_routine():
+            current_app.logger.info("Response: %s %s", response.status_code, request.path, extra={"fields": fields})
 
         # Log slow requests (over 2 seconds)
         if duration > 2.0:
-            current_app.logger.warning(f"Slow request detected: {request.path} took {duration:.3f}s")
+            current_app.logger.warning(
+                "Slow request detected: %s took %.3fs", request.path, duration, extra={"fields": fields}
+            )
 
     return response
 
 
 def log_error(error):
     """Log error information with context."""
+    fields = {"path": request.path if request else "Unknown"}
     if isinstance(error, HTTPException):
-        current_app.logger.error(
-            f"HTTP Error {error.code}: {error.description} - " f"Path: {request.path if request else 'Unknown'}"
-        )
+        current_app.logger.error("HTTP Error %s: %s", error.code, error.description, extra={"fields": fields})
     else:
-        current_app.logger.error(f"Application Error: {str(error)} - " f"Path: {request.path if request else 'Unknown'}")
+        current_app.logger.error("Application Error: %s", error, extra={"fields": fields})
 
 
 def log_security_event(event_type, details):
     """Log security-related events for monitoring."""
     security_log = {
-        "timestamp": datetime.utcnow().isoformat(),
         "event_type": event_type,
         "details": details,
         "ip_address": request.remote_addr if request else "Unknown",
         "user_agent": request.headers.get("User-Agent", "Unknown") if request else "Unknown",
     }
 
-    current_app.logger.warning(f"Security Event: {json.dumps(security_log)}")
+    current_app.logger.warning("Security Event: %s", event_type, extra={"fields": security_log})
 
 
 def log_database_operation(operation, collection, duration=None, success=True):
@@ -94,9 +93,9 @@ def log_database_operation(operation, collection, duration=None, success=True):
     log_data = {"operation": operation, "collection": collection, "success": success, "duration": duration}
 
     if duration and duration > 1.0:  # Log slow database operations
-        current_app.logger.warning(f"Slow DB operation: {json.dumps(log_data)}")
+        current_app.logger.warning("Slow DB operation: %s %s", operation, collection, extra={"fields": log_data})
     else:
-        current_app.logger.info(f"DB operation: {json.dumps(log_data)}")
+        current_app.logger.info("DB operation: %s %s", operation, collection, extra={"fields": log_data})
 
 
 def log_user_activity(user_id, action, details=None):
@@ -104,25 +103,20 @@ def log_user_activity(user_id, action, details=None):
     activity_log = {
         "user_id": user_id,
         "action": action,
-        "timestamp": datetime.utcnow().isoformat(),
         "ip_address": request.remote_addr if request else "Unknown",
         "details": details,
     }
 
-    current_app.logger.info(f"User Activity: {json.dumps(activity_log)}")
+    current_app.logger.info("User Activity: %s", action, extra={"fields": activity_log})
 
 
 def log_api_usage(endpoint, method, status_code, duration=None):
     """Log API usage for monitoring and analytics."""
-    api_log = {
-        "endpoint": endpoint,
-        "method": method,
-        "status_code": status_code,
-        "duration": duration,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
+    if not sample_routine():
+        return
+    api_log = {"endpoint": endpoint, "method": method, "status_code": status_code, "duration": duration}
 
-    current_app.logger.info(f"API Usage: {json.dumps(api_log)}")
+    current_app.logger.info("API Usage: %s %s", method, endpoint, extra={"fields": api_log})
 
 
 # Performance monitoring decorator
@@ -137,16 +131,16 @@ def monitor_performance(func):
             duration = time.time() - start_time
 
             # Log performance metrics
-            current_app.logger.info(f"Function {func.__name__} completed in {duration:.3f}s")
+            current_app.logger.info("Function %s completed in %.3fs", func.__name__, duration)
 
             # Alert on slow operations
             if duration > 5.0:
-                current_app.logger.warning(f"Slow function detected: {func.__name__} took {duration:.3f}s")
+                current_app.logger.warning("Slow function detected: %s took %.3fs", func.__name__, duration)
 
             return result
         except Exception as e:
             duration = time.time() - start_time
-            current_app.logger.error(f"Function {func.__name__} failed after {duration:.3f}s: {str(e)}")
+            current_app.logger.error("Function %s failed after %.3fs: %s", func.__name__, duration, e)
             raise
 
     return wrapper
@@ -154,12 +148,36 @@ def monitor_performance(func):
 
 # Health check monitoring
 class HealthMonitor:
-    """Monitor application health and generate alerts."""
+    """Monitor application health and generate alerts.
+
+    With ``state_path``, the last check is saved there and reloaded by the
+    next worker, so a recycled worker starts from its predecessor's result.
+    """
 
-    def __init__(self, app):
+    def __init__(self, app, state_path=None):
         self.app = app
         self.health_checks = {}
-        self.last_check = None
+        self.state_path = state_path
+        self.last_check = self._load_state()
+
+    def _load_state(self):
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self):
+        # Written beside the target and renamed, so readers never see half a file
+        temporary = f"{self.state_path}.{os.getpid()}"
+        try:
+            with open(temporary, "w") as f:
+                json.dump(self.last_check, f)
+            os.replace(temporary, self.state_path)
+        except OSError as e:
+            current_app.logger.error(f"Could not save health state: {e}")
 
     def register_health_check(self, name, check_func):
         """Register a health check function."""
@@ -185,6 +203,8 @@ class HealthMonitor:
                 current_app.logger.error(f"Health check error: {name} - {str(e)}")
 
         self.last_check = {"overall_status": overall_status, "checks": results, "timestamp": datetime.utcnow().isoformat()}
+        if self.state_path:
+            self._save_state()
 
         return self.last_check
 
@@ -208,7 +228,8 @@ def init_monitoring(app):
     app.register_error_handler(Exception, log_error)
 
     # Initialize health monitor
-    health_monitor = HealthMonitor(app)
+    metrics_dir = app.config.get("METRICS_DIR")
+    health_monitor = HealthMonitor(app, os.path.join(metrics_dir, "health.json") if metrics_dir else None)
     app.health_monitor = health_monitor
 
     # Register basic health checks
@@ -228,7 +249,7 @@ def init_monitoring(app):
         try:
             import redis
 
-            r = redis.Redis(host="localhost", port=6379, db=0)
+            r = redis.Redis.from_url(current_app.config.get("REDIS_URL") or "redis://localhost:6379/0")
             r.ping()
             return True
         except Exception as e:
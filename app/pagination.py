@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination for task lists.
+
+Pages are ordered by ``(created_at, _id)`` descending and the cursor encodes
+the sort key of the last item on a page. The next page is a range query on
+the ``(user, created_at, _id)`` index, so deep pages cost the same as the
+first one, unlike ``skip()``.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app
+
+from app.models import Task
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(created_at, task_id):
+    """Encode a page position as an opaque, URL-safe string."""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(task_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into ``(created_at, task_id)``; raise ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except (ValueError, TypeError, KeyError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(created_at, task_id):
+    """Raw query matching everything after ``(created_at, task_id)`` in page order."""
+    return {"$or": [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "_id": {"$lt": task_id}}]}
+
+
+def parse_page_args(args):
+    """Read ``limit`` and ``cursor`` from request args.
+
+    Returns ``(limit, position)`` where ``position`` is a decoded cursor or
+    None. The limit is clamped to ``TASKS_MAX_PAGE_SIZE``. Raises ValueError
+    for a malformed limit or cursor.
+    """
+    max_size = current_app.config.get("TASKS_MAX_PAGE_SIZE", MAX_PAGE_SIZE)
+    limit = args.get("limit", current_app.config.get("TASKS_PAGE_SIZE", DEFAULT_PAGE_SIZE))
+
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid limit") from e
+    if limit < 1:
+        raise ValueError("Invalid limit")
+
+    cursor = args.get("cursor")
+    return min(limit, max_size), decode_cursor(cursor) if cursor else None
+
+
+def paginate(query, limit, position=None, projection=None):
+    """Return ``(docs, next_cursor)`` for one page of raw task documents.
+
+    ``query`` is a raw filter on the tasks collection. Documents come straight
+    from pymongo, so no Task objects are built. ``created_at`` is always read
+    because the cursor is made from it.
+    """
+    query, projection = page_query(query, position, projection)
+    docs = list(Task._get_collection().find(query, projection).sort(SORT).limit(limit + 1))
+    return split_page(docs, limit)
+
+
+def page_query(query, position=None, projection=None):
+    """Return the ``(filter, projection)`` that fetches the page after ``position``."""
+    if projection is not None:
+        projection = dict(projection, created_at=1)
+    if position:
+        query = dict(query, **keyset_filter(*position))
+    return query, projection
+
+
+def split_page(docs, limit):
+    """Split up to ``limit + 1`` fetched docs into ``(page, next_cursor)``."""
+    if len(docs) <= limit:
+        return docs, None
+
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
@@ -0,0 +1,213 @@
+"""
+Prometheus ``/metrics`` for TaskFlow, summed over all worker processes.
+
+Each process counts requests and latency histograms into its own
+memory-mapped file, ``METRICS_DIR/metrics-<pid>.db`` (app.mmap_values),
+without sharing locks with other processes. A scrape reads and sums every
+file in the directory, so the figures do not depend on which worker
+answers it, and it only reads, so request handling in other workers never
+waits on it. When gunicorn reports that a worker exited
+(``gunicorn.conf.py``), the worker's counts are added to ``archive.db`` and
+its file is removed, so counters keep rising across worker restarts
+without files piling up. The fold holds an exclusive flock on
+``archive.lock`` and scrapes a shared one, so a scrape never sees a
+worker's counts both in its file and in the archive.
+
+Latencies are recorded in app.histogram's log-linear buckets and exported
+with one ``le`` bucket per power of two, which are bucket edges.
+
+Without ``METRICS_DIR``, values live in anonymous memory and ``/metrics``
+reports the current process only.
+"""
+
+import fcntl
+import glob
+import json
+import os
+import time
+
+from flask import Blueprint, Response, current_app, g, request
+
+from app.histogram import BUCKETS, MAX_EXPONENT, MIN_EXPONENT, SUB_BUCKETS, bucket_index
+from app.metrics_store import status_class
+from app.mmap_values import ValueFile, read_values
+
+REQUESTS = "taskflow_http_requests_total"
+LATENCY = "taskflow_http_request_duration_seconds"
+HELP = {
+    REQUESTS: ("counter", "HTTP requests handled, by endpoint, method and status code."),
+    LATENCY: ("histogram", "HTTP request latency in seconds, by endpoint and status class."),
+}
+
+# Exported ``le`` bounds: every power of two from ~1ms to 64s, as indexes of
+# the last log-linear bucket at or below each bound
+EXPORT_EXPONENTS = range(-10, MAX_EXPONENT)
+EXPORT_BUCKETS = [(2.0**exponent, (exponent - MIN_EXPONENT) * SUB_BUCKETS) for exponent in EXPORT_EXPONENTS]
+
+ARCHIVE = "archive.db"
+LOCK = "archive.lock"
+
+metrics_bp = Blueprint("metrics", __name__)
+
+_directory = None
+_values = None
+# (endpoint, method, status code) -> offsets of its counter and histogram in _values
+_offsets = {}
+
+
+def configure(directory):
+    """Write this process's values under ``directory`` (None keeps them in memory)."""
+    global _directory, _values
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _directory = directory
+    _values = None
+    _offsets.clear()
+
+
+def process_values():
+    """This process's ValueFile, opened on first use after start-up or fork."""
+    global _values
+    if _values is None:
+        _values = ValueFile(os.path.join(_directory, f"metrics-{os.getpid()}.db") if _directory else None)
+    return _values
+
+
+def _after_fork_in_child():
+    global _values
+    # The parent's mapping and file belong to the parent
+    _values = None
+    _offsets.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def metric_key(name, **labels):
+    return json.dumps([name, sorted(labels.items())], separators=(",", ":"))
+
+
+def observe_request(endpoint, method, status_code, duration):
+    """Count one request and its latency in this process's file."""
+    values = process_values()
+    offsets = _offsets.get((endpoint, method, status_code))
+    if offsets is None:
+        offsets = _offsets[(endpoint, method, status_code)] = (
+            values.offset(metric_key(REQUESTS, endpoint=endpoint, method=method, status=str(status_code)), 1),
+            # Histogram values: the log-linear bucket counts, then the sum
+            values.offset(metric_key(LATENCY, endpoint=endpoint, status_class=status_class(status_code)), BUCKETS + 1),
+        )
+    requests, latency = offsets
+    values.add((requests, 1), (latency + 8 * bucket_index(duration), 1), (latency + 8 * BUCKETS, duration))
+
+
+def collect(directory=None):
+    """``{key: [values]}`` summed over every process file (or just this process without a directory)."""
+    directory = directory if directory is not None else _directory
+    if not directory:
+        return process_values().values()
+
+    totals = {}
+    # Shared with other scrapes; excludes a fold, which would otherwise be
+    # counted twice if it landed between the glob and the reads
+    with open(os.path.join(directory, LOCK), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            try:
+                values = read_values(path)
+            except FileNotFoundError:
+                continue
+            for key, numbers in values.items():
+                total = totals.get(key)
+                totals[key] = numbers if total is None else [a + b for a, b in zip(total, numbers)]
+    return totals
+
+
+def mark_process_dead(pid, directory=None):
+    """Fold an exited process's counts into the archive and remove its file."""
+    directory = directory or _directory
+    if not directory:
+        return
+    path = os.path.join(directory, f"metrics-{pid}.db")
+    if not os.path.exists(path):
+        return
+
+    with open(os.path.join(directory, LOCK), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = ValueFile(os.path.join(directory, ARCHIVE))
+        try:
+            for key, numbers in read_values(path).items():
+                offset = archive.offset(key, len(numbers))
+                archive.add(*((offset + 8 * i, number) for i, number in enumerate(numbers) if number))
+        finally:
+            archive.close()
+        os.remove(path)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value))
+
+
+def render(totals):
+    """Prometheus text exposition (format 0.0.4) for collected values."""
+    by_name = {}
+    for key, numbers in totals.items():
+        name, labels = json.loads(key)
+        by_name.setdefault(name, []).append((labels, numbers))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, description = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, numbers in sorted(by_name[name]):
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(numbers[0])}")
+                continue
+
+            counts, total = numbers[:BUCKETS], numbers[BUCKETS]
+            for bound, last_index in EXPORT_BUCKETS:
+                lines.append(
+                    f"{name}_bucket{_labels(labels + [['le', repr(bound)]])} {_number(sum(counts[: last_index + 1]))}"
+                )
+            lines.append(f"{name}_bucket{_labels(labels + [['le', '+Inf']])} {_number(sum(counts))}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {_number(sum(counts))}")
+    return "\n".join(lines) + "\n"
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    """Prometheus scrape endpoint"""
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    return Response(render(collect()), mimetype="text/plain; version=0.0.4")
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop("metrics_start", None)
+    if start is not None:
+        observe_request(request.endpoint or "unknown", request.method, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def init_prometheus(app):
+    """Time every request and serve ``/metrics``."""
+    configure(app.config.get("METRICS_DIR"))
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.register_blueprint(metrics_bp)
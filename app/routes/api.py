@@ -1,8 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from app import api_keys, task_search
+from app.cache import cached_view
+from app.conditional import conditional_get
 from app.models import User, Task
-from datetime import datetime
+from app.pagination import paginate, parse_page_args
+from app.serializers import parse_fields, task_from_doc, task_from_model, task_projection, task_summary, user_to_dict
+from app.stats import get_dashboard_stats
+from app.task_export import EXPORT_FORMATS, GENERATORS, export_cursor
+from app.task_import import detect_format, import_tasks, iter_records
+from app.task_bulk import MAX_BULK_ITEMS, BulkRequestError, parse_bulk_request, run_bulk
+from app.task_store import delete_task_doc, find_task, update_task_fields, validate_task_fields
+from app.counters import record_created
 
 api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
 
@@ -41,7 +51,7 @@ def register():
             jsonify(
                 {
                     "message": "User registered successfully",
-                    "user": {"id": str(user.id), "username": user.username, "email": user.email},
+                    "user": user_to_dict(user),
                 }
             ),
             201,
@@ -69,9 +79,7 @@ def login():
     if user and user.check_password(password):
         login_user(user)
         return (
-            jsonify(
-                {"message": "Login successful", "user": {"id": str(user.id), "username": user.username, "email": user.email}}
-            ),
+            jsonify({"message": "Login successful", "user": user_to_dict(user)}),
             200,
         )
     else:
@@ -90,39 +98,72 @@ def logout():
 @login_required
 def get_current_user():
     """Get current user information"""
-    return jsonify({"user": {"id": current_user.id, "username": current_user.username, "email": current_user.email}}), 200
+    return jsonify({"user": user_to_dict(current_user)}), 200
+
+
+@api_bp.route("/auth/keys", methods=["POST"])
+@login_required
+def create_api_key():
+    """Create an API key; the key itself is only returned in this response"""
+    data = request.get_json(silent=True) or {}
+    name = data.get("name")
+
+    if name is not None and (not isinstance(name, str) or len(name) > 100):
+        return jsonify({"error": "Name must be a string of at most 100 characters"}), 400
+
+    try:
+        doc, key = api_keys.create_api_key(current_user.id, name)
+        return jsonify({"message": "API key created", "key": key, "api_key": api_keys.key_from_doc(doc)}), 201
+    except Exception as e:
+        return jsonify({"error": "Failed to create API key"}), 500
+
+
+@api_bp.route("/auth/keys", methods=["GET"])
+@login_required
+def list_api_keys():
+    """List the current user's API keys (without the keys themselves)"""
+    try:
+        return jsonify({"api_keys": [api_keys.key_from_doc(doc) for doc in api_keys.list_api_keys(current_user.id)]}), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to fetch API keys"}), 500
+
+
+@api_bp.route("/auth/keys/<key_id>", methods=["DELETE"])
+@login_required
+def revoke_api_key(key_id):
+    """Revoke an API key"""
+    try:
+        doc = api_keys.revoke_api_key(current_user.id, key_id)
+        if not doc:
+            return jsonify({"error": "API key not found"}), 404
+
+        return jsonify({"message": "API key revoked", "api_key": api_keys.key_from_doc(doc)}), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to revoke API key"}), 500
 
 
 # Task endpoints
 @api_bp.route("/tasks", methods=["GET"])
 @login_required
+@conditional_get
+@cached_view()
 def get_tasks():
-    """Get all tasks for current user"""
+    """Get one page of tasks for current user, newest first"""
     status_filter = request.args.get("status")
 
+    try:
+        limit, position = parse_page_args(request.args)
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = {"user": current_user.id}
     if status_filter:
-        tasks = Task.objects(user=current_user, status=status_filter).order_by("-created_at")
-    else:
-        tasks = Task.objects(user=current_user).order_by("-created_at")
+        query["status"] = status_filter
 
-    return (
-        jsonify(
-            {
-                "tasks": [
-                    {
-                        "id": str(task.id),
-                        "title": task.title,
-                        "description": task.description,
-                        "status": task.status,
-                        "created_at": task.created_at.isoformat(),
-                        "updated_at": task.updated_at.isoformat() if task.updated_at else None,
-                    }
-                    for task in tasks
-                ]
-            }
-        ),
-        200,
-    )
+    docs, next_cursor = paginate(query, limit, position, task_projection(fields))
+
+    return jsonify({"tasks": [task_from_doc(doc, fields) for doc in docs], "next_cursor": next_cursor}), 200
 
 
 @api_bp.route("/tasks", methods=["POST"])
@@ -146,23 +187,17 @@ def create_task():
     if status not in valid_statuses:
         return jsonify({"error": "Invalid status"}), 400
 
-    task = Task(title=title, description=description, status=status, user=current_user)
+    task = Task(title=title, description=description, status=status, user=current_user.id)
 
     try:
         task.save()
+        record_created(current_user.id, task.status)
 
         return (
             jsonify(
                 {
                     "message": "Task created successfully",
-                    "task": {
-                        "id": str(task.id),
-                        "title": task.title,
-                        "description": task.description,
-                        "status": task.status,
-                        "created_at": task.created_at.isoformat(),
-                        "updated_at": task.updated_at.isoformat() if task.updated_at else None,
-                    },
+                    "task": task_from_model(task),
                 }
             ),
             201,
@@ -171,110 +206,89 @@ def create_task():
         return jsonify({"error": "Failed to create task"}), 500
 
 
+@api_bp.route("/tasks/search", methods=["GET"])
+@login_required
+@conditional_get
+@cached_view()
+def search_tasks():
+    """Full-text search over task titles and descriptions, best match first"""
+    try:
+        q, status, limit, offset = task_search.parse_search_args(request.args)
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        docs, next_cursor = task_search.search_tasks(current_user.id, q, status, limit, offset, task_projection(fields))
+    except Exception as e:
+        return jsonify({"error": "Search failed"}), 500
+
+    tasks = [dict(task_from_doc(doc, fields), score=round(doc["score"], 4)) for doc in docs]
+    return jsonify({"tasks": tasks, "next_cursor": next_cursor}), 200
+
+
 @api_bp.route("/tasks/<task_id>", methods=["GET"])
 @login_required
+@conditional_get
+@cached_view()
 def get_task(task_id):
     """Get a specific task"""
-    task = Task.objects(id=task_id, user=current_user).first()
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if not task:
+    doc = find_task(current_user.id, task_id, task_projection(fields))
+
+    if not doc:
         return jsonify({"error": "Task not found"}), 404
 
-    return (
-        jsonify(
-            {
-                "task": {
-                    "id": str(task.id),
-                    "title": task.title,
-                    "description": task.description,
-                    "status": task.status,
-                    "created_at": task.created_at.isoformat(),
-                    "updated_at": task.updated_at.isoformat() if task.updated_at else None,
-                }
-            }
-        ),
-        200,
-    )
+    return jsonify({"task": task_from_doc(doc, fields)}), 200
 
 
 @api_bp.route("/tasks/<task_id>", methods=["PUT"])
 @login_required
 def update_task(task_id):
     """Update a task"""
-    task = Task.objects(id=task_id, user=current_user).first()
-
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
-
     data = request.get_json()
 
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
-    # Update fields if provided
-    if "title" in data:
-        task.title = data["title"]
-
-    if "description" in data:
-        task.description = data["description"]
-
-    if "status" in data:
-        valid_statuses = ["To Do", "In Progress", "Completed"]
-        if data["status"] not in valid_statuses:
-            return jsonify({"error": "Invalid status"}), 400
-        task.status = data["status"]
-
-    task.updated_at = datetime.utcnow()
+    fields, error = validate_task_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
 
     try:
-        task.save()
-
-        return (
-            jsonify(
-                {
-                    "message": "Task updated successfully",
-                    "task": {
-                        "id": str(task.id),
-                        "title": task.title,
-                        "description": task.description,
-                        "status": task.status,
-                        "created_at": task.created_at.isoformat(),
-                        "updated_at": task.updated_at.isoformat() if task.updated_at else None,
-                    },
-                }
-            ),
-            200,
-        )
+        doc = update_task_fields(current_user.id, task_id, fields)
     except Exception as e:
         return jsonify({"error": "Failed to update task"}), 500
 
+    if not doc:
+        return jsonify({"error": "Task not found"}), 404
+
+    return jsonify({"message": "Task updated successfully", "task": task_from_doc(doc)}), 200
+
 
 @api_bp.route("/tasks/<task_id>", methods=["DELETE"])
 @login_required
 def delete_task(task_id):
     """Delete a task"""
-    task = Task.objects(id=task_id, user=current_user).first()
-
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
-
     try:
-        task.delete()
-
-        return jsonify({"message": "Task deleted successfully"}), 200
+        doc = delete_task_doc(current_user.id, task_id)
     except Exception as e:
         return jsonify({"error": "Failed to delete task"}), 500
 
+    if not doc:
+        return jsonify({"error": "Task not found"}), 404
+
+    return jsonify({"message": "Task deleted successfully"}), 200
+
 
 @api_bp.route("/tasks/<task_id>/status", methods=["PATCH"])
 @login_required
 def update_task_status(task_id):
     """Update task status"""
-    task = Task.objects(id=task_id, user=current_user).first()
-
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
-
     data = request.get_json()
 
     if not data or "status" not in data:
@@ -284,57 +298,100 @@ def update_task_status(task_id):
     if data["status"] not in valid_statuses:
         return jsonify({"error": "Invalid status"}), 400
 
-    task.status = data["status"]
-    task.updated_at = datetime.utcnow()
+    try:
+        doc = update_task_fields(current_user.id, task_id, {"status": data["status"]})
+    except Exception as e:
+        return jsonify({"error": "Failed to update task status"}), 500
+
+    if not doc:
+        return jsonify({"error": "Task not found"}), 404
+
+    return jsonify({"message": "Task status updated successfully", "task": task_from_doc(doc)}), 200
 
+
+@api_bp.route("/tasks/bulk", methods=["POST"])
+@login_required
+def bulk_tasks():
+    """Create, update, change the status of and delete many tasks at once"""
     try:
-        task.save()
+        parsed = parse_bulk_request(
+            request.get_json(silent=True), current_app.config.get("TASKS_BULK_MAX_ITEMS", MAX_BULK_ITEMS)
+        )
+    except BulkRequestError as e:
+        return jsonify({"error": str(e)}), 400
 
-        return (
-            jsonify(
-                {
-                    "message": "Task status updated successfully",
-                    "task": {
-                        "id": str(task.id),
-                        "title": task.title,
-                        "description": task.description,
-                        "status": task.status,
-                        "created_at": task.created_at.isoformat(),
-                        "updated_at": task.updated_at.isoformat() if task.updated_at else None,
-                    },
-                }
-            ),
-            200,
+    try:
+        results = run_bulk(current_user.id, parsed)
+    except Exception as e:
+        return jsonify({"error": "Bulk operation failed"}), 500
+
+    items = [result for section in results.values() for result in section]
+    failed = sum(1 for result in items if "error" in result)
+
+    return jsonify({"results": results, "summary": {"succeeded": len(items) - failed, "failed": failed}}), 200
+
+
+@api_bp.route("/tasks/export", methods=["GET"])
+@login_required
+def export_tasks():
+    """Stream all of the current user's tasks as NDJSON or CSV"""
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cursor = export_cursor(current_user.id, request.args.get("status"), fields)
+    mimetype, filename = EXPORT_FORMATS[export_format]
+
+    return Response(
+        stream_with_context(GENERATORS[export_format](cursor, fields)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@api_bp.route("/tasks/import", methods=["POST"])
+@login_required
+def import_tasks_upload():
+    """Import tasks from an uploaded CSV or NDJSON file"""
+    upload = request.files.get("file")
+    if not upload:
+        return jsonify({"error": "No file provided"}), 400
+
+    import_format = detect_format(upload.filename, request.form.get("format") or request.args.get("format"))
+    if not import_format:
+        return jsonify({"error": "Format must be csv or ndjson"}), 400
+
+    try:
+        summary = import_tasks(
+            current_user.id,
+            iter_records(upload.stream, import_format),
+            batch_size=current_app.config.get("TASKS_IMPORT_BATCH_SIZE", 500),
+            workers=current_app.config.get("TASKS_IMPORT_WORKERS", 0),
         )
     except Exception as e:
-        return jsonify({"error": "Failed to update task status"}), 500
+        return jsonify({"error": "Import failed"}), 500
+
+    return jsonify(summary), 200
 
 
 # Dashboard endpoints
 @api_bp.route("/dashboard", methods=["GET"])
 @login_required
+@conditional_get
 def get_dashboard():
     """Get dashboard statistics"""
-    total_tasks = Task.objects(user=current_user).count()
-    todo_tasks = Task.objects(user=current_user, status="To Do").count()
-    in_progress_tasks = Task.objects(user=current_user, status="In Progress").count()
-    completed_tasks = Task.objects(user=current_user, status="Completed").count()
-
-    recent_tasks = Task.objects(user=current_user).order_by("-created_at").limit(5)
+    stats, recent_tasks = get_dashboard_stats(current_user.id)
 
     return (
         jsonify(
             {
-                "stats": {
-                    "total": total_tasks,
-                    "todo": todo_tasks,
-                    "in_progress": in_progress_tasks,
-                    "completed": completed_tasks,
-                },
-                "recent_tasks": [
-                    {"id": str(task.id), "title": task.title, "status": task.status, "created_at": task.created_at.isoformat()}
-                    for task in recent_tasks
-                ],
+                "stats": stats,
+                "recent_tasks": [task_summary(task) for task in recent_tasks],
             }
         ),
         200,
@@ -1,9 +1,23 @@
 from flask import request, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_restx import Api, Resource, Namespace, fields
+from flask_restx import Api, Resource, Namespace, fields, marshal
+from app import api_keys
 from app.models import User, Task
-from datetime import datetime
+from app.pagination import paginate, parse_page_args
+from app.json_provider import output_json
+from app.serializers import (
+    TASK_FIELDS,
+    parse_fields,
+    task_from_doc,
+    task_from_model,
+    task_projection,
+    task_summary,
+    user_to_dict,
+)
+from app.stats import get_dashboard_stats
+from app.task_store import delete_task_doc, find_task, update_task_fields, validate_task_fields
+from app.counters import record_created
 
 # Create API instance
 api = Api(
@@ -14,6 +28,7 @@ api = Api(
     authorizations={"apikey": {"type": "apiKey", "in": "header", "name": "X-API-KEY"}},
     security="apikey",
 )
+api.representation("application/json")(output_json)
 
 # Create namespaces
 auth_ns = Namespace("auth", description="Authentication operations")
@@ -52,6 +67,25 @@ user_login_model = api.model(
     },
 )
 
+api_key_model = api.model(
+    "ApiKey",
+    {
+        "id": fields.String(readonly=True, description="API key ID"),
+        "name": fields.String(description="Label for the key"),
+        "prefix": fields.String(readonly=True, description="First characters of the key, for recognising it"),
+        "created_at": fields.String(readonly=True, description="Creation timestamp"),
+        "revoked_at": fields.String(readonly=True, description="Revocation timestamp, null while active"),
+    },
+)
+
+api_key_created_model = api.inherit(
+    "ApiKeyCreated",
+    api_key_model,
+    {"key": fields.String(readonly=True, description="The API key; send it as X-API-KEY. It is not shown again")},
+)
+
+api_key_create_model = api.model("ApiKeyCreate", {"name": fields.String(description="Label for the key")})
+
 task_model = api.model(
     "Task",
     {
@@ -64,6 +98,19 @@ task_model = api.model(
     },
 )
 
+FIELDS_PARAM_DESCRIPTION = (
+    f"Comma-separated task fields to return ({', '.join(TASK_FIELDS)}); id is always included. "
+    "Unrequested fields are not read from the database."
+)
+
+task_page_model = api.model(
+    "TaskPage",
+    {
+        "tasks": fields.List(fields.Nested(task_model), description="Tasks on this page, newest first"),
+        "next_cursor": fields.String(description="Cursor for the next page, null on the last page"),
+    },
+)
+
 task_create_model = api.model(
     "TaskCreate",
     {
@@ -134,7 +181,7 @@ class UserRegister(Resource):
         try:
             user.save()
 
-            return {"id": str(user.id), "username": user.username, "email": user.email}, 201
+            return user_to_dict(user), 201
         except Exception as e:
             api.abort(500, "Registration failed")
 
@@ -161,7 +208,7 @@ class UserLogin(Resource):
 
         if user and user.check_password(password):
             login_user(user)
-            return {"id": str(user.id), "username": user.username, "email": user.email}
+            return user_to_dict(user)
         else:
             api.abort(401, "Invalid username or password")
 
@@ -183,35 +230,88 @@ class CurrentUser(Resource):
     @login_required
     def get(self):
         """Get current user information"""
-        return {"id": str(current_user.id), "username": current_user.username, "email": current_user.email}
+        return user_to_dict(current_user)
+
+
+@auth_ns.route("/keys")
+class ApiKeyList(Resource):
+    @login_required
+    @auth_ns.marshal_list_with(api_key_model)
+    @auth_ns.doc(responses={200: "The current user's API keys", 401: "Not authenticated"})
+    def get(self):
+        """List API keys"""
+        try:
+            return [api_keys.key_from_doc(doc) for doc in api_keys.list_api_keys(current_user.id)]
+        except Exception as e:
+            api.abort(500, "Failed to fetch API keys")
+
+    @login_required
+    @auth_ns.expect(api_key_create_model)
+    @auth_ns.marshal_with(api_key_created_model, code=201)
+    @auth_ns.doc(responses={201: "API key created", 400: "Invalid name", 401: "Not authenticated"})
+    def post(self):
+        """Create an API key; the key is only returned in this response"""
+        name = (request.get_json(silent=True) or {}).get("name")
+
+        if name is not None and (not isinstance(name, str) or len(name) > 100):
+            api.abort(400, "Name must be a string of at most 100 characters")
+
+        try:
+            doc, key = api_keys.create_api_key(current_user.id, name)
+        except Exception as e:
+            api.abort(500, "Failed to create API key")
+        return dict(api_keys.key_from_doc(doc), key=key), 201
+
+
+@auth_ns.route("/keys/<key_id>")
+@auth_ns.param("key_id", "The API key identifier")
+class ApiKeyResource(Resource):
+    @login_required
+    @auth_ns.marshal_with(api_key_model)
+    @auth_ns.doc(responses={200: "API key revoked", 404: "API key not found", 401: "Not authenticated"})
+    def delete(self, key_id):
+        """Revoke an API key"""
+        try:
+            doc = api_keys.revoke_api_key(current_user.id, key_id)
+        except Exception as e:
+            api.abort(500, "Failed to revoke API key")
+        if not doc:
+            api.abort(404, "API key not found")
+        return api_keys.key_from_doc(doc)
 
 
 # Task endpoints
 @tasks_ns.route("/")
 class TaskList(Resource):
-    @tasks_ns.marshal_list_with(task_model)
-    @tasks_ns.doc(params={"status": "Filter tasks by status (To Do, In Progress, Completed)"})
+    @tasks_ns.response(200, "Success", task_page_model)
+    @tasks_ns.doc(
+        params={
+            "status": "Filter tasks by status (To Do, In Progress, Completed)",
+            "limit": "Page size (capped by the server)",
+            "cursor": "Opaque cursor from a previous page's next_cursor",
+            "fields": FIELDS_PARAM_DESCRIPTION,
+        },
+        responses={400: "Invalid limit, cursor or field name"},
+    )
     @login_required
     def get(self):
-        """Get all tasks for current user"""
+        """Get one page of tasks for current user, newest first"""
         status_filter = request.args.get("status")
 
+        try:
+            limit, position = parse_page_args(request.args)
+            fields = parse_fields(request.args.get("fields"))
+        except ValueError as e:
+            api.abort(400, str(e))
+
+        query = {"user": current_user.id}
         if status_filter:
-            tasks = Task.objects(user=current_user, status=status_filter).order_by("-created_at")
-        else:
-            tasks = Task.objects(user=current_user).order_by("-created_at")
-
-        return [
-            {
-                "id": str(task.id),
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-            }
-            for task in tasks
-        ]
+            query["status"] = status_filter
+
+        docs, next_cursor = paginate(query, limit, position, task_projection(fields))
+
+        page = {"tasks": [task_from_doc(doc) for doc in docs], "next_cursor": next_cursor}
+        return marshal(page, task_page_model, mask=f"tasks{{{','.join(fields)}}},next_cursor" if fields else None)
 
     @tasks_ns.expect(task_create_model)
     @tasks_ns.marshal_with(task_model, code=201)
@@ -235,19 +335,13 @@ class TaskList(Resource):
         if status not in valid_statuses:
             api.abort(400, "Invalid status")
 
-        task = Task(title=title, description=description, status=status, user=current_user)
+        task = Task(title=title, description=description, status=status, user=current_user.id)
 
         try:
             task.save()
+            record_created(current_user.id, task.status)
 
-            return {
-                "id": str(task.id),
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-            }, 201
+            return task_from_model(task), 201
         except Exception as e:
             api.abort(500, "Failed to create task")
 
@@ -255,83 +349,60 @@ class TaskList(Resource):
 @tasks_ns.route("/<task_id>")
 @tasks_ns.param("task_id", "The task identifier")
 class TaskResource(Resource):
-    @tasks_ns.marshal_with(task_model)
+    @tasks_ns.response(200, "Success", task_model)
+    @tasks_ns.doc(params={"fields": FIELDS_PARAM_DESCRIPTION}, responses={400: "Unknown field name", 404: "Task not found"})
     @login_required
     def get(self, task_id):
         """Get a specific task"""
-        task = Task.objects(id=task_id, user=current_user).first()
+        try:
+            fields = parse_fields(request.args.get("fields"))
+        except ValueError as e:
+            api.abort(400, str(e))
+
+        doc = find_task(current_user.id, task_id, task_projection(fields))
 
-        if not task:
+        if not doc:
             api.abort(404, "Task not found")
 
-        return {
-            "id": str(task.id),
-            "title": task.title,
-            "description": task.description,
-            "status": task.status,
-            "created_at": task.created_at,
-            "updated_at": task.updated_at,
-        }
+        return marshal(task_from_doc(doc), task_model, mask=",".join(fields) if fields else None)
 
     @tasks_ns.expect(task_update_model)
     @tasks_ns.marshal_with(task_model)
     @login_required
     def put(self, task_id):
         """Update a task"""
-        task = Task.objects(id=task_id, user=current_user).first()
-
-        if not task:
-            api.abort(404, "Task not found")
-
         data = request.get_json()
 
         if not data:
             api.abort(400, "No data provided")
 
-        # Update fields if provided
-        if "title" in data:
-            task.title = data["title"]
-
-        if "description" in data:
-            task.description = data["description"]
-
-        if "status" in data:
-            valid_statuses = ["To Do", "In Progress", "Completed"]
-            if data["status"] not in valid_statuses:
-                api.abort(400, "Invalid status")
-            task.status = data["status"]
-
-        task.updated_at = datetime.utcnow()
+        fields, error = validate_task_fields(data)
+        if error:
+            api.abort(400, error)
 
         try:
-            task.save()
-
-            return {
-                "id": str(task.id),
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-            }
+            doc = update_task_fields(current_user.id, task_id, fields)
         except Exception as e:
             api.abort(500, "Failed to update task")
 
+        if not doc:
+            api.abort(404, "Task not found")
+
+        return task_from_doc(doc)
+
     @login_required
     def delete(self, task_id):
         """Delete a task"""
-        task = Task.objects(id=task_id, user=current_user).first()
-
-        if not task:
-            api.abort(404, "Task not found")
-
         try:
-            task.delete()
-
-            return {"message": "Task deleted successfully"}
+            doc = delete_task_doc(current_user.id, task_id)
         except Exception as e:
             api.abort(500, "Failed to delete task")
 
+        if not doc:
+            api.abort(404, "Task not found")
+
+        return {"message": "Task deleted successfully"}
+
 
 @tasks_ns.route("/<task_id>/status")
 @tasks_ns.param("task_id", "The task identifier")
@@ -341,11 +412,6 @@ class TaskStatus(Resource):
     @login_required
     def patch(self, task_id):
         """Update task status"""
-        task = Task.objects(id=task_id, user=current_user).first()
-
-        if not task:
-            api.abort(404, "Task not found")
-
         data = request.get_json()
 
         if not data or "status" not in data:
@@ -355,23 +421,16 @@ class TaskStatus(Resource):
         if data["status"] not in valid_statuses:
             api.abort(400, "Invalid status")
 
-        task.status = data["status"]
-        task.updated_at = datetime.utcnow()
-
         try:
-            task.save()
-
-            return {
-                "id": str(task.id),
-                "title": task.title,
-                "description": task.description,
-                "status": task.status,
-                "created_at": task.created_at,
-                "updated_at": task.updated_at,
-            }
+            doc = update_task_fields(current_user.id, task_id, {"status": data["status"]})
         except Exception as e:
             api.abort(500, "Failed to update task status")
 
+        if not doc:
+            api.abort(404, "Task not found")
+
+        return task_from_doc(doc)
+
 
 # Dashboard endpoints
 @dashboard_ns.route("/")
@@ -380,24 +439,11 @@ class Dashboard(Resource):
     @login_required
     def get(self):
         """Get dashboard statistics"""
-        total_tasks = Task.objects(user=current_user).count()
-        todo_tasks = Task.objects(user=current_user, status="To Do").count()
-        in_progress_tasks = Task.objects(user=current_user, status="In Progress").count()
-        completed_tasks = Task.objects(user=current_user, status="Completed").count()
-
-        recent_tasks = Task.objects(user=current_user).order_by("-created_at").limit(5)
+        stats, recent_tasks = get_dashboard_stats(current_user.id)
 
         return {
-            "stats": {
-                "total": total_tasks,
-                "todo": todo_tasks,
-                "in_progress": in_progress_tasks,
-                "completed": completed_tasks,
-            },
-            "recent_tasks": [
-                {"id": str(task.id), "title": task.title, "status": task.status, "created_at": task.created_at.isoformat()}
-                for task in recent_tasks
-            ],
+            "stats": stats,
+            "recent_tasks": [task_summary(task) for task in recent_tasks],
         }
 
 
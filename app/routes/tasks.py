@@ -1,6 +1,11 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
 from app.models import Task
+from app.pagination import paginate, parse_page_args
+from app.serializers import TASK_PROJECTION, task_from_doc
+from app.task_search import parse_search_args, search_tasks
+from app.task_store import delete_task_doc, find_task, update_task_fields, validate_task_fields
+from app.counters import record_created
 
 tasks_bp = Blueprint("tasks", __name__)
 
@@ -9,13 +14,31 @@ tasks_bp = Blueprint("tasks", __name__)
 @login_required
 def task_list():
     status_filter = request.args.get("status", "all")
-
-    if status_filter == "all":
-        tasks = Task.objects(user=current_user).order_by("-created_at")
+    search = request.args.get("q", "").strip()
+
+    if search:
+        try:
+            q, status, limit, offset = parse_search_args(request.args)
+        except ValueError as e:
+            flash(str(e), "error")
+            return redirect(url_for("tasks.task_list", status=status_filter))
+        docs, next_cursor = search_tasks(current_user.id, q, status, limit, offset, TASK_PROJECTION)
     else:
-        tasks = Task.objects(user=current_user, status=status_filter).order_by("-created_at")
+        try:
+            limit, position = parse_page_args(request.args)
+        except ValueError:
+            abort(400)
+
+        query = {"user": current_user.id}
+        if status_filter != "all":
+            query["status"] = status_filter
+        docs, next_cursor = paginate(query, limit, position, TASK_PROJECTION)
+
+    tasks = [task_from_doc(doc) for doc in docs]
 
-    return render_template("tasks/list.html", tasks=tasks, current_filter=status_filter)
+    return render_template(
+        "tasks/list.html", tasks=tasks, current_filter=status_filter, search=search, next_cursor=next_cursor
+    )
 
 
 @tasks_bp.route("/tasks/new", methods=["GET", "POST"])
@@ -30,8 +53,9 @@ def create_task():
             flash("Task title is required.", "error")
             return render_template("tasks/create.html")
 
-        task = Task(title=title, description=description, status=status, user=current_user)
+        task = Task(title=title, description=description, status=status, user=current_user.id)
         task.save()
+        record_created(current_user.id, task.status)
 
         flash("Task created successfully!", "success")
         return redirect(url_for("tasks.task_list"))
@@ -42,42 +66,36 @@ def create_task():
 @tasks_bp.route("/tasks/<task_id>/edit", methods=["GET", "POST"])
 @login_required
 def edit_task(task_id):
-    task = Task.objects(id=task_id).first()
-    if not task:
-        abort(404)
-
-    if task.user != current_user:
-        flash("You can only edit your own tasks.", "error")
-        return redirect(url_for("tasks.task_list"))
-
     if request.method == "POST":
-        task.title = request.form.get("title")
-        task.description = request.form.get("description")
-        task.status = request.form.get("status")
+        form = {
+            "title": request.form.get("title"),
+            "description": request.form.get("description", ""),
+            "status": request.form.get("status"),
+        }
+        fields, error = validate_task_fields(form)
+        if error:
+            flash("Task title is required." if error == "Title is required" else error, "error")
+            return render_template("tasks/edit.html", task=dict(form, id=task_id))
+
+        if not update_task_fields(current_user.id, task_id, fields):
+            abort(404)
 
-        if not task.title:
-            flash("Task title is required.", "error")
-            return render_template("tasks/edit.html", task=task)
-
-        task.save()
         flash("Task updated successfully!", "success")
         return redirect(url_for("tasks.task_list"))
 
-    return render_template("tasks/edit.html", task=task)
+    doc = find_task(current_user.id, task_id, TASK_PROJECTION)
+    if not doc:
+        abort(404)
+
+    return render_template("tasks/edit.html", task=task_from_doc(doc))
 
 
 @tasks_bp.route("/tasks/<task_id>/delete", methods=["POST"])
 @login_required
 def delete_task(task_id):
-    task = Task.objects(id=task_id).first()
-    if not task:
+    if not delete_task_doc(current_user.id, task_id):
         abort(404)
 
-    if task.user != current_user:
-        flash("You can only delete your own tasks.", "error")
-        return redirect(url_for("tasks.task_list"))
-
-    task.delete()
     flash("Task deleted successfully!", "success")
     return redirect(url_for("tasks.task_list"))
 
@@ -85,17 +103,11 @@ def delete_task(task_id):
 @tasks_bp.route("/tasks/<task_id>/status", methods=["POST"])
 @login_required
 def update_status(task_id):
-    task = Task.objects(id=task_id).first()
-    if not task:
-        abort(404)
-
-    if task.user != current_user:
-        return jsonify({"error": "Unauthorized"}), 403
-
     new_status = request.json.get("status")
-    if new_status in ["To Do", "In Progress", "Completed"]:
-        task.status = new_status
-        task.save()
-        return jsonify({"success": True, "status": new_status})
+    if new_status not in ["To Do", "In Progress", "Completed"]:
+        return jsonify({"error": "Invalid status"}), 400
+
+    if not update_task_fields(current_user.id, task_id, {"status": new_status}):
+        abort(404)
 
-    return jsonify({"error": "Invalid status"}), 400
+    return jsonify({"success": True, "status": new_status})
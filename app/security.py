@@ -15,7 +15,6 @@ import time
 from functools import wraps
 from flask import request, jsonify, current_app, g
 from flask_login import current_user
-import bleach
 
 # Rate limiting storage (in production, use Redis)
 _rate_limit_storage = {}
@@ -26,6 +25,9 @@ def sanitize_input(input_string):
     if not input_string:
         return ""
 
+    # bleach (and html5lib) load on first use rather than with the API blueprint
+    import bleach
+
     # Remove potentially dangerous HTML tags
     allowed_tags = ["b", "i", "em", "strong", "p", "br"]
     allowed_attributes = {}
@@ -206,7 +208,7 @@ def validate_task_data(data):
     # Validate status
     if "status" in data:
         status = data["status"]
-        valid_statuses = ["todo", "in_progress", "completed"]
+        valid_statuses = ["To Do", "In Progress", "Completed"]
         if status not in valid_statuses:
             errors.append(f"Status must be one of: {', '.join(valid_statuses)}")
 
@@ -0,0 +1,104 @@
+"""
+Serializers for task and user responses.
+
+Read-only endpoints fetch tasks as plain pymongo documents and convert them
+here, without building mongoengine Task objects or touching the User
+reference. Datetimes are left as they are: the app's JSON provider
+(app.json_provider) encodes them, so the HTML views and the JSON API share
+the same dicts.
+"""
+
+# Fields a task response can contain, in response order
+TASK_FIELDS = ("id", "title", "description", "status", "created_at", "updated_at")
+
+# Fields of the recent tasks listed on the dashboard
+TASK_SUMMARY_FIELDS = ("id", "title", "status", "created_at")
+
+# Fields returned for a task; "_id" is always included by MongoDB
+TASK_PROJECTION = {"title": 1, "description": 1, "status": 1, "created_at": 1, "updated_at": 1}
+
+
+def parse_fields(value):
+    """Parse a ``fields=`` query value such as ``"title,status"``.
+
+    Returns a tuple of task fields, always including ``id``, or None when no
+    fields were requested. Raises ValueError naming any unknown field.
+    """
+    if not value:
+        return None
+
+    requested = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    if not requested:
+        return None
+
+    return tuple(name for name in TASK_FIELDS if name == "id" or name in requested)
+
+
+def task_projection(fields=None):
+    """MongoDB projection that reads only the requested task fields."""
+    if fields is None:
+        return TASK_PROJECTION
+    return {name: 1 for name in fields if name != "id"} or {"_id": 1}
+
+
+def task_from_doc(doc, fields=None):
+    """Convert a raw task document into a task dict, keeping datetimes.
+
+    With ``fields`` (see parse_fields) only those keys are returned.
+    """
+    task = {
+        "id": str(doc["_id"]),
+        "title": doc.get("title"),
+        "description": doc.get("description"),
+        "status": doc.get("status"),
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at"),
+    }
+    if fields is not None:
+        return {name: task[name] for name in fields}
+    return task
+
+
+def task_from_model(task):
+    """Convert a mongoengine Task into a task dict without dereferencing its user."""
+    return {
+        "id": str(task.id),
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+    }
+
+
+def task_summary(task):
+    """Trim a task dict to the fields shown for recent tasks."""
+    return {name: task.get(name) for name in TASK_SUMMARY_FIELDS}
+
+
+def user_to_dict(user):
+    """Public fields of a User or CachedUser."""
+    return {"id": str(user.id), "username": user.username, "email": user.email}
+
+
+def task_json_from_doc(doc, fields=None):
+    """Like task_from_doc, but with ISO 8601 strings for the dates.
+
+    For output that does not go through the JSON provider, such as exports.
+    """
+    created_at = doc.get("created_at")
+    updated_at = doc.get("updated_at")
+    task = {
+        "id": str(doc["_id"]),
+        "title": doc.get("title"),
+        "description": doc.get("description"),
+        "status": doc.get("status"),
+        "created_at": created_at.isoformat() if created_at else None,
+        "updated_at": updated_at.isoformat() if updated_at else None,
+    }
+    if fields is not None:
+        return {name: task[name] for name in fields}
+    return task
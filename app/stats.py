@@ -0,0 +1,74 @@
+"""
+Dashboard statistics for TaskFlow.
+
+Counts come from the user's ``task_counters`` document (see app.counters) and
+the recent tasks from one indexed query. The first dashboard load for a user
+without counters falls back to a single ``$facet`` aggregation that returns
+both, and seeds the counters from it (app.counters recounts once after
+seeding, so writes that raced the aggregation are not lost).
+"""
+
+from app.cache import cached
+from app.counters import COUNTER_FIELDS, counts_to_counters, get_counters, seed_counters
+from app.models import Task
+
+RECENT_TASKS_LIMIT = 5
+
+RECENT_TASK_PROJECTION = {"title": 1, "description": 1, "status": 1, "created_at": 1}
+
+
+def build_dashboard_pipeline(user_id, recent_limit=RECENT_TASKS_LIMIT):
+    """Build the aggregation pipeline for a user's dashboard."""
+    return [
+        {"$match": {"user": user_id}},
+        {
+            "$facet": {
+                "counts": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                "recent": [
+                    {"$sort": {"created_at": -1}},
+                    {"$limit": recent_limit},
+                    {"$project": RECENT_TASK_PROJECTION},
+                ],
+            }
+        },
+    ]
+
+
+def recent_task_from_doc(doc):
+    """Convert a raw task document into the dict used for recent tasks."""
+    return {
+        "id": str(doc["_id"]),
+        "title": doc.get("title"),
+        "description": doc.get("description"),
+        "status": doc.get("status"),
+        "created_at": doc.get("created_at"),
+    }
+
+
+def aggregate_dashboard_stats(user_id, recent_limit=RECENT_TASKS_LIMIT):
+    """Return ``(counts, recent_docs)`` from one ``$facet`` aggregation."""
+    cursor = Task._get_collection().aggregate(build_dashboard_pipeline(user_id, recent_limit))
+    result = next(cursor, None) or {"counts": [], "recent": []}
+
+    return {row["_id"]: row["count"] for row in result["counts"]}, result["recent"]
+
+
+@cached("dashboard")
+def get_dashboard_stats(user_id, recent_limit=RECENT_TASKS_LIMIT):
+    """Return ``(stats, recent_tasks)`` for a user.
+
+    ``stats`` holds ``total``, ``todo``, ``in_progress`` and ``completed``;
+    ``recent_tasks`` is a list of dicts, newest first.
+    """
+    counters = get_counters(user_id)
+
+    if counters is None:
+        counts, recent = aggregate_dashboard_stats(user_id, recent_limit)
+        stats = counts_to_counters(seed_counters(user_id, counts))
+    else:
+        stats = {field: counters.get(field, 0) for field in COUNTER_FIELDS}
+        recent = (
+            Task._get_collection().find({"user": user_id}, RECENT_TASK_PROJECTION).sort("created_at", -1).limit(recent_limit)
+        )
+
+    return stats, [recent_task_from_doc(doc) for doc in recent]
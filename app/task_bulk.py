@@ -0,0 +1,219 @@
+"""
+Bulk task writes for TaskFlow.
+
+A bulk request carries arrays of creates, updates, status changes and
+deletes. Items are validated up front, then everything runs as one unordered
+``bulk_write`` scoped to the requesting user. One owner-scoped read
+beforehand finds the status of each task whose status changes or that is
+deleted. Those writes also filter on that status, so a task changed or
+deleted in between matches nothing instead of moving the counters by a
+stale status. When the write matches fewer tasks than expected, one more
+read tells which items missed, and they are reported instead of counted.
+"""
+
+from collections import Counter
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.counters import apply_delta, status_delta
+from app.models import STATUS_KEYS, Task
+from app.task_store import to_object_id, validate_task_fields
+
+SECTIONS = ("create", "update", "status", "delete")
+
+MAX_BULK_ITEMS = 500
+
+
+NOT_FOUND = "Task not found"
+CONFLICT = "Task was changed by another request"
+
+
+class BulkRequestError(ValueError):
+    """The bulk request as a whole is malformed."""
+
+
+def parse_bulk_request(data, max_items=MAX_BULK_ITEMS):
+    """Validate a bulk request body.
+
+    Returns ``{section: [(index, payload, error), ...]}``. Raises
+    BulkRequestError when the body itself is unusable.
+    """
+    if not isinstance(data, dict):
+        raise BulkRequestError("No data provided")
+
+    unknown = set(data) - set(SECTIONS)
+    if unknown:
+        raise BulkRequestError(f"Unknown section(s): {', '.join(sorted(unknown))}")
+
+    for section in SECTIONS:
+        if not isinstance(data.get(section, []), list):
+            raise BulkRequestError(f"{section} must be a list")
+
+    total = sum(len(data.get(section, [])) for section in SECTIONS)
+    if total == 0:
+        raise BulkRequestError("No operations provided")
+    if total > max_items:
+        raise BulkRequestError(f"At most {max_items} operations per request")
+
+    parsed = {section: [] for section in SECTIONS}
+    seen_ids = set()
+
+    def claim(raw_id):
+        oid = to_object_id(raw_id) if isinstance(raw_id, (str, ObjectId)) else None
+        if oid is None:
+            return None, "Invalid task id"
+        if oid in seen_ids:
+            return None, "Task appears more than once in this request"
+        seen_ids.add(oid)
+        return oid, None
+
+    for index, item in enumerate(data.get("create", [])):
+        fields, error = validate_task_fields(item, require_title=True)
+        parsed["create"].append((index, fields, error))
+
+    for index, item in enumerate(data.get("update", [])):
+        fields, error = validate_task_fields(item)
+        if not error and not fields:
+            error = "No fields to update"
+        oid = None
+        if not error:
+            oid, error = claim(item.get("id"))
+        parsed["update"].append((index, (oid, fields), error))
+
+    for index, item in enumerate(data.get("status", [])):
+        if not isinstance(item, dict):
+            parsed["status"].append((index, None, "Item must be an object"))
+        elif item.get("status") not in STATUS_KEYS:
+            parsed["status"].append((index, None, "Invalid status"))
+        else:
+            oid, error = claim(item.get("id"))
+            parsed["status"].append((index, (oid, {"status": item["status"]}), error))
+
+    for index, raw_id in enumerate(data.get("delete", [])):
+        oid, error = claim(raw_id)
+        parsed["delete"].append((index, oid, error))
+
+    return parsed
+
+
+def run_bulk(user_id, parsed):
+    """Apply a parsed bulk request for ``user_id``.
+
+    Returns ``{section: [result, ...]}`` in request order, where each result
+    has the item's ``index`` and either ``id`` or ``error``.
+    """
+    collection = Task._get_collection()
+    now = datetime.utcnow()
+
+    results = {section: [None] * len(items) for section, items in parsed.items()}
+    for section, items in parsed.items():
+        for index, _, error in items:
+            if error:
+                results[section][index] = {"index": index, "error": error}
+
+    # One owner-scoped read of the statuses that status changes and deletes start from
+    target_ids = [oid for _, _, (oid, fields) in _valid(parsed, "update", "status") if "status" in fields]
+    target_ids += [oid for _, _, oid in _valid(parsed, "delete")]
+    current = {}
+    if target_ids:
+        for doc in collection.find({"_id": {"$in": target_ids}, "user": user_id}, {"status": 1}):
+            current[doc["_id"]] = doc.get("status")
+
+    # (section, index, task id, kind, status after the write, counter delta), one per request
+    requests, pending = [], []
+
+    for index, fields, error in parsed["create"]:
+        if error:
+            continue
+        doc = dict(fields, _id=ObjectId(), user=user_id, created_at=now, updated_at=now)
+        doc.setdefault("description", "")
+        requests.append(InsertOne(doc))
+        pending.append(("create", index, doc["_id"], "create", None, status_delta(doc["status"], 1)))
+
+    for section, index, (oid, fields) in _valid(parsed, "update", "status"):
+        changes = {"$set": dict(fields, updated_at=now)}
+        if "status" not in fields:
+            requests.append(UpdateOne({"_id": oid, "user": user_id}, changes))
+            pending.append((section, index, oid, "update", None, {}))
+        elif oid not in current:
+            results[section][index] = {"index": index, "error": NOT_FOUND}
+        else:
+            requests.append(UpdateOne({"_id": oid, "user": user_id, "status": current[oid]}, changes))
+            delta = Counter(status_delta(current[oid], -1))
+            delta.update(status_delta(fields["status"], 1))
+            pending.append((section, index, oid, "update", fields["status"], delta))
+
+    for _, index, oid in _valid(parsed, "delete"):
+        if oid not in current:
+            results["delete"][index] = {"index": index, "error": NOT_FOUND}
+            continue
+        requests.append(DeleteOne({"_id": oid, "user": user_id, "status": current[oid]}))
+        pending.append(("delete", index, oid, "delete", None, status_delta(current[oid], -1)))
+
+    failed, matched, deleted = {}, 0, 0
+    if requests:
+        try:
+            result = collection.bulk_write(requests, ordered=False)
+            matched, deleted = result.matched_count, result.deleted_count
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+            matched, deleted = e.details.get("nMatched", 0), e.details.get("nRemoved", 0)
+
+    written = [(position, item) for position, item in enumerate(pending) if position not in failed]
+    misses = _find_misses(collection, user_id, written, matched, deleted)
+
+    delta = Counter()
+    for position, (section, index, oid, _, _, item_delta) in enumerate(pending):
+        if position in failed:
+            results[section][index] = {"index": index, "id": str(oid), "error": failed[position]}
+        elif position in misses:
+            results[section][index] = {"index": index, "error": misses[position]}
+        else:
+            results[section][index] = {"index": index, "id": str(oid)}
+            delta.update(item_delta)
+
+    # Also bumps the counters version for field-only edits
+    apply_delta(user_id, dict(delta))
+    return results
+
+
+def _valid(parsed, *sections):
+    """``(section, index, payload)`` for the items of ``sections`` that passed validation."""
+    return [(section, index, payload) for section in sections for index, payload, error in parsed[section] if not error]
+
+
+def _find_misses(collection, user_id, written, matched, deleted):
+    """``{position: error}`` for the writes that matched no task.
+
+    Only reads when the bulk write matched or deleted fewer tasks than it was
+    sent. A task that is gone was deleted, by this request or another; when
+    fewer deletes matched than tasks are gone, the surplus is reported as not
+    found, so the counters only move for as many deletes as took effect.
+    """
+    updates = [(position, item) for position, item in written if item[3] == "update"]
+    deletes = [(position, item) for position, item in written if item[3] == "delete"]
+    if (not updates or matched >= len(updates)) and (not deletes or deleted >= len(deletes)):
+        return {}
+
+    ids = [item[2] for _, item in updates + deletes]
+    after = {doc["_id"]: doc.get("status") for doc in collection.find({"_id": {"$in": ids}, "user": user_id}, {"status": 1})}
+
+    misses = {}
+    for position, (_, _, oid, _, new_status, _) in updates:
+        if oid not in after:
+            misses[position] = NOT_FOUND
+        elif new_status is not None and after[oid] != new_status:
+            misses[position] = CONFLICT
+
+    gone = 0
+    for position, (_, _, oid, _, _, _) in deletes:
+        if oid in after:
+            misses[position] = CONFLICT
+        else:
+            gone += 1
+            if gone > deleted:
+                misses[position] = NOT_FOUND
+    return misses
@@ -0,0 +1,74 @@
+"""
+Streaming task export for TaskFlow.
+
+Tasks are read through a batched pymongo cursor and written out as NDJSON or
+CSV a chunk at a time, so memory stays flat however many tasks a user has.
+"""
+
+import csv
+import io
+
+from app.json_provider import dumps_bytes
+from app.models import Task
+from app.pagination import SORT
+from app.serializers import TASK_FIELDS, task_from_doc, task_json_from_doc, task_projection
+
+EXPORT_BATCH_SIZE = 500
+
+# Flush the output buffer to the client once it holds this many characters
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "tasks.ndjson"),
+    "csv": ("text/csv", "tasks.csv"),
+}
+
+
+def export_cursor(user_id, status=None, fields=None, batch_size=EXPORT_BATCH_SIZE):
+    """Open a batched cursor over a user's tasks, newest first."""
+    query = {"user": user_id}
+    if status:
+        query["status"] = status
+    return Task._get_collection().find(query, task_projection(fields)).sort(SORT).batch_size(batch_size)
+
+
+def _chunked(cursor, write_row, buffer, chunk_size):
+    try:
+        for doc in cursor:
+            write_row(doc)
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        cursor.close()
+
+
+def generate_ndjson(cursor, fields=None, chunk_size=CHUNK_SIZE):
+    """Yield NDJSON chunks, one task object per line."""
+    buffer = io.StringIO()
+
+    def write_row(doc):
+        buffer.write(dumps_bytes(task_from_doc(doc, fields)).decode())
+        buffer.write("\n")
+
+    return _chunked(cursor, write_row, buffer, chunk_size)
+
+
+def generate_csv(cursor, fields=None, chunk_size=CHUNK_SIZE):
+    """Yield CSV chunks with a header row."""
+    buffer = io.StringIO()
+    columns = fields or TASK_FIELDS
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    def write_row(doc):
+        task = task_json_from_doc(doc, fields)
+        writer.writerow([task[column] for column in columns])
+
+    return _chunked(cursor, write_row, buffer, chunk_size)
+
+
+GENERATORS = {"ndjson": generate_ndjson, "csv": generate_csv}
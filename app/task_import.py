@@ -0,0 +1,202 @@
+"""
+Streaming task import for TaskFlow.
+
+An uploaded CSV or NDJSON file is parsed row by row. Rows are grouped into
+fixed-size batches, each batch is validated and sanitized with the rules in
+app.security (spread over a process pool, since bleach is CPU-bound), and the
+accepted rows are written with one ``insert_many`` per batch. Only a bounded
+number of batches is in flight at once, so memory does not grow with the
+file size.
+"""
+
+import csv
+import io
+import json
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from app.counters import apply_delta, status_delta
+from app.models import Task
+from app.security import validate_task_data
+
+IMPORT_BATCH_SIZE = 500
+
+# Rejected rows reported back in full; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+TITLE_MAX_LENGTH = Task.title.max_length
+
+_pool = None
+_pool_size = None
+
+
+def detect_format(filename, requested=None):
+    """Pick the import format from an explicit value or the file extension."""
+    if requested:
+        return requested if requested in IMPORT_FORMATS else None
+    extension = os.path.splitext(filename or "")[1].lower()
+    return {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(extension)
+
+
+def iter_records(stream, import_format):
+    """Yield ``(row_number, record)`` from a binary upload stream.
+
+    ``record`` is a dict, or a string describing why the row is unreadable.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+
+    if import_format == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, row
+        return
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row_number, "Invalid JSON"
+            continue
+        yield row_number, record if isinstance(record, dict) else "Row must be a JSON object"
+
+
+def clean_batch(batch):
+    """Validate and sanitize a batch of records.
+
+    Returns ``[(row_number, fields, errors), ...]``; ``fields`` is None for a
+    rejected row. Runs in pool workers, so it must stay importable and pure.
+    """
+    cleaned = []
+    for row_number, record in batch:
+        if isinstance(record, str):
+            cleaned.append((row_number, None, [record]))
+            continue
+
+        data = {"title": record.get("title") or ""}
+        for key in ("description", "status"):
+            if record.get(key):
+                data[key] = record[key]
+        if not all(isinstance(value, str) for value in data.values()):
+            cleaned.append((row_number, None, ["Fields must be strings"]))
+            continue
+
+        errors = validate_task_data(data)
+        # Checked again after sanitizing, which can empty or lengthen the title;
+        # the raw insert_many skips the model's own validation
+        if not errors and not data["title"].strip():
+            errors.append("Title is required")
+        elif not errors and len(data["title"]) > TITLE_MAX_LENGTH:
+            errors.append(f"Title must be at most {TITLE_MAX_LENGTH} characters")
+
+        if errors:
+            cleaned.append((row_number, None, errors))
+        else:
+            data.setdefault("description", "")
+            data.setdefault("status", "To Do")
+            cleaned.append((row_number, data, []))
+    return cleaned
+
+
+def get_pool(workers):
+    """Return the process pool for sanitizing batches, or None to run inline."""
+    global _pool, _pool_size
+    if workers <= 0:
+        return None
+    if _pool is None or _pool_size != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool, _pool_size = ProcessPoolExecutor(max_workers=workers), workers
+    return _pool
+
+
+def _batches(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportSummary:
+    """Running totals for one import."""
+
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, row_number, errors):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def to_dict(self):
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+
+def _write_batch(user_id, cleaned, summary):
+    now = datetime.utcnow()
+    rows, docs = [], []
+    for row_number, fields, errors in cleaned:
+        if fields is None:
+            summary.reject(row_number, errors)
+        else:
+            rows.append(row_number)
+            docs.append(dict(fields, user=user_id, created_at=now, updated_at=now))
+
+    if not docs:
+        return
+
+    failed = {}
+    try:
+        Task._get_collection().insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+
+    delta = Counter()
+    for index, (row_number, doc) in enumerate(zip(rows, docs)):
+        if index in failed:
+            summary.reject(row_number, [failed[index]])
+        else:
+            summary.accepted += 1
+            delta.update(status_delta(doc["status"], 1))
+    apply_delta(user_id, dict(delta))
+
+
+def import_tasks(user_id, records, batch_size=IMPORT_BATCH_SIZE, workers=0):
+    """Import ``(row_number, record)`` pairs for ``user_id``; return the summary dict."""
+    summary = ImportSummary()
+    pool = get_pool(workers)
+
+    if pool is None:
+        for batch in _batches(records, batch_size):
+            _write_batch(user_id, clean_batch(batch), summary)
+        return summary.to_dict()
+
+    # Keep at most two batches per worker in flight and write them in file order
+    in_flight = deque()
+    for batch in _batches(records, batch_size):
+        in_flight.append(pool.submit(clean_batch, batch))
+        if len(in_flight) >= workers * 2:
+            _write_batch(user_id, in_flight.popleft().result(), summary)
+    while in_flight:
+        _write_batch(user_id, in_flight.popleft().result(), summary)
+
+    return summary.to_dict()
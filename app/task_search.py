@@ -0,0 +1,104 @@
+"""
+Full-text task search.
+
+Searches run on the ``(user, title, description)`` text index, so a query
+only touches the requesting user's index entries, and results come back in
+relevance order. Relevance scores cannot be range-queried, so search pages
+use an offset cursor instead of the keyset cursor used by task lists; depth
+is capped at ``SEARCH_MAX_RESULTS`` to keep ``skip()`` bounded.
+"""
+
+import base64
+import json
+
+from flask import current_app
+
+from app.models import STATUS_KEYS, Task
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+SEARCH_MAX_RESULTS = 1000
+MAX_QUERY_LENGTH = 200
+
+SCORE = {"$meta": "textScore"}
+# Ties in relevance fall back to newest first
+SEARCH_SORT = [("score", SCORE), ("created_at", -1), ("_id", -1)]
+
+
+def encode_offset(offset):
+    payload = json.dumps({"o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_offset(cursor):
+    """Decode a search cursor into an offset; raise ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded.encode()))["o"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(offset, int) or not 0 <= offset < SEARCH_MAX_RESULTS:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def parse_search_args(args):
+    """Read ``q``, ``status``, ``limit`` and ``cursor`` from request args.
+
+    Returns ``(q, status, limit, offset)``. Raises ValueError for a missing or
+    overlong query, an unknown status or a malformed limit or cursor.
+    """
+    q = (args.get("q") or "").strip()
+    if not q:
+        raise ValueError("Search query is required")
+    if len(q) > MAX_QUERY_LENGTH:
+        raise ValueError(f"Search query must be at most {MAX_QUERY_LENGTH} characters")
+
+    status = args.get("status")
+    if status in (None, "", "all"):
+        status = None
+    elif status not in STATUS_KEYS:
+        raise ValueError("Invalid status")
+
+    max_size = current_app.config.get("TASKS_MAX_PAGE_SIZE", MAX_PAGE_SIZE)
+    try:
+        limit = int(args.get("limit", current_app.config.get("TASKS_PAGE_SIZE", DEFAULT_PAGE_SIZE)))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid limit") from e
+    if limit < 1:
+        raise ValueError("Invalid limit")
+
+    cursor = args.get("cursor")
+    offset = decode_offset(cursor) if cursor else 0
+
+    return q, status, min(limit, max_size), offset
+
+
+def search_query(user_id, q, status=None):
+    query = {"user": user_id, "$text": {"$search": q}}
+    if status:
+        query["status"] = status
+    return query
+
+
+def search_tasks(user_id, q, status=None, limit=DEFAULT_PAGE_SIZE, offset=0, projection=None):
+    """Return ``(docs, next_cursor)`` for one page of search results, best match first.
+
+    Each doc carries its relevance as ``score``.
+    """
+    limit = min(limit, SEARCH_MAX_RESULTS - offset)
+    projection = dict(projection or {"_id": 1}, score=SCORE)
+
+    docs = list(
+        Task._get_collection()
+        .find(search_query(user_id, q, status), projection)
+        .sort(SEARCH_SORT)
+        .skip(offset)
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        if offset + limit < SEARCH_MAX_RESULTS:
+            next_cursor = encode_offset(offset + limit)
+    return docs, next_cursor
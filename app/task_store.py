@@ -0,0 +1,116 @@
+"""
+Owner-scoped raw access to the tasks collection.
+
+Every lookup filters on both the task id and the owning user's id, so a task
+that belongs to someone else is indistinguishable from one that does not
+exist, and no User reference is ever dereferenced.
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.counters import record_deleted, record_status_change
+from app.models import STATUS_KEYS, Task
+from app.serializers import TASK_PROJECTION
+
+TITLE_MAX_LENGTH = Task.title.max_length
+
+
+def utcnow():
+    """Current UTC time truncated to the millisecond precision MongoDB stores."""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def to_object_id(task_id):
+    """Return ``task_id`` as an ObjectId, or None if it is not a valid id."""
+    if isinstance(task_id, ObjectId):
+        return task_id
+    return ObjectId(task_id) if ObjectId.is_valid(task_id) else None
+
+
+def find_task(user_id, task_id, projection=None):
+    """Return the raw task document owned by ``user_id``, or None."""
+    oid = to_object_id(task_id)
+    if oid is None:
+        return None
+    return Task._get_collection().find_one({"_id": oid, "user": user_id}, projection)
+
+
+def validate_task_fields(data, require_title=False):
+    """Pick the writable task fields out of ``data`` and validate them.
+
+    Returns ``(fields, error)``; ``error`` is None when ``fields`` is usable.
+    With ``require_title`` (creates), title and a default status are always set.
+    """
+    if not isinstance(data, dict):
+        return None, "Item must be an object"
+
+    fields = {}
+    if "title" in data or require_title:
+        title = data.get("title")
+        if not title or not isinstance(title, str):
+            return None, "Title is required"
+        if len(title) > TITLE_MAX_LENGTH:
+            return None, f"Title must be at most {TITLE_MAX_LENGTH} characters"
+        fields["title"] = title
+
+    if "description" in data:
+        description = data["description"]
+        if description is not None and not isinstance(description, str):
+            return None, "Description must be a string"
+        fields["description"] = description
+
+    if "status" in data or require_title:
+        status = data.get("status", "To Do")
+        if status not in STATUS_KEYS:
+            return None, "Invalid status"
+        fields["status"] = status
+
+    return fields, None
+
+
+def update_task_fields(user_id, task_id, fields):
+    """Atomically ``$set`` ``fields`` and ``updated_at`` on a task owned by ``user_id``.
+
+    One ``find_one_and_update`` round trip, so concurrent edits of different
+    fields cannot overwrite each other. Returns the updated raw document, or
+    None if the task does not exist for this user. The user's counters follow
+    any status change.
+    """
+    oid = to_object_id(task_id)
+    if oid is None:
+        return None
+
+    changes = dict(fields, updated_at=utcnow())
+    before = Task._get_collection().find_one_and_update(
+        {"_id": oid, "user": user_id},
+        {"$set": changes},
+        projection=TASK_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None
+
+    # The update is atomic, so the new document is exactly the old one plus
+    # the $set; asking for BEFORE also gives us the old status for the counters.
+    record_status_change(user_id, before.get("status"), changes.get("status", before.get("status")))
+    return dict(before, **changes)
+
+
+def delete_task_doc(user_id, task_id):
+    """Delete a task owned by ``user_id`` in one round trip.
+
+    Returns the deleted document (id and status only), or None if the task
+    does not exist for this user.
+    """
+    oid = to_object_id(task_id)
+    if oid is None:
+        return None
+
+    doc = Task._get_collection().find_one_and_delete({"_id": oid, "user": user_id}, projection={"status": 1})
+    if doc is not None:
+        record_deleted(user_id, doc.get("status"))
+    return doc
@@ -0,0 +1,79 @@
+"""
+Cached user loading for Flask-Login.
+
+Flask-Login loads the current user on every authenticated request. Instead of
+a full ``User`` document, the loader returns a ``CachedUser`` holding only the
+fields routes use, kept in a per-worker LRU cache with a TTL.
+
+Saving or deleting a ``User`` through mongoengine invalidates its entry in
+the current worker via signals; other workers pick up the change (or the
+deletion) once their entry expires, so ``USER_CACHE_TTL`` bounds staleness.
+Raw or queryset ``update`` calls bypass the signals and must call
+``invalidate_user`` themselves.
+"""
+
+from bson import ObjectId
+from flask_login import UserMixin
+from mongoengine import signals
+
+from app.lru_cache import TTLCache
+from app.models import User
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60
+
+USER_FIELDS = ("username", "email")
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+class CachedUser(UserMixin):
+    """The authenticated user as routes see it: id, username and email."""
+
+    __slots__ = ("id", "username", "email")
+
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    @classmethod
+    def from_doc(cls, doc):
+        return cls(doc["_id"], doc.get("username"), doc.get("email"))
+
+    def __repr__(self):
+        return f"<CachedUser {self.username}>"
+
+
+def configure_user_cache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+    user_cache.configure(maxsize, ttl)
+
+
+def load_user(user_id):
+    """Flask-Login ``user_loader``: return a CachedUser, or None if the user is gone."""
+    if not ObjectId.is_valid(user_id):
+        return None
+    oid = ObjectId(user_id)
+
+    user = user_cache.get(oid)
+    if user is None:
+        doc = User._get_collection().find_one({"_id": oid}, {field: 1 for field in USER_FIELDS})
+        if doc is None:
+            # Misses are not cached: a deleted user stays logged out
+            return None
+        user = CachedUser.from_doc(doc)
+        user_cache.set(oid, user)
+    return user
+
+
+def invalidate_user(user_id):
+    user_cache.invalidate(ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id)
+
+
+def _on_user_changed(sender, document, **kwargs):
+    if document.pk is not None:
+        invalidate_user(document.pk)
+
+
+signals.post_save.connect(_on_user_changed, sender=User)
+signals.post_delete.connect(_on_user_changed, sender=User)
@@ -0,0 +1,147 @@
+"""
+API throughput under concurrent clients: gunicorn sync worker vs. the ASGI app.
+
+Starts each server with one worker pinned to one CPU core, then has
+``--clients`` concurrent keep-alive clients request ``--path`` for
+``--duration`` seconds with an API key, and reports requests per second and
+latency percentiles:
+
+    python -m benchmarks.asgi_throughput --tasks 500 --clients 50 --duration 15
+
+The sync mode is the ``startup.sh`` setup (one gunicorn sync worker); the
+ASGI mode runs ``asgi:app`` under uvicorn. Requests carry no validators, so
+every one queries MongoDB. Needs gunicorn, uvicorn and the ASGI dependencies.
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from app.api_keys import API_KEY_HEADER, create_api_key
+from app.models import ApiKey
+from benchmarks.common import add_uri_argument, bench_user, connect, percentile
+
+MODES = {
+    "wsgi (gunicorn sync)": ["gunicorn", "--workers=1", "--bind=127.0.0.1:{port}", "--log-level=warning", "wsgi:app"],
+    "asgi (uvicorn)": [
+        "uvicorn",
+        "asgi:app",
+        "--workers=1",
+        "--host=127.0.0.1",
+        "--port={port}",
+        "--log-level=warning",
+        "--no-access-log",
+    ],
+}
+
+
+def pin_to_first_core():
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+
+def start_server(command, port, uri):
+    env = dict(os.environ, MONGODB_URI=uri, CACHE_BACKEND="null")
+    process = subprocess.Popen(
+        [arg.format(port=port) for arg in command],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        preexec_fn=pin_to_first_core,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/v1/health")
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f"Server did not start: {' '.join(command)}")
+
+
+def run_clients(port, path, headers, clients, duration):
+    """Return (latencies in ms, error count) from ``clients`` threads over ``duration`` seconds."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        connection, mine, failed = None, [], 0
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                connection = connection or http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                if response.getheader("Connection", "").lower() == "close":
+                    connection.close()
+                    connection = None
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection = None
+                continue
+            mine.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def run_modes(args, headers):
+    """Benchmark each server mode in turn."""
+    print(f"{args.clients} clients, {args.duration:.0f}s, GET {args.path}, one worker on one core")
+    for label, command in MODES.items():
+        server = start_server(command, args.port, args.uri)
+        try:
+            run_clients(args.port, args.path, headers, args.clients, 2)  # warm up
+            latencies, errors = run_clients(args.port, args.path, headers, args.clients, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+        if not latencies:
+            print(f"{label:<22} no successful requests ({errors} errors)", file=sys.stderr)
+            continue
+        print(
+            f"{label:<22} {len(latencies) / args.duration:8.1f} req/s  "
+            f"p50={percentile(latencies, 50):8.2f}ms  p95={percentile(latencies, 95):8.2f}ms  errors={errors}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_uri_argument(parser)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--path", default="/api/v1/tasks?limit=20")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    connect(args.uri)
+    with bench_user(args.tasks) as user:
+        _, key = create_api_key(user.id, "benchmark")
+        try:
+            run_modes(args, {API_KEY_HEADER: key})
+        finally:
+            ApiKey._get_collection().delete_many({"user": user.id})
+
+
+if __name__ == "__main__":
+    main()
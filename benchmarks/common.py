@@ -0,0 +1,121 @@
+"""
+Shared helpers for TaskFlow benchmarks.
+
+Benchmarks talk to a real MongoDB given by ``--uri`` or ``MONGODB_URI`` and
+clean up the data they seed.
+"""
+
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import mongoengine
+from pymongo import monitoring
+
+from app.models import User, Task
+
+STATUSES = ["To Do", "In Progress", "Completed"]
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Count the commands sent to MongoDB (one per round trip)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+COMMANDS = CommandCounter()
+
+
+def add_uri_argument(parser):
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI"), help="MongoDB URI (default: $MONGODB_URI)")
+
+
+def connect(uri):
+    if not uri:
+        raise SystemExit("A MongoDB URI is required (--uri or MONGODB_URI)")
+    mongoengine.connect(host=uri, event_listeners=[COMMANDS])
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(fn, iterations, warmup=5):
+    """Run ``fn`` repeatedly; return (latencies in ms, round trips per call)."""
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    start_commands = COMMANDS.count
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies, (COMMANDS.count - start_commands) / iterations
+
+
+def report(label, latencies, round_trips=None):
+    line = f"{label:<28} p50={percentile(latencies, 50):8.3f}ms  p95={percentile(latencies, 95):8.3f}ms"
+    if round_trips is not None:
+        line += f"  round_trips={round_trips:.1f}"
+    print(line)
+
+
+def make_task_docs(user_id, count, start=None):
+    """Build raw task documents spread over the last ``count`` minutes."""
+    start = start or datetime.utcnow()
+    for i in range(count):
+        created = start - timedelta(minutes=i)
+        yield {
+            "title": f"Benchmark task {i}",
+            "description": "Seeded by the TaskFlow benchmarks. " * random.randint(1, 8),
+            "status": random.choice(STATUSES),
+            "created_at": created,
+            "updated_at": created,
+            "user": user_id,
+        }
+
+
+def seed_tasks(user_id, count, batch_size=1000, make_docs=make_task_docs):
+    collection = Task._get_collection()
+    batch = []
+    for doc in make_docs(user_id, count):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+@contextmanager
+def bench_user(task_count=0, make_docs=make_task_docs):
+    """Create a throwaway user with ``task_count`` tasks and remove it afterwards."""
+    name = f"bench-{uuid.uuid4().hex[:12]}"
+    user = User(username=name, email=f"{name}@example.com")
+    user.set_password(uuid.uuid4().hex)
+    user.save()
+    try:
+        if task_count:
+            seed_tasks(user.id, task_count, make_docs=make_docs)
+        yield user
+    finally:
+        Task._get_collection().delete_many({"user": user.id})
+        user.delete()
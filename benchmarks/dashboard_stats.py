@@ -0,0 +1,52 @@
+"""
+Dashboard statistics: five separate queries vs. one ``$facet`` aggregation
+vs. the per-user counters document.
+
+    python -m benchmarks.dashboard_stats --tasks 5000 --iterations 200
+"""
+
+import argparse
+
+from app.models import Task
+from app.counters import rebuild_counters
+from app.stats import aggregate_dashboard_stats, get_dashboard_stats
+from benchmarks.common import add_uri_argument, bench_user, connect, measure, report
+
+
+def five_queries(user_id):
+    """The dashboard as it was computed before the stats service."""
+    stats = {
+        "total": Task.objects(user=user_id).count(),
+        "todo": Task.objects(user=user_id, status="To Do").count(),
+        "in_progress": Task.objects(user=user_id, status="In Progress").count(),
+        "completed": Task.objects(user=user_id, status="Completed").count(),
+    }
+    recent = list(Task.objects(user=user_id).order_by("-created_at").limit(5))
+    return stats, recent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_uri_argument(parser)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    connect(args.uri)
+    Task.ensure_indexes()
+
+    with bench_user(args.tasks) as user:
+        rebuild_counters(user.id)
+        assert five_queries(user.id)[0] == get_dashboard_stats(user.id)[0]
+
+        print(f"{args.tasks} tasks, {args.iterations} iterations")
+        latencies, round_trips = measure(lambda: five_queries(user.id), args.iterations)
+        report("five queries", latencies, round_trips)
+        latencies, round_trips = measure(lambda: aggregate_dashboard_stats(user.id), args.iterations)
+        report("$facet aggregation", latencies, round_trips)
+        latencies, round_trips = measure(lambda: get_dashboard_stats(user.id), args.iterations)
+        report("counters + recent query", latencies, round_trips)
+
+
+if __name__ == "__main__":
+    main()
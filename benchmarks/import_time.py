@@ -0,0 +1,81 @@
+"""
+Cold-start cost of importing the app, from ``python -X importtime``.
+
+Imports ``--module`` (by default ``main_app``, which builds the app the way
+the WSGI entry point does) in a fresh interpreter ``--runs`` times, then
+reports the best and median start-up times and the slowest packages in the
+best run:
+
+    python -m benchmarks.import_time --runs 5 --top 15
+
+Runs without MongoDB. tests/unit/test_import_time.py keeps start-up under
+IMPORT_BUDGET_MS and checks that optional modules stay out of it.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter, namedtuple
+
+# Roughly three times a cold ``import main_app`` on a developer laptop
+IMPORT_BUDGET_MS = 1500
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+Import = namedtuple("Import", "name depth self_ms cumulative_ms")
+
+
+def import_profile(module="main_app"):
+    """Import ``module`` in a fresh interpreter; return its ``Import`` rows in the order they finished."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for match in LINE.finditer(result.stderr):
+        self_us, cumulative_us, indent, name = match.groups()
+        rows.append(Import(name, len(indent) // 2, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def startup_ms(rows, module="main_app"):
+    """Cumulative time of ``module``, including everything it imported and ran."""
+    return next(row.cumulative_ms for row in rows if row.name == module and row.depth == 0)
+
+
+def by_package(rows):
+    """Self time per top-level package, slowest first."""
+    totals = Counter()
+    for row in rows:
+        totals[row.name.split(".")[0]] += row.self_ms
+    return totals.most_common()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main_app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_profile(args.module) for _ in range(args.runs)]
+    times = [startup_ms(rows, args.module) for rows in runs]
+    best = runs[times.index(min(times))]
+
+    print(f"import {args.module}: best={min(times):.1f}ms  p50={statistics.median(times):.1f}ms  budget={IMPORT_BUDGET_MS}ms")
+    print(f"{len(best)} modules imported; slowest packages (self time, best run):")
+    for package, ms in by_package(best)[: args.top]:
+        print(f"  {package:<28} {ms:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
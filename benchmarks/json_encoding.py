@@ -0,0 +1,81 @@
+"""
+JSON responses for large task lists: Flask's default provider vs. TaskFlow's.
+
+Runs in memory on generated BSON-shaped documents and times turning a page of
+raw task documents into a JSON response body:
+
+    python -m benchmarks.json_encoding --tasks 10000
+
+"before" is the old path: per-field ``isoformat()`` dicts encoded by Flask's
+stdlib-json provider. "after" passes datetimes and ObjectIds straight to
+TaskFlowJSONProvider, once with its stdlib fallback and once with orjson
+(when installed).
+"""
+
+import argparse
+import time
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app import json_provider
+from app.json_provider import TaskFlowJSONProvider
+from app.serializers import task_from_doc, task_json_from_doc
+from benchmarks.common import make_task_docs
+
+
+def before(app):
+    provider = DefaultJSONProvider(app)
+    return lambda docs: provider.response({"tasks": [task_json_from_doc(doc) for doc in docs]}).get_data()
+
+
+def after(app):
+    provider = TaskFlowJSONProvider(app)
+    return lambda docs: provider.response({"tasks": [task_from_doc(doc) for doc in docs]}).get_data()
+
+
+def profile(fn, docs, rounds):
+    """Return (tasks per second, MB per second, body bytes)."""
+    body = fn(docs)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(docs)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    return len(docs) / elapsed, len(body) / elapsed / 1e6, len(body)
+
+
+def report(label, tasks_per_second, mb_per_second, size):
+    print(f"{label:<24} {tasks_per_second:12,.0f} tasks/s  {mb_per_second:8.1f} MB/s  body={size:,}B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    docs = [dict(doc, _id=ObjectId()) for doc in make_task_docs(ObjectId(), args.tasks)]
+    app = Flask(__name__)
+
+    orjson = json_provider.orjson
+    with app.app_context():
+        print(f"{args.tasks} tasks per response")
+        report("before (stdlib jsonify)", *profile(before(app), docs, args.rounds))
+
+        json_provider.orjson = None
+        try:
+            report("after (stdlib fallback)", *profile(after(app), docs, args.rounds))
+        finally:
+            json_provider.orjson = orjson
+
+        if orjson is None:
+            print("after (orjson)           skipped: orjson is not installed")
+        else:
+            report("after (orjson)", *profile(after(app), docs, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
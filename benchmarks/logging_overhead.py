@@ -0,0 +1,81 @@
+"""
+Request-thread cost of logging: synchronous handlers vs. the queued pipeline.
+
+Times the two log lines written per request plus an audit event, first the
+way app.monitoring used to (f-strings and ``json.dumps`` written through a
+FileHandler and a StreamHandler on the calling thread), then through
+app.log_pipeline's queue. Output goes to a temporary file and /dev/null:
+
+    python -m benchmarks.logging_overhead --requests 20000
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import tempfile
+import time
+
+from app.log_pipeline import BatchFileHandler, BatchingQueueListener, BatchStreamHandler, DroppingQueueHandler, JSONFormatter
+
+
+def log_sync(logger, i):
+    logger.info(f"Request: GET /api/tasks - IP: 10.0.0.1 - User-Agent: bench/{i}")
+    logger.info(f"Response: 200 - Duration: {0.012:.3f}s - Path: /api/tasks")
+    logger.info(f"API Usage: {json.dumps({'endpoint': '/api/tasks', 'method': 'GET', 'status_code': 200, 'duration': 0.012})}")
+
+
+def log_queued(logger, i):
+    logger.info(
+        "Request: %s %s", "GET", "/api/tasks", extra={"fields": {"ip_address": "10.0.0.1", "user_agent": f"bench/{i}"}}
+    )
+    logger.info("Response: %s %s", 200, "/api/tasks", extra={"fields": {"status_code": 200, "duration": 0.012}})
+    logger.info("API Usage: %s %s", "GET", "/api/tasks", extra={"fields": {"endpoint": "/api/tasks", "status_code": 200}})
+
+
+def run(log, logger, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        log(logger, i)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        sync_logger = logging.getLogger("bench.sync")
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        for handler in (logging.FileHandler(os.path.join(directory, "sync.log")), logging.StreamHandler(devnull)):
+            handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+            sync_logger.addHandler(handler)
+        sync_us = run(log_sync, sync_logger, args.requests)
+
+        handlers = [BatchFileHandler(os.path.join(directory, "queued.log")), BatchStreamHandler(devnull)]
+        for handler in handlers:
+            handler.setFormatter(JSONFormatter())
+        records = queue.Queue(args.requests * 3)
+        listener = BatchingQueueListener(records, *handlers)
+        queued_logger = logging.getLogger("bench.queued")
+        queued_logger.propagate = False
+        queued_logger.setLevel(logging.INFO)
+        queued_logger.addHandler(DroppingQueueHandler(records))
+
+        listener.start()
+        queued_us = run(log_queued, queued_logger, args.requests)
+        start = time.perf_counter()
+        listener.stop()
+        listener.flush()
+        drain_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{args.requests} requests, 3 log lines each; request-thread time per request:")
+    print(f"  synchronous handlers: {sync_us:7.2f}us")
+    print(f"  queued pipeline:      {queued_us:7.2f}us  (listener finished {drain_ms:.0f}ms after the last request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Monitoring metrics: a list of ISO-timestamped events vs. the bucketed store.
+
+Records ``--events`` requests spread over the last day, then times the
+dashboard's window queries (5 minutes, 1 hour, 24 hours) and the
+per-endpoint latency percentiles for each window. The baseline is
+the dashboard's previous storage: a list of dicts whose timestamps are
+parsed with ``datetime.fromisoformat`` on every query. It runs in memory:
+
+    python -m benchmarks.metrics_store --events 100000 --iterations 20
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.metrics_store import MetricsStore
+
+WINDOWS = {"5m": 300, "1h": 3600, "24h": 86400}
+
+
+def list_window(events, seconds):
+    cutoff = datetime.utcnow() - timedelta(seconds=seconds)
+    recent = [m for m in events if datetime.fromisoformat(m["timestamp"]) > cutoff]
+    return len(recent), sum(m["data"]["duration"] for m in recent)
+
+
+def store_window(store, seconds):
+    summary = store.requests.summary(seconds)
+    return summary.count, summary.duration_sum
+
+
+def time_it(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    now = time.time()
+    offsets = sorted((random.uniform(0, 86400) for _ in range(args.events)), reverse=True)
+    events, store = [], MetricsStore()
+
+    start = time.perf_counter()
+    for offset in offsets:
+        events.append(
+            {
+                "timestamp": datetime.utcfromtimestamp(now - offset).isoformat(),
+                "type": "requests",
+                "data": {"endpoint": "api.get_tasks", "duration": 0.05},
+            }
+        )
+    list_record = (time.perf_counter() - start) / args.events * 1e6
+
+    start = time.perf_counter()
+    for offset in offsets:
+        store.record_request("api.get_tasks", "GET", 200, 0.05, now=now - offset)
+    store_record = (time.perf_counter() - start) / args.events * 1e6
+
+    print(f"{args.events} events over 24h; record: list={list_record:.2f}us  store={store_record:.2f}us per event")
+    for label, seconds in WINDOWS.items():
+        list_ms = time_it(lambda: list_window(events, seconds), args.iterations)
+        store_ms = time_it(lambda: store_window(store, seconds), args.iterations)
+        percentiles_ms = time_it(lambda: store.latency_percentiles(seconds), args.iterations)
+        print(f"window {label:>4}: list={list_ms:9.2f}ms  store={store_ms:7.3f}ms  store percentiles={percentiles_ms:7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cold start: time from process start to the first served ``/health``.
+
+Starts the app ``--runs`` times and polls ``/health`` until it answers (with
+any status), reporting the time to that first response and its status:
+
+    python -m benchmarks.startup_time --runs 5
+    python -m benchmarks.startup_time --uri mongodb://10.255.255.1/taskflow
+
+Startup does not wait on MongoDB, so an unreachable ``--uri`` should start
+about as fast as a reachable one; ``/health`` then reports the database as
+connecting (200) and, once the first attempt fails, unhealthy (503).
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import add_uri_argument, percentile
+
+SERVERS = {
+    "gunicorn": ["gunicorn", "--workers=1", "--bind=127.0.0.1:{port}", "--log-level=warning", "wsgi:app"],
+    "gunicorn-preload": ["gunicorn", "--preload", "--workers=1", "--bind=127.0.0.1:{port}", "--log-level=warning", "wsgi:app"],
+    "uvicorn": ["uvicorn", "asgi:app", "--host=127.0.0.1", "--port={port}", "--log-level=warning"],
+}
+
+
+def time_to_first_health(command, port, env, timeout):
+    """Return ``(seconds, status)`` from starting ``command`` until ``/health`` answers."""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+                connection.request("GET", "/health")
+                status = connection.getresponse().status
+                return time.perf_counter() - start, status
+            except OSError:
+                time.sleep(0.01)
+        raise SystemExit(f"No /health response within {timeout}s: {' '.join(command)}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_uri_argument(parser)
+    parser.add_argument("--server", choices=sorted(SERVERS), default="gunicorn")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.uri:
+        env["MONGODB_URI"] = args.uri
+    else:
+        env.pop("MONGODB_URI", None)
+    command = [arg.format(port=args.port) for arg in SERVERS[args.server]]
+
+    samples, statuses = [], []
+    for _ in range(args.runs):
+        seconds, status = time_to_first_health(command, args.port, env, args.timeout)
+        samples.append(seconds * 1000)
+        statuses.append(status)
+
+    print(f"{args.server}, MongoDB {'at ' + args.uri if args.uri else 'not configured'}, {args.runs} runs")
+    print(
+        f"first /health  min={min(samples):8.1f}ms  p50={percentile(samples, 50):8.1f}ms  "
+        f"max={max(samples):8.1f}ms  status={sorted(set(statuses))}"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Task search: the ``$text`` index vs. a case-insensitive regex scan.
+
+Seeds one user with ``--tasks`` tasks whose titles and descriptions draw on
+a small vocabulary, then times one page of results for a few query words
+through ``search_tasks`` and through the ``$regex`` ``$or`` a search box
+would otherwise use:
+
+    python -m benchmarks.task_search --tasks 1000000 --iterations 20
+
+Run ``flask ensure-indexes`` (or let the app start once) first so the text
+index exists.
+"""
+
+import argparse
+import random
+import re
+from datetime import datetime, timedelta
+
+from app.models import Task
+from app.pagination import SORT
+from app.serializers import TASK_PROJECTION
+from app.task_search import search_tasks
+from benchmarks.common import STATUSES, add_uri_argument, bench_user, connect, measure, report
+
+WORDS = (
+    "report invoice budget review deploy release migrate backup audit meeting client roadmap "
+    "design sprint hiring onboarding security incident refactor database cache metrics billing "
+    "contract vendor travel expense training feedback launch support"
+).split()
+QUERIES = ["invoice", "security incident", "roadmap", "backup"]
+
+
+def make_search_docs(user_id, count):
+    start = datetime.utcnow()
+    for i in range(count):
+        created = start - timedelta(minutes=i)
+        yield {
+            "title": " ".join(random.sample(WORDS, 3)).capitalize(),
+            "description": " ".join(random.choices(WORDS, k=random.randint(5, 30))),
+            "status": random.choice(STATUSES),
+            "created_at": created,
+            "updated_at": created,
+            "user": user_id,
+        }
+
+
+def regex_search(user_id, q, limit):
+    pattern = re.compile(re.escape(q), re.IGNORECASE)
+    query = {"user": user_id, "$or": [{"title": pattern}, {"description": pattern}]}
+    return list(Task._get_collection().find(query, TASK_PROJECTION).sort(SORT).limit(limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_uri_argument(parser)
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    connect(args.uri)
+    Task.ensure_indexes()
+    with bench_user(args.tasks, make_docs=make_search_docs) as user:
+        print(f"{args.tasks} tasks, {args.limit} results per page")
+        for q in QUERIES:
+            report(
+                f"$text '{q}'",
+                *measure(lambda: search_tasks(user.id, q, limit=args.limit, projection=TASK_PROJECTION), args.iterations),
+            )
+            report(f"$regex '{q}'", *measure(lambda: regex_search(user.id, q, args.limit), args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Task list serialization: mongoengine Documents vs. raw pymongo documents.
+
+By default this runs in memory on generated BSON-shaped documents, measuring
+only the per-task CPU time and allocations of turning a fetched document into
+the API's JSON shape:
+
+    python -m benchmarks.task_serialization --tasks 10000
+
+With ``--uri`` it also seeds the tasks in MongoDB and times the full fetch
+through ``Task.objects`` vs. a projected pymongo cursor.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from bson import ObjectId
+
+from app.models import Task
+from app.pagination import SORT
+from app.serializers import TASK_PROJECTION, task_json_from_doc
+from benchmarks.common import add_uri_argument, bench_user, connect, make_task_docs
+
+
+def document_path(docs):
+    """The list comprehension api.get_tasks used, over Task documents.
+
+    Iterating a QuerySet builds a Document per result and keeps them all in the
+    queryset's result cache, which the list below mirrors.
+    """
+    tasks = [Task._from_son(doc) for doc in docs]
+    return [
+        {
+            "id": str(task.id),
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "created_at": task.created_at.isoformat(),
+            "updated_at": task.updated_at.isoformat() if task.updated_at else None,
+        }
+        for task in tasks
+    ]
+
+
+def raw_path(docs):
+    return [task_json_from_doc(doc) for doc in docs]
+
+
+def profile(fn, docs, rounds):
+    """Return (CPU microseconds per task, peak bytes allocated per task)."""
+    fn(docs)
+
+    start = time.process_time()
+    for _ in range(rounds):
+        fn(docs)
+    cpu = (time.process_time() - start) / rounds / len(docs) * 1e6
+
+    tracemalloc.start()
+    fn(docs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return cpu, peak / len(docs)
+
+
+def report(label, cpu, peak):
+    print(f"{label:<22} cpu={cpu:7.2f}us/task  peak_alloc={peak:8.0f}B/task")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_uri_argument(parser)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--in-memory", action="store_true", help="Skip the MongoDB phase even if a URI is set")
+    args = parser.parse_args()
+
+    user_id = ObjectId()
+    docs = [dict(doc, _id=ObjectId()) for doc in make_task_docs(user_id, args.tasks)]
+    assert document_path(docs[:10]) == raw_path(docs[:10])
+
+    print(f"In memory, {args.tasks} tasks")
+    report("Document objects", *profile(document_path, docs, args.rounds))
+    report("raw documents", *profile(raw_path, docs, args.rounds))
+
+    if not args.uri or args.in_memory:
+        return
+
+    connect(args.uri)
+    with bench_user(args.tasks) as user:
+
+        def fetch_documents_queryset(_):
+            tasks = Task.objects(user=user.id).order_by("-created_at", "-id")
+            return [
+                {
+                    "id": str(task.id),
+                    "title": task.title,
+                    "description": task.description,
+                    "status": task.status,
+                    "created_at": task.created_at.isoformat(),
+                    "updated_at": task.updated_at.isoformat() if task.updated_at else None,
+                }
+                for task in tasks
+            ]
+
+        def fetch_raw(_):
+            return raw_path(Task._get_collection().find({"user": user.id}, TASK_PROJECTION).sort(SORT))
+
+        print(f"From MongoDB, {args.tasks} tasks")
+        report("Task.objects", *profile(fetch_documents_queryset, docs, args.rounds))
+        report("pymongo + projection", *profile(fetch_raw, docs, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
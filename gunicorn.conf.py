@@ -0,0 +1,25 @@
+"""
+gunicorn server hooks, loaded from the working directory by startup.sh's
+sync and ASGI modes. Settings stay on the command line.
+"""
+
+import glob
+import os
+
+
+def on_starting(server):
+    """Start from empty per-process metrics files (see app.prometheus)."""
+    directory = os.getenv("METRICS_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    """Fold an exited worker's metrics into the archive file."""
+    directory = os.getenv("METRICS_DIR")
+    if directory:
+        from app.prometheus import mark_process_dead
+
+        mark_process_dead(worker.pid, directory)
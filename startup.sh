@@ -1,2 +1,9 @@
 #!/bin/bash
-gunicorn --bind=0.0.0.0:$PORT --timeout 600 --workers=1 --max-requests=1000 --max-requests-jitter=100 main_app:app 
\ No newline at end of file
+# Worker processes share Prometheus metrics through files here (see app.prometheus)
+export METRICS_DIR=${METRICS_DIR:-/tmp/taskflow-metrics}
+
+if [ "$SERVER_MODE" = "asgi" ]; then
+    # Async task/dashboard API on motor; every other route is served by the Flask app
+    exec gunicorn --bind=0.0.0.0:$PORT --timeout 600 --workers=${WEB_CONCURRENCY:-1} --worker-class=uvicorn.workers.UvicornWorker --max-requests=1000 --max-requests-jitter=100 asgi:app
+fi
+gunicorn --bind=0.0.0.0:$PORT --timeout 600 --workers=${WEB_CONCURRENCY:-1} --max-requests=1000 --max-requests-jitter=100 main_app:app 
@@ -0,0 +1,128 @@
+import functools
+import os
+import threading
+from collections import Counter
+from unittest.mock import patch
+
+import mongoengine
+import pytest
+from pymongo import monitoring
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+MONGODB_TEST_URI = os.getenv("MONGODB_TEST_URI")
+
+# The wire command each mongomock Collection method stands for
+MONGOMOCK_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+    "find_one_and_replace": "findAndModify",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "aggregate": "aggregate",
+    "count_documents": "aggregate",
+    "estimated_document_count": "count",
+    "distinct": "distinct",
+    "create_index": "createIndexes",
+    "create_indexes": "createIndexes",
+}
+BULK_COMMANDS = {"InsertOne": "insert", "UpdateOne": "update", "UpdateMany": "update", "ReplaceOne": "update"}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Record every command sent to MongoDB as ``(command, collection)``."""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self.commands.append((event.command_name, collection if isinstance(collection, str) else None))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.commands = []
+
+    def on(self, collection):
+        """Commands sent to ``collection``, e.g. ``Counter({'find': 1})``."""
+        return Counter(name for name, target in self.commands if target == collection)
+
+
+def record_mongomock_commands(recorder):
+    """Patch mongomock so each outermost Collection call is recorded like a wire command.
+
+    mongomock methods call each other (``find_one`` uses ``find``), so calls
+    made while another is recorded are skipped. An unordered ``bulk_write``
+    counts one command per kind of write, as pymongo sends them.
+    """
+    local = threading.local()
+
+    def recording(method, command):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if getattr(local, "active", False):
+                return method(self, *args, **kwargs)
+            if command == "bulkWrite":
+                kinds = {BULK_COMMANDS.get(type(request).__name__, "delete") for request in args[0]}
+                recorder.commands.extend((kind, self.name) for kind in sorted(kinds))
+            else:
+                recorder.commands.append((command, self.name))
+            local.active = True
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                local.active = False
+
+        return wrapper
+
+    commands = dict(MONGOMOCK_COMMANDS, bulk_write="bulkWrite")
+    return patch.multiple(
+        mongomock.collection.Collection,
+        **{name: recording(getattr(mongomock.collection.Collection, name), command) for name, command in commands.items()},
+    )
+
+
+@pytest.fixture
+def mongo_commands():
+    """Connect to ``MONGODB_TEST_URI`` and record the commands tests send.
+
+    The variable must point at a disposable database; it is dropped
+    afterwards. Without it the tests run against mongomock, with each
+    collection call recorded as the command pymongo would send.
+    """
+    if not MONGODB_TEST_URI and mongomock is None:
+        pytest.skip("MONGODB_TEST_URI not set and mongomock not installed")
+
+    recorder = CommandRecorder()
+    mongoengine.disconnect()
+    if not MONGODB_TEST_URI:
+        mongoengine.connect("taskflow_test", host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+        try:
+            with record_mongomock_commands(recorder):
+                yield recorder
+        finally:
+            mongoengine.disconnect()
+        return
+
+    client = mongoengine.connect(host=MONGODB_TEST_URI, event_listeners=[recorder])
+    db_name = mongoengine.get_db().name
+    try:
+        yield recorder
+    finally:
+        client.drop_database(db_name)
+        mongoengine.disconnect()
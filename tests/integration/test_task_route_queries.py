@@ -0,0 +1,102 @@
+"""Lock in how many MongoDB commands each HTML task route sends.
+
+Runs against mongomock by default; set
+``MONGODB_TEST_URI=mongodb://localhost:27017/taskflow_test`` to count the
+commands a real server receives.
+"""
+
+import pytest
+from app import create_app
+from app.models import User, Task
+from app.counters import seed_counters
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def setup(mongo_commands):
+    app = create_app()
+    app.config["TESTING"] = True
+
+    owner = User(username="owner", email="owner@example.com", password_hash="x").save()
+    other = User(username="other", email="other@example.com", password_hash="x").save()
+    task = Task(title="Mine", status="To Do", user=owner).save()
+    seed_counters(owner.id, {"To Do": 1})
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(owner.id)
+
+    mongo_commands.reset()
+    return client, mongo_commands, task, other
+
+
+def other_users_task(other):
+    return Task(title="Theirs", user=other).save()
+
+
+class TestEditTask:
+    def test_get_is_one_owner_scoped_find(self, setup):
+        client, commands, task, _ = setup
+
+        response = client.get(f"/tasks/{task.id}/edit")
+
+        assert response.status_code == 200
+        assert commands.on("tasks") == {"find": 1}
+        # Only Flask-Login's user load; the task's owner is never dereferenced
+        assert commands.on("users") == {"find": 1}
+
+    def test_post_is_one_find_and_modify(self, setup):
+        client, commands, task, _ = setup
+
+        response = client.post(f"/tasks/{task.id}/edit", data={"title": "New", "description": "", "status": "Completed"})
+
+        assert response.status_code == 302
+        assert commands.on("tasks") == {"findAndModify": 1}
+        assert commands.on("users") == {"find": 1}
+        assert Task.objects(id=task.id).first().status == "Completed"
+
+    def test_other_users_task_is_not_found(self, setup):
+        client, commands, _, other = setup
+        theirs = other_users_task(other)
+
+        assert client.get(f"/tasks/{theirs.id}/edit").status_code == 404
+        assert client.post(f"/tasks/{theirs.id}/edit", data={"title": "Hijack", "status": "To Do"}).status_code == 404
+        assert Task.objects(id=theirs.id).first().title == "Theirs"
+
+
+class TestDeleteTask:
+    def test_one_find_and_modify(self, setup):
+        client, commands, task, _ = setup
+
+        response = client.post(f"/tasks/{task.id}/delete")
+
+        assert response.status_code == 302
+        assert commands.on("tasks") == {"findAndModify": 1}
+        assert commands.on("users") == {"find": 1}
+        assert Task.objects(id=task.id).count() == 0
+
+    def test_other_users_task_is_not_found(self, setup):
+        client, _, _, other = setup
+        theirs = other_users_task(other)
+
+        assert client.post(f"/tasks/{theirs.id}/delete").status_code == 404
+        assert Task.objects(id=theirs.id).count() == 1
+
+
+class TestUpdateStatus:
+    def test_one_find_and_modify(self, setup):
+        client, commands, task, _ = setup
+
+        response = client.post(f"/tasks/{task.id}/status", json={"status": "In Progress"})
+
+        assert response.status_code == 200
+        assert commands.on("tasks") == {"findAndModify": 1}
+        assert commands.on("users") == {"find": 1}
+
+    def test_other_users_task_is_not_found(self, setup):
+        client, _, _, other = setup
+        theirs = other_users_task(other)
+
+        assert client.post(f"/tasks/{theirs.id}/status", json={"status": "Completed"}).status_code == 404
+        assert Task.objects(id=theirs.id).first().status == "To Do"
@@ -0,0 +1,64 @@
+from unittest.mock import patch
+from bson import ObjectId
+from app import api_keys
+from app.api_keys import api_key_cache, authenticate_api_key, create_api_key, hash_key, revoke_api_key
+from app.user_cache import CachedUser
+
+
+@patch("app.models.ApiKey._get_collection")
+class TestApiKeys:
+    def setup_method(self):
+        api_key_cache.clear()
+
+    def test_only_the_hash_is_stored(self, get_collection):
+        collection = get_collection.return_value
+        collection.insert_one.return_value.inserted_id = ObjectId()
+
+        doc, key = create_api_key(ObjectId(), "ci")
+
+        (stored,), _ = collection.insert_one.call_args
+        assert key.startswith("tf_")
+        assert stored["key_hash"] == hash_key(key)
+        assert key not in stored.values()
+        assert key.startswith(doc["prefix"])
+
+    def test_validated_key_is_served_from_cache(self, get_collection):
+        user_id = ObjectId()
+        collection = get_collection.return_value
+        collection.find_one.return_value = {"_id": ObjectId(), "user": user_id}
+        user = CachedUser(user_id, "alice", "a@example.com")
+
+        with patch.object(api_keys, "load_user", return_value=user) as load_user:
+            assert authenticate_api_key("tf_secret") is user
+            assert authenticate_api_key("tf_secret") is user
+
+        collection.find_one.assert_called_once_with({"key_hash": hash_key("tf_secret"), "revoked_at": None}, {"user": 1})
+        load_user.assert_called_with(str(user_id))
+
+    def test_unknown_or_malformed_key(self, get_collection):
+        get_collection.return_value.find_one.return_value = None
+
+        assert authenticate_api_key("tf_unknown") is None
+        assert authenticate_api_key("not-ours") is None
+        assert authenticate_api_key(None) is None
+        get_collection.return_value.find_one.assert_called_once()
+        assert len(api_key_cache) == 0
+
+    def test_revoking_evicts_cached_key(self, get_collection):
+        user_id, key_id = ObjectId(), ObjectId()
+        api_key_cache.set(hash_key("tf_secret"), str(user_id))
+        get_collection.return_value.find_one_and_update.return_value = {"_id": key_id, "key_hash": hash_key("tf_secret")}
+
+        doc = revoke_api_key(user_id, str(key_id))
+
+        (query, update), _ = get_collection.return_value.find_one_and_update.call_args
+        assert query == {"_id": key_id, "user": user_id}
+        assert "revoked_at" in update["$set"]
+        assert "key_hash" not in doc
+        assert api_key_cache.get(hash_key("tf_secret")) is None
+
+    def test_revoking_someone_elses_key(self, get_collection):
+        get_collection.return_value.find_one_and_update.return_value = None
+
+        assert revoke_api_key(ObjectId(), str(ObjectId())) is None
+        assert revoke_api_key(ObjectId(), "bad-id") is None
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+import pytest
+from bson import ObjectId
+from app import create_app
+from app.user_cache import CachedUser
+
+pytest.importorskip("a2wsgi")
+
+from app.asgi import TaskFlowASGI  # noqa: E402
+
+USER = CachedUser(ObjectId(), "alice", "alice@example.com")
+KEY = {"x-api-key": "tf_secret"}
+
+
+def call(asgi, method, path, headers=None, body=b""):
+    """Run one HTTP request through an ASGI app; return (status, headers, body)."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path.split("?")[0],
+        "root_path": "",
+        "query_string": path.partition("?")[2].encode(),
+        "headers": [(name.encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi(scope, receive, send))
+    start = sent[0]
+    return (
+        start["status"],
+        dict((k.decode(), v.decode()) for k, v in start["headers"]),
+        b"".join(m.get("body", b"") for m in sent[1:]),
+    )
+
+
+@pytest.fixture
+def asgi():
+    app = create_app()
+    app.config["TESTING"] = True
+    app.config["MONGODB_URI"] = "mongodb://localhost/test"
+    asgi = TaskFlowASGI(app)
+    asgi.wsgi = AsyncMock(side_effect=fallback)
+    return asgi
+
+
+async def fallback(scope, receive, send):
+    await send({"type": "http.response.start", "status": 299, "headers": []})
+    await send({"type": "http.response.body", "body": b"flask"})
+
+
+@pytest.fixture
+def store():
+    with patch("app.asgi.async_store") as store:
+        store.authenticate_api_key = AsyncMock(side_effect=lambda key: USER if key == "tf_secret" else None)
+        store.get_version = AsyncMock(return_value={"version": 4, "last_modified": None})
+        store.paginate = AsyncMock(return_value=([{"_id": ObjectId(), "title": "Write report"}], None))
+        yield store
+
+
+class TestRouting:
+    def test_unauthenticated_requests_go_to_flask(self, asgi, store):
+        assert call(asgi, "GET", "/api/v1/tasks")[0] == 299
+        assert call(asgi, "GET", "/api/v1/tasks", {"x-api-key": "tf_wrong"})[0] == 299
+
+    def test_other_endpoints_go_to_flask(self, asgi, store):
+        assert call(asgi, "GET", "/api/v1/health", KEY)[0] == 299
+        assert call(asgi, "GET", "/api/v1/tasks/search?q=report", KEY)[0] == 299
+        assert call(asgi, "HEAD", "/api/v1/tasks", KEY)[0] == 299
+        store.authenticate_api_key.assert_not_called()
+
+
+class TestAsyncViews:
+    def test_task_list(self, asgi, store):
+        status, headers, body = call(asgi, "GET", "/api/v1/tasks?fields=title&limit=5", KEY)
+
+        assert status == 200
+        assert headers["etag"] == f'W/"{USER.id}.4"'
+        assert json.loads(body)["tasks"][0]["title"] == "Write report"
+        (query, limit, position, projection), _ = store.paginate.call_args
+        assert query == {"user": USER.id} and limit == 5 and projection == {"title": 1}
+
+    def test_matching_etag_skips_query(self, asgi, store):
+        status, _, body = call(asgi, "GET", "/api/v1/tasks", dict(KEY, **{"if-none-match": f'W/"{USER.id}.4"'}))
+
+        assert status == 304 and body == b""
+        store.paginate.assert_not_called()
+
+    def test_invalid_args(self, asgi, store):
+        status, _, body = call(asgi, "GET", "/api/v1/tasks?limit=x", KEY)
+
+        assert status == 400
+        assert json.loads(body) == {"error": "Invalid limit"}
+
+    def test_create_reads_the_body(self, asgi, store):
+        store.insert_task = AsyncMock()
+        store.record_created = AsyncMock()
+
+        status, _, body = call(
+            asgi, "POST", "/api/v1/tasks", dict(KEY, **{"content-type": "application/json"}), b'{"title": "Ship it"}'
+        )
+
+        assert status == 201
+        assert json.loads(body)["task"]["title"] == "Ship it"
+        store.record_created.assert_awaited_once_with(USER.id, "To Do")
+
+    def test_missing_task(self, asgi, store):
+        store.delete_task_doc = AsyncMock(return_value=None)
+
+        status, _, body = call(asgi, "DELETE", f"/api/v1/tasks/{ObjectId()}", KEY)
+
+        assert status == 404
+        assert json.loads(body) == {"error": "Task not found"}
@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+import pytest
+from bson import ObjectId
+from flask import Flask, g, jsonify
+from app import cache
+from app.cache import MISSING, MemoryCache, NullCache, RedisCache, bump_user_generation, cached, cached_view, create_backend
+
+
+class FakeRedis:
+    """Just enough of redis.Redis for RedisCache."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def info(self, section):
+        return {"evicted_keys": 3}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    backend = MemoryCache() if request.param == "memory" else RedisCache(FakeRedis())
+    with patch.object(cache, "_backend", backend):
+        yield backend
+
+
+class TestCached:
+    def test_second_call_is_served_from_cache(self, backend):
+        calls = []
+
+        @cached("stats")
+        def stats(user_id, limit=5):
+            calls.append(limit)
+            return {"total": len(calls)}
+
+        user_id = ObjectId()
+
+        assert stats(user_id) == {"total": 1}
+        assert stats(user_id) == {"total": 1}
+        assert stats(user_id, limit=10) == {"total": 2}
+        assert stats(ObjectId()) == {"total": 3}
+        assert backend.stats()["hits"] >= 1
+
+    def test_task_write_retires_users_entries(self, backend):
+        counter = iter(range(100))
+
+        @cached("stats")
+        def stats(user_id):
+            return next(counter)
+
+        user_id, other = ObjectId(), ObjectId()
+        first, other_first = stats(user_id), stats(other)
+
+        bump_user_generation(user_id)
+
+        assert stats(user_id) != first
+        assert stats(other) == other_first
+
+    def test_null_backend_always_calls_through(self):
+        fn = MagicMock(return_value=1)
+
+        with patch.object(cache, "_backend", NullCache()):
+            cached("stats")(fn)(ObjectId())
+            cached("stats")(fn)(ObjectId())
+
+        assert fn.call_count == 2
+
+
+class TestRedisCache:
+    def test_errors_are_misses(self):
+        client = MagicMock()
+        client.get.side_effect = ConnectionError("down")
+        backend = RedisCache(client)
+
+        assert backend.get("key") is MISSING
+        assert backend.stats()["errors"] == 1
+
+    def test_reports_server_evictions(self):
+        assert RedisCache(FakeRedis()).stats()["evictions"] == 3
+
+
+class TestCachedView:
+    def test_caches_per_user_url_and_version(self, backend):
+        app = Flask(__name__)
+        user = SimpleNamespace(id=ObjectId())
+        view = MagicMock(__name__="view", side_effect=lambda: jsonify(calls=view.call_count))
+        wrapped = cached_view()(view)
+
+        with patch("app.cache.current_user", user):
+            for path, version, expected in [("/t?a=1", 1, 1), ("/t?a=1", 1, 1), ("/t?a=2", 1, 2), ("/t?a=1", 2, 3)]:
+                with app.test_request_context(path):
+                    g.user_version = version
+                    assert wrapped().get_json() == {"calls": expected}
+
+
+class TestDashboardRoute:
+    def test_write_between_conditional_gets_returns_fresh_stats(self, backend):
+        from app import create_app
+        from app.user_cache import CachedUser
+
+        app = create_app()
+        app.config["TESTING"] = True
+        user = CachedUser(ObjectId(), "alice", "a@example.com")
+        state = {"version": 1, "total": 0}
+        headers = {"X-API-KEY": "tf_test"}
+
+        with patch("app.api_keys.authenticate_api_key", return_value=user), patch.object(cache, "_backend", backend), patch(
+            "app.conditional.get_version", side_effect=lambda user_id: {"version": state["version"]}
+        ), patch("app.stats.get_counters", side_effect=lambda user_id: {"total": state["total"]}), patch(
+            "app.models.Task._get_collection"
+        ):
+            client = app.test_client()
+            first = client.get("/api/v1/dashboard", headers=headers)
+            # Another worker writes: the counters version moves, this worker's generation does not
+            state.update(version=2, total=1)
+            second = client.get("/api/v1/dashboard", headers=dict(headers, **{"If-None-Match": first.headers["ETag"]}))
+            third = client.get("/api/v1/dashboard", headers=dict(headers, **{"If-None-Match": second.headers["ETag"]}))
+
+        assert first.get_json()["stats"]["total"] == 0
+        assert second.status_code == 200
+        assert second.headers["ETag"] != first.headers["ETag"]
+        assert second.get_json()["stats"]["total"] == 1
+        assert third.status_code == 304
+
+
+def test_create_backend_from_config():
+    assert isinstance(create_backend({}), NullCache)
+    assert isinstance(create_backend({"CACHE_BACKEND": "memory", "CACHE_SIZE": 10}), MemoryCache)
+    with pytest.raises(ValueError):
+        create_backend({"CACHE_BACKEND": "memcached"})
@@ -0,0 +1,71 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+import pytest
+from bson import ObjectId
+from flask import Flask
+from app.conditional import conditional_get, last_modified_header
+
+USER = SimpleNamespace(id=ObjectId())
+CHANGED = datetime(2025, 1, 2, 3, 4, 5, 600000)
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+@pytest.fixture
+def view():
+    view = MagicMock(__name__="view", return_value=({"tasks": []}, 200))
+    with patch("app.conditional.current_user", USER), patch(
+        "app.conditional.get_version", return_value={"version": 7, "last_modified": CHANGED}
+    ):
+        yield conditional_get(view)
+
+
+def etag(version=7):
+    return f'W/"{USER.id}.{version}"'
+
+
+class TestConditionalGet:
+    def test_tags_full_response(self, app, view):
+        with app.test_request_context():
+            response = view()
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] == etag()
+        assert response.last_modified == last_modified_header(CHANGED)
+        assert response.cache_control.private and response.cache_control.no_cache
+
+    def test_matching_etag_skips_view(self, app, view):
+        with app.test_request_context(headers={"If-None-Match": etag()}):
+            response = view()
+
+        assert response.status_code == 304
+        assert response.get_data() == b""
+        view.__wrapped__.assert_not_called()
+
+    def test_stale_etag_runs_view(self, app, view):
+        with app.test_request_context(headers={"If-None-Match": etag(6)}):
+            assert view().status_code == 200
+
+    def test_if_modified_since(self, app, view):
+        with app.test_request_context(headers={"If-Modified-Since": "Thu, 02 Jan 2025 03:04:05 GMT"}):
+            assert view().status_code == 304
+        with app.test_request_context(headers={"If-Modified-Since": "Thu, 02 Jan 2025 03:04:04 GMT"}):
+            assert view().status_code == 200
+
+    def test_errors_are_not_tagged(self, app, view):
+        view.__wrapped__.return_value = ({"error": "bad"}, 400)
+
+        with app.test_request_context():
+            response = view()
+
+        assert "ETag" not in response.headers
+
+
+def test_last_modified_withheld_until_its_second_has_passed():
+    assert last_modified_header(CHANGED, now=datetime(2025, 1, 2, 3, 4, 5, 900000)) is None
+    assert last_modified_header(CHANGED, now=datetime(2025, 1, 2, 3, 4, 6)).second == 5
+    assert last_modified_header(None) is None
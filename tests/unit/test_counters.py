@@ -0,0 +1,110 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from app import counters
+
+
+def increments(collection):
+    (query, update), _ = collection.return_value.update_one.call_args
+    assert "last_modified" in update["$set"]
+    return query, update["$inc"]
+
+
+@patch("app.counters._collection")
+class TestCounterWrites:
+    def test_create_increments_total_and_status(self, collection):
+        user_id = ObjectId()
+        counters.record_created(user_id, "To Do")
+
+        assert increments(collection) == ({"_id": user_id}, {"total": 1, "todo": 1, "version": 1})
+
+    def test_delete_decrements(self, collection):
+        user_id = ObjectId()
+        counters.record_deleted(user_id, "Completed")
+
+        assert increments(collection) == ({"_id": user_id}, {"total": -1, "completed": -1, "version": 1})
+
+    def test_status_change_moves_count_without_touching_total(self, collection):
+        user_id = ObjectId()
+        counters.record_status_change(user_id, "To Do", "In Progress")
+
+        assert increments(collection) == ({"_id": user_id}, {"todo": -1, "in_progress": 1, "version": 1})
+
+    def test_unchanged_status_only_bumps_version(self, collection):
+        user_id = ObjectId()
+        counters.record_status_change(user_id, "To Do", "To Do")
+
+        assert increments(collection) == ({"_id": user_id}, {"version": 1})
+
+    def test_writes_never_upsert(self, collection):
+        counters.record_created(ObjectId(), "Completed")
+
+        assert "upsert" not in collection.return_value.update_one.call_args.kwargs
+
+
+def test_rebuild_single_user_without_tasks_resets_counters():
+    user_id = ObjectId()
+    collection = MagicMock()
+
+    with patch("app.counters.count_by_status", return_value={}), patch("app.counters._collection", return_value=collection):
+        rebuilt = counters.rebuild_counters(user_id)
+
+    assert rebuilt == 1
+    ((request,),), _ = collection.bulk_write.call_args
+    assert request._doc["$set"].pop("last_modified")
+    assert request._doc == {"$set": {"total": 0, "todo": 0, "in_progress": 0, "completed": 0}, "$inc": {"version": 1}}
+
+
+@patch("app.counters._collection")
+def test_get_version_seeds_missing_counters(collection):
+    user_id = ObjectId()
+    collection.return_value.find_one.side_effect = [None, {"_id": user_id, "version": 0}]
+
+    with patch("app.counters.count_by_status", return_value={user_id: {"To Do": 2}}):
+        assert counters.get_version(user_id)["version"] == 0
+
+    (query, update), kwargs = collection.return_value.update_one.call_args_list[0]
+    assert update["$setOnInsert"]["total"] == 2
+    assert kwargs["upsert"] is True
+
+
+@patch("app.counters._collection")
+def test_seeding_recounts_writes_that_raced_the_count(collection):
+    user_id = ObjectId()
+
+    # A task created after the first count, whose $inc found no counters yet
+    with patch("app.counters.count_by_status", return_value={user_id: {"To Do": 3}}):
+        assert counters.seed_counters(user_id, {"To Do": 2}) == {"To Do": 3}
+
+    (query, update), _ = collection.return_value.update_one.call_args
+    assert query == {"_id": user_id}
+    assert update["$set"]["total"] == update["$set"]["todo"] == 3
+    assert update["$inc"] == {"version": 1}
+
+
+@patch("app.counters._collection")
+def test_seeding_existing_counters_does_not_recount(collection):
+    collection.return_value.update_one.return_value.upserted_id = None
+
+    with patch("app.counters.count_by_status") as count:
+        counters.seed_counters(ObjectId(), {"To Do": 2})
+
+    count.assert_not_called()
+
+
+def test_async_seeding_recounts_like_the_sync_path():
+    from app import async_store
+
+    user_id = ObjectId()
+    collections = {"tasks": MagicMock(), "task_counters": MagicMock()}
+    collections["task_counters"].update_one = AsyncMock()
+    collections["tasks"].aggregate.return_value.to_list = AsyncMock(
+        return_value=[{"_id": {"user": user_id, "status": "To Do"}, "count": 3}]
+    )
+
+    with patch("app.async_store._collection", lambda model: collections[model._meta["collection"]]):
+        assert asyncio.run(async_store.seed_counters(user_id, {"To Do": 2})) == {"To Do": 3}
+
+    (query, update), _ = collections["task_counters"].update_one.call_args
+    assert update["$set"]["total"] == 3
+    assert update["$inc"] == {"version": 1}
@@ -0,0 +1,83 @@
+from unittest.mock import patch, MagicMock
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app import db
+
+URI = "mongodb://db.example.com:27017/taskflow"
+
+
+@pytest.fixture(autouse=True)
+def db_state():
+    saved = dict(db._state)
+    yield db._state
+    db._state.clear()
+    db._state.update(saved)
+
+
+class TestInitDb:
+    def test_without_uri(self):
+        app = MagicMock(config={})
+        assert db.init_db(app) is False
+        app.before_request.assert_not_called()
+
+    def test_does_not_connect(self):
+        app = MagicMock(config={"MONGODB_URI": URI})
+        with patch("mongoengine.register_connection") as register:
+            assert db.init_db(app) is True
+
+        register.assert_not_called()
+        app.before_request.assert_called_once_with(db._before_request)
+        assert db.db_status()["status"] == "pending"
+
+
+class TestEnsureRegistered:
+    def test_registers_once_without_connecting(self, db_state):
+        db_state.update(uri=URI, registered=False)
+        with patch("mongoengine.register_connection") as register:
+            db.ensure_registered()
+            db.ensure_registered()
+
+        register.assert_called_once()
+        kwargs = register.call_args.kwargs
+        assert kwargs["connect"] is False
+        assert kwargs["host"] == db.mongo_connection_string(URI)
+
+    def test_skipped_without_uri(self, db_state):
+        db_state.update(uri=None, registered=False)
+        with patch("mongoengine.register_connection") as register:
+            db.ensure_registered()
+        register.assert_not_called()
+
+
+class TestWarmup:
+    def test_starts_once_per_process(self, db_state):
+        db_state.update(uri=URI, pid=None)
+        with patch("app.db.threading.Thread") as thread:
+            db.start_warmup()
+            db.start_warmup()
+
+        thread.assert_called_once()
+        assert thread.call_args.kwargs["daemon"] is True
+        assert db.db_status()["status"] == "connecting"
+
+    def test_retries_with_backoff(self, db_state):
+        db_state.update(uri=URI, registered=True, status="connecting", attempts=0, error=None)
+        client = MagicMock()
+        client.admin.command.side_effect = [ServerSelectionTimeoutError("down"), ServerSelectionTimeoutError("down"), {}]
+
+        with patch("app.db.get_connection", return_value=client), patch("app.db.time.sleep") as sleep:
+            db._warm_up()
+
+        assert [c.args[0] for c in sleep.call_args_list] == [1, 2]
+        assert db.db_status() == {"status": "connected", "attempts": 3, "error": None}
+
+    def test_after_fork_drops_inherited_client(self, db_state):
+        db_state.update(uri=URI, pid=1, status="connected", attempts=1)
+        with patch.dict("app.db._connections", {"default": MagicMock()}):
+            db._after_fork_in_child()
+            assert "default" not in db._connections
+
+        assert db_state["pid"] is None
+        assert db.db_status()["status"] == "pending"
@@ -0,0 +1,48 @@
+import math
+import random
+
+
+from app.histogram import BUCKETS, SUB_BUCKETS, Histogram, bucket_index, bucket_upper
+
+
+def test_bucket_bounds_hold_their_values():
+    for seconds in (0.0002, 0.001, 0.0137, 0.25, 1.0, 3.7, 100.0):
+        index = bucket_index(seconds)
+        assert bucket_upper(index - 1) <= seconds < bucket_upper(index)
+        # Log-linear: the bucket is at most 1/SUB_BUCKETS of its value wide
+        assert bucket_upper(index) - bucket_upper(index - 1) <= seconds / SUB_BUCKETS + 1e-12
+
+
+def test_out_of_range_values():
+    assert bucket_index(0) == 0
+    assert bucket_index(10_000) == BUCKETS - 1
+    assert bucket_upper(BUCKETS - 1) == math.inf
+
+
+def test_percentiles_within_bucket_error():
+    durations = [random.expovariate(1 / 0.05) for _ in range(10_000)]
+    histogram = Histogram()
+    for seconds in durations:
+        histogram.add(seconds)
+
+    ordered = sorted(durations)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[math.ceil(q * len(ordered)) - 1]
+        assert exact <= histogram.quantile(q) <= exact * (1 + 1 / SUB_BUCKETS)
+    assert histogram.percentiles()["max"] == max(durations)
+    assert histogram.count == 10_000
+
+
+def test_merge_equals_one_histogram():
+    left, right, both = Histogram(), Histogram(), Histogram()
+    for i in range(1, 200):
+        (left if i % 2 else right).add(i / 1000)
+        both.add(i / 1000)
+
+    merged = Histogram().merge(left).merge(right)
+    assert list(merged.counts) == list(both.counts)
+    assert merged.percentiles() == both.percentiles()
+
+
+def test_empty_histogram():
+    assert Histogram().percentiles() == {"p50": 0.0, "p90": 0.0, "p99": 0.0, "count": 0, "max": 0.0}
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.import_time import IMPORT_BUDGET_MS, import_profile, startup_ms
+
+# Loaded on first use, never by building the app
+DEFERRED = {"bleach", "html5lib", "redis", "motor", "a2wsgi", "psutil"}
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return [import_profile("main_app") for _ in range(3)]
+
+
+def test_importing_the_package_builds_nothing():
+    names = {row.name for row in import_profile("app")}
+
+    assert "flask" not in names
+    assert not {name for name in names if name.startswith("app.routes")}
+
+
+def test_package_has_no_app_instance():
+    import app
+
+    # Entry points build their own with create_app(); a module-level one would be a second app
+    assert not hasattr(app, "app")
+
+
+def test_optional_modules_are_deferred(startup):
+    names = {row.name.split(".")[0] for row in startup[0]}
+    assert not names & DEFERRED
+
+
+def test_startup_within_budget(startup):
+    best = min(startup_ms(rows) for rows in startup)
+    assert best < IMPORT_BUDGET_MS, f"import main_app took {best:.0f}ms (budget {IMPORT_BUDGET_MS}ms)"
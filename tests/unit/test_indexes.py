@@ -0,0 +1,47 @@
+import pytest
+from app import create_app
+from app.models import Task
+from app.commands import summarize_plan, QUERY_SHAPES
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+class TestTaskIndexes:
+    def test_task_declares_user_scoped_indexes(self):
+        specs = [spec["fields"] for spec in Task._meta["index_specs"]]
+
+        assert [("user", 1), ("status", 1), ("created_at", -1), ("_id", -1)] in specs
+        assert [("user", 1), ("created_at", -1), ("_id", -1)] in specs
+        assert [("user", 1), ("title", "text"), ("description", "text")] in specs
+
+    def test_every_task_query_shape_is_scoped_to_user(self):
+        for label, model, query, sort in QUERY_SHAPES:
+            if model is Task:
+                assert "user" in query, label
+
+
+class TestSummarizePlan:
+    def test_index_scan_with_fetch(self):
+        plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "user_1_created_at_-1"}}
+
+        stages, indexes = summarize_plan(plan)
+
+        assert stages == ["FETCH", "IXSCAN"]
+        assert indexes == ["user_1_created_at_-1"]
+
+    def test_collection_scan_with_sort(self):
+        plan = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+
+        stages, indexes = summarize_plan(plan)
+
+        assert "COLLSCAN" in stages
+        assert indexes == []
+
+
+def test_ensure_indexes_command_registered(app):
+    assert "ensure-indexes" in app.cli.commands
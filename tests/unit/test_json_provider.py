@@ -0,0 +1,63 @@
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from bson import ObjectId
+from flask import Flask, jsonify
+from app import json_provider
+from app.json_provider import TaskFlowJSONProvider, dumps_bytes
+
+BACKENDS = ["orjson", "stdlib"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        yield request.param
+    else:
+        with patch.object(json_provider, "orjson", None):
+            yield request.param
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = TaskFlowJSONProvider(app)
+    return app
+
+
+class TestDumps:
+    def test_encodes_object_ids_and_datetimes(self, backend):
+        task_id = ObjectId()
+        payload = {"id": task_id, "created_at": datetime(2025, 1, 2, 3, 4, 5, 6000)}
+
+        assert json.loads(dumps_bytes(payload)) == {"id": str(task_id), "created_at": "2025-01-02T03:04:05.006000"}
+
+    def test_keeps_key_order(self, backend):
+        assert dumps_bytes({"b": 1, "a": 2}) == b'{"b":1,"a":2}'
+
+    def test_rejects_unknown_types(self, backend):
+        with pytest.raises(TypeError):
+            dumps_bytes({"value": object()})
+
+
+class TestProvider:
+    def test_jsonify_uses_provider(self, app, backend):
+        task_id = ObjectId()
+
+        with app.app_context():
+            response = jsonify({"task": {"id": task_id}})
+
+        assert response.mimetype == "application/json"
+        assert response.get_data() == f'{{"task":{{"id":"{task_id}"}}}}\n'.encode()
+
+    def test_request_json_round_trip(self, app, backend):
+        with app.test_request_context(json={"title": "T", "tags": [1, 2]}):
+            from flask import request
+
+            assert request.get_json() == {"title": "T", "tags": [1, 2]}
+
+    def test_stdlib_options_fall_back_to_json_module(self, app):
+        with app.app_context():
+            assert app.json.dumps({"b": 1, "a": ObjectId("0" * 24)}, sort_keys=True) == '{"a": "' + "0" * 24 + '", "b": 1}'
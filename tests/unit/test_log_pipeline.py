@@ -0,0 +1,83 @@
+import io
+import json
+import logging
+import queue
+import sys
+
+from app import log_pipeline
+from app.log_pipeline import BatchingQueueListener, BatchStreamHandler, DroppingQueueHandler, JSONFormatter
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord("app", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_full_queue_drops_without_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.handle(make_record("line %d", i))
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_records_are_queued_unformatted():
+    handler = DroppingQueueHandler(queue.Queue())
+    details = {"user_id": "u1"}
+    handler.handle(make_record("User Activity: %s", "login", fields=details))
+
+    record = handler.queue.get_nowait()
+    assert (record.msg, record.args, record.fields) == ("User Activity: %s", ("login",), details)
+
+
+def test_json_formatter_merges_fields():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(
+            "Security Event: %s", "suspicious_header", level=logging.WARNING, fields={"ip_address": "1.2.3.4"}
+        )
+        record.exc_info = sys.exc_info()
+
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "Security Event: suspicious_header"
+    assert (entry["level"], entry["ip_address"]) == ("WARNING", "1.2.3.4")
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_listener_writes_in_batches():
+    stream = CountingStream()
+    handler = BatchStreamHandler(stream, batch_size=3)
+    handler.setFormatter(JSONFormatter())
+    records = queue.Queue()
+    for i in range(7):
+        records.put(make_record("line %d", i))
+
+    listener = BatchingQueueListener(records, handler)
+    listener.start()
+    listener.stop()
+    listener.flush()
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["message"] for line in lines] == [f"line {i}" for i in range(7)]
+    assert stream.writes == 3
+
+
+def test_sampling(monkeypatch):
+    monkeypatch.setattr(log_pipeline, "_sample_rate", 0.0)
+    assert not any(log_pipeline.sample_routine() for _ in range(100))
+
+    monkeypatch.setattr(log_pipeline, "_sample_rate", 1.0)
+    assert all(log_pipeline.sample_routine() for _ in range(100))
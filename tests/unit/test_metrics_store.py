@@ -0,0 +1,210 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+
+from app import dashboard_monitoring
+from app.metrics_store import EMPTY, BucketRing, LatencySeries, MetricsStore, Series, StoreGroup, claim_slot, open_slots
+from app.monitoring import HealthMonitor
+
+NOW = 1_700_000_000.0
+
+
+class TestBucketRing:
+    def test_aggregates_within_a_bucket(self):
+        ring = BucketRing(width=60, size=10)
+        ring.add(NOW, 0.2, False, False)
+        ring.add(NOW + 1, 0.5, True, False)
+
+        bucket = ring.bucket(int(NOW // 60))
+        assert (bucket.count, bucket.errors, bucket.duration_max) == (2, 1, 0.5)
+        assert bucket.duration_sum == 0.7
+
+    def test_reuses_slots_after_a_lap(self):
+        ring = BucketRing(width=1, size=10)
+        ring.add(NOW, 1.0, False, False)
+        ring.add(NOW + 10, 0.1, False, False)
+
+        assert ring.bucket(int(NOW)) == EMPTY
+        assert ring.bucket(int(NOW) + 10).count == 1
+
+    def test_window_is_capped_by_the_ring(self):
+        ring = BucketRing(width=1, size=10)
+        assert len(ring.numbers_in(NOW, 3600)) == 10
+        assert len(ring.numbers_in(NOW, 5)) == 5
+
+
+class TestSeries:
+    def test_summary_covers_only_the_window(self):
+        series = Series(second_buckets=600, minute_buckets=60)
+        series.add(0.1, now=NOW - 400)
+        series.add(3.0, error=True, now=NOW - 10)
+
+        recent = series.summary(300, NOW)
+        assert (recent.count, recent.errors, recent.slow, recent.duration_max) == (1, 1, 1, 3.0)
+        assert series.summary(600, NOW).count == 2
+
+    def test_long_windows_use_minute_buckets(self):
+        series = Series(second_buckets=600, minute_buckets=60)
+        series.add(now=NOW - 1800)
+
+        assert series.ring_for(300).width == 1
+        assert series.ring_for(3600).width == 60
+        assert len(series.buckets(3600, NOW)) == 60
+        assert series.summary(3600, NOW).count == 1
+
+
+class TestMetricsStore:
+    def test_top_endpoints(self):
+        store = MetricsStore(second_buckets=60, minute_buckets=60)
+        for _ in range(3):
+            store.record_request("api.get_tasks", "GET", 200, 0.01, now=NOW)
+        store.record_request("api.get_task", "GET", 500, 0.02, now=NOW)
+
+        assert store.top_endpoints(60, now=NOW) == [("api.get_tasks", 3), ("api.get_task", 1)]
+        assert store.requests.summary(60, NOW).errors == 1
+
+    def test_keeps_only_recent_events(self):
+        store = MetricsStore(second_buckets=60, minute_buckets=60)
+        for i in range(15):
+            store.record_error("ValueError", f"error {i}", now=NOW + i)
+
+        assert len(store.recent["errors"]) == 10
+        assert store.recent["errors"][-1]["message"] == "error 14"
+        assert store.errors.summary(60, NOW + 14).count == 15
+
+
+class TestLatency:
+    def test_windows_pick_their_ring(self):
+        series = LatencySeries(rings=((60, 60), (900, 96)))
+        series.add(0.1, now=NOW - 7200)
+        series.add(0.3, now=NOW - 30)
+
+        assert series.window(300, NOW).count == 1
+        assert series.window(86400, NOW).count == 2
+        assert series.window(86400, NOW).maximum == 0.3
+
+    def test_percentiles_per_endpoint_and_status_class(self):
+        store = MetricsStore(second_buckets=60, minute_buckets=60)
+        for i in range(1, 101):
+            store.record_request("api.get_tasks", "GET", 200, i / 1000, now=NOW)
+        store.record_request("api.get_tasks", "GET", 500, 1.5, now=NOW)
+        store.record_request("api.get_task", "GET", 404, 0.002, now=NOW)
+
+        rows = store.latency_percentiles(300, NOW)
+        assert [row["endpoint"] for row in rows] == ["api.get_tasks", "api.get_task"]
+
+        tasks = rows[0]
+        assert tasks["count"] == 101
+        assert tasks["max"] == 1.5
+        assert 0.05 <= tasks["p50"] <= 0.05 * 1.125
+        assert set(tasks["by_status"]) == {"2xx", "5xx"}
+        assert tasks["by_status"]["2xx"]["max"] == 0.1
+        assert tasks["by_status"]["5xx"]["count"] == 1
+
+    def test_memory_does_not_grow_with_traffic(self):
+        series = LatencySeries()
+        size = len(series.rings[0].counts)
+        for i in range(10_000):
+            series.add(i / 1000, now=NOW + i)
+        assert len(series.rings[0].counts) == size
+
+
+def test_alerts_from_buckets(monkeypatch):
+    store = MetricsStore()
+    store.record_request("api.get_tasks", "GET", 200, 2.5)
+    store.record_request("api.get_tasks", "GET", 500, 0.1)
+    store.record_error("RuntimeError", "boom")
+    monkeypatch.setattr(dashboard_monitoring, "_store", store)
+    monkeypatch.setattr(dashboard_monitoring, "log_api_usage", lambda *args: None)
+
+    with Flask(__name__).test_request_context():
+        response = dashboard_monitoring.get_alerts.__wrapped__()
+
+    types = {alert["type"] for alert in response.get_json()["alerts"]}
+    assert types == {"error_rate_high", "slow_responses"}
+
+
+class TestRoutes:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from app import create_app
+        from app.user_cache import CachedUser
+
+        monkeypatch.delenv("METRICS_DIR", raising=False)
+        app = create_app()
+        app.config["TESTING"] = True
+        user = CachedUser(ObjectId(), "alice", "a@example.com")
+        with patch("app.api_keys.authenticate_api_key", return_value=user):
+            yield app.test_client()
+
+    def test_metrics_include_earlier_requests(self, client):
+        headers = {"X-API-KEY": "tf_test"}
+        assert client.get("/monitoring/api/metrics", headers=headers).status_code == 200
+
+        response = client.get("/monitoring/api/metrics?window=60", headers=headers)
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["latency"]["window"] == 60
+        assert [row["endpoint"] for row in body["latency"]["endpoints"]] == ["monitoring.get_metrics"]
+        assert sum(bucket["count"] for bucket in body["metrics"]["requests"]) == 1
+
+    def test_dashboard_page_renders(self, client):
+        response = client.get("/monitoring/dashboard", headers={"X-API-KEY": "tf_test"})
+
+        assert response.status_code == 200
+        assert b"Latency by Endpoint" in response.data
+
+    def test_http_errors_keep_their_status(self, client):
+        assert client.get("/monitoring/nope").status_code == 404
+        assert dashboard_monitoring.get_store().errors.summary(60).count == 0
+
+
+class TestSlotFiles:
+    def test_replacement_worker_reopens_the_slot(self, tmp_path):
+        directory = str(tmp_path)
+        pid = os.fork()
+        if pid == 0:
+            store = claim_slot(directory, 60, 60)
+            store.record_request("api.get_tasks", "GET", 200, 0.05, now=NOW - 30)
+            store.record_request("api.get_tasks", "GET", 500, 0.2, now=NOW - 10)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        store = claim_slot(directory, 60, 60)
+        assert store.regions.path.endswith("dashboard-0.store")
+        assert store.requests.summary(60, NOW).count == 2
+        assert store.top_endpoints(60, now=NOW) == [("api.get_tasks", 2)]
+        assert store.latency_percentiles(60, NOW)[0]["by_status"]["5xx"]["max"] == 0.2
+
+    def test_live_slots_are_not_shared(self, tmp_path):
+        first = claim_slot(str(tmp_path), 60, 60)
+        second = claim_slot(str(tmp_path), 60, 60)
+        assert first.regions.path != second.regions.path
+
+    def test_group_sums_every_worker(self, tmp_path):
+        directory = str(tmp_path)
+        mine, other = claim_slot(directory, 60, 60), claim_slot(directory, 60, 60)
+        mine.record_request("api.get_tasks", "GET", 200, 0.01, now=NOW)
+        other.record_request("api.get_tasks", "GET", 200, 0.03, now=NOW)
+        other.record_request("api.get_task", "GET", 200, 0.02, now=NOW)
+
+        view = StoreGroup([mine] + open_slots(directory, exclude=mine.regions.path, second_buckets=60, minute_buckets=60))
+        assert view.requests.summary(60, NOW).count == 3
+        assert [count for _, count in view.top_endpoints(60, now=NOW)] == [2, 1]
+        assert view.latency_percentiles(60, NOW)[0]["max"] == 0.03
+        assert sum(bucket.count for _, bucket in view.requests.buckets(60, NOW)) == 3
+
+
+def test_health_state_outlives_the_monitor(tmp_path):
+    path = str(tmp_path / "health.json")
+    app = Flask(__name__)
+    monitor = HealthMonitor(app, path)
+    monitor.register_health_check("database", lambda: False)
+    with app.app_context():
+        monitor.run_health_checks()
+
+    assert HealthMonitor(app, path).get_health_status()["overall_status"] == "unhealthy"
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from werkzeug.datastructures import MultiDict
+from app import create_app
+from app.pagination import encode_cursor, decode_cursor, keyset_filter, parse_page_args, paginate
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    app.config["TASKS_PAGE_SIZE"] = 2
+    app.config["TASKS_MAX_PAGE_SIZE"] = 3
+    with app.app_context():
+        yield app
+
+
+class TestCursor:
+    def test_round_trip(self):
+        created, task_id = datetime(2025, 3, 4, 5, 6, 7, 123000), ObjectId()
+
+        assert decode_cursor(encode_cursor(created, task_id)) == (created, task_id)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(datetime(2025, 1, 1), "x" * 24)])
+    def test_malformed_cursor_is_rejected(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_keyset_filter_breaks_ties_on_id(self):
+        created, task_id = datetime(2025, 1, 1), ObjectId()
+
+        assert keyset_filter(created, task_id) == {
+            "$or": [{"created_at": {"$lt": created}}, {"created_at": created, "_id": {"$lt": task_id}}]
+        }
+
+
+class TestPageArgs:
+    def test_defaults(self, app):
+        assert parse_page_args(MultiDict()) == (2, None)
+
+    def test_limit_is_capped(self, app):
+        assert parse_page_args(MultiDict({"limit": "500"}))[0] == 3
+
+    @pytest.mark.parametrize("limit", ["0", "-1", "ten"])
+    def test_invalid_limit(self, app, limit):
+        with pytest.raises(ValueError):
+            parse_page_args(MultiDict({"limit": limit}))
+
+
+class TestPaginate:
+    def _collection(self, docs):
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value.limit.return_value = docs
+        return collection
+
+    def test_last_page_has_no_cursor(self):
+        docs = [{"_id": ObjectId(), "created_at": datetime(2025, 1, 1)}]
+
+        with patch("app.models.Task._get_collection", return_value=self._collection(docs)):
+            page, next_cursor = paginate({"user": ObjectId()}, 2)
+
+        assert page == docs
+        assert next_cursor is None
+
+    def test_cursor_points_at_last_item_of_page(self):
+        docs = [{"_id": ObjectId(), "created_at": datetime(2025, 1, 3 - i)} for i in range(3)]
+        collection = self._collection(docs)
+
+        with patch("app.models.Task._get_collection", return_value=collection):
+            page, next_cursor = paginate({"user": ObjectId()}, 2)
+
+        collection.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+        assert page == docs[:2]
+        assert decode_cursor(next_cursor) == (docs[1]["created_at"], docs[1]["_id"])
+
+    def test_position_adds_keyset_filter(self):
+        user_id = ObjectId()
+        position = (datetime(2025, 1, 1), ObjectId())
+        collection = self._collection([])
+
+        with patch("app.models.Task._get_collection", return_value=collection):
+            paginate({"user": user_id}, 2, position, {"title": 1})
+
+        collection.find.assert_called_once_with(dict(keyset_filter(*position), user=user_id), {"title": 1, "created_at": 1})
+        collection.find.return_value.sort.assert_called_once_with([("created_at", -1), ("_id", -1)])
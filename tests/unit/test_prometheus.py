@@ -0,0 +1,121 @@
+import fcntl
+import os
+import threading
+
+import pytest
+from flask import Flask
+
+from app import prometheus
+from app.mmap_values import INITIAL_SIZE, ValueFile, read_values
+
+
+@pytest.fixture(autouse=True)
+def in_memory():
+    yield
+    prometheus.configure(None)
+
+
+def test_value_file_reopens_with_its_values(tmp_path):
+    path = str(tmp_path / "values.db")
+    values = ValueFile(path)
+    offset = values.offset("a", 2)
+    values.add((offset, 1.5), (offset + 8, 2))
+    values.close()
+
+    reopened = ValueFile(path)
+    assert reopened.offset("a", 2) == offset
+    reopened.add((offset, 1))
+    assert read_values(path) == {"a": [2.5, 2.0]}
+
+
+def test_value_file_grows(tmp_path):
+    path = str(tmp_path / "values.db")
+    values = ValueFile(path)
+    for i in range(500):
+        values.add((values.offset(f"key-{i}", 20), i))
+
+    assert os.path.getsize(path) > INITIAL_SIZE
+    assert read_values(path)["key-499"][0] == 499
+
+
+def test_collect_sums_process_files(tmp_path):
+    prometheus.configure(str(tmp_path))
+    prometheus.observe_request("api.get_tasks", "GET", 200, 0.01)
+    prometheus.observe_request("api.get_tasks", "GET", 200, 0.5)
+
+    # Another worker's file
+    other = ValueFile(str(tmp_path / "metrics-99999999.db"))
+    key = prometheus.metric_key(prometheus.REQUESTS, endpoint="api.get_tasks", method="GET", status="200")
+    other.add((other.offset(key, 1), 3))
+    other.close()
+
+    assert prometheus.collect()[key] == [5.0]
+
+
+def test_dead_process_folded_into_archive(tmp_path):
+    directory = str(tmp_path)
+    key = prometheus.metric_key(prometheus.REQUESTS, endpoint="main.index", method="GET", status="200")
+    for pid, count in ((101, 2), (102, 3)):
+        values = ValueFile(os.path.join(directory, f"metrics-{pid}.db"))
+        values.add((values.offset(key, 1), count))
+        values.close()
+        prometheus.mark_process_dead(pid, directory)
+
+    assert sorted(f for f in os.listdir(directory) if f.endswith(".db")) == ["archive.db"]
+    assert prometheus.collect(directory)[key] == [5.0]
+
+
+def test_render_histogram():
+    prometheus.configure(None)
+    for duration in (0.003, 0.003, 0.2, 100):
+        prometheus.observe_request("api.get_tasks", "GET", 200, duration)
+
+    text = prometheus.render(prometheus.collect())
+    labels = 'endpoint="api.get_tasks",status_class="2xx"'
+    assert "# TYPE taskflow_http_request_duration_seconds histogram" in text
+    assert f'taskflow_http_request_duration_seconds_bucket{{{labels},le="0.00390625"}} 2.0' in text
+    assert f'taskflow_http_request_duration_seconds_bucket{{{labels},le="0.25"}} 3.0' in text
+    assert f'taskflow_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4.0' in text
+    assert f"taskflow_http_request_duration_seconds_count{{{labels}}} 4.0" in text
+    assert 'taskflow_http_requests_total{endpoint="api.get_tasks",method="GET",status="200"} 4.0' in text
+
+
+def test_label_values_are_escaped():
+    text = prometheus.render({prometheus.metric_key(prometheus.REQUESTS, endpoint='a"b\\c'): [1.0]})
+    assert 'endpoint="a\\"b\\\\c"' in text
+
+
+def test_metrics_endpoint_counts_requests():
+    app = Flask(__name__)
+    app.config["METRICS_TOKEN"] = "secret"
+    prometheus.init_prometheus(app)
+
+    @app.route("/ping")
+    def ping():
+        return "pong"
+
+    client = app.test_client()
+    client.get("/ping")
+    assert client.get("/metrics").status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.mimetype == "text/plain"
+    assert 'taskflow_http_requests_total{endpoint="ping",method="GET",status="200"} 1.0' in response.get_data(as_text=True)
+
+
+def test_scrape_waits_for_a_fold_in_progress(tmp_path):
+    directory = str(tmp_path)
+    prometheus.configure(directory)
+    prometheus.observe_request("main.index", "GET", 200, 0.01)
+    scraped = []
+
+    with open(os.path.join(directory, prometheus.LOCK), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        scrape = threading.Thread(target=lambda: scraped.append(prometheus.collect()))
+        scrape.start()
+        scrape.join(0.2)
+        assert scrape.is_alive()
+
+    scrape.join(5)
+    key = prometheus.metric_key(prometheus.REQUESTS, endpoint="main.index", method="GET", status="200")
+    assert scraped[0][key] == [1.0]
@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from app.models import Task
+from app.serializers import (
+    TASK_PROJECTION,
+    parse_fields,
+    task_from_doc,
+    task_from_model,
+    task_json_from_doc,
+    task_projection,
+    task_summary,
+    user_to_dict,
+)
+from app.user_cache import CachedUser
+
+
+class TestTaskSerializers:
+    def test_json_shape(self):
+        task_id = ObjectId()
+        doc = {
+            "_id": task_id,
+            "title": "Write report",
+            "description": "Quarterly",
+            "status": "To Do",
+            "created_at": datetime(2025, 1, 2, 3, 4, 5),
+            "updated_at": None,
+        }
+
+        assert task_json_from_doc(doc) == {
+            "id": str(task_id),
+            "title": "Write report",
+            "description": "Quarterly",
+            "status": "To Do",
+            "created_at": "2025-01-02T03:04:05",
+            "updated_at": None,
+        }
+
+    def test_keeps_datetimes_for_templates(self):
+        created = datetime(2025, 1, 2)
+        task = task_from_doc({"_id": ObjectId(), "title": "T", "created_at": created})
+
+        assert task["created_at"] is created
+        assert task["description"] is None
+
+    def test_json_shape_with_fields(self):
+        task_id = ObjectId()
+        doc = {"_id": task_id, "title": "T", "status": "Completed"}
+
+        assert task_json_from_doc(doc, ("id", "title", "status")) == {"id": str(task_id), "title": "T", "status": "Completed"}
+
+    def test_task_from_doc_with_fields(self):
+        task = task_from_doc({"_id": ObjectId(), "title": "T", "status": "To Do"}, ("id", "status"))
+
+        assert list(task) == ["id", "status"]
+
+    def test_model_matches_raw_document_shape(self):
+        task = Task(id=ObjectId(), title="T", description="d", status="Completed", user=ObjectId())
+
+        assert task_from_model(task) == task_from_doc(dict(task.to_mongo()))
+
+    def test_summary_and_user(self):
+        user_id = ObjectId()
+        task = task_from_doc({"_id": ObjectId(), "title": "T", "status": "To Do", "created_at": datetime(2025, 1, 2)})
+
+        assert list(task_summary(task)) == ["id", "title", "status", "created_at"]
+        assert user_to_dict(CachedUser(user_id, "alice", "a@example.com")) == {
+            "id": str(user_id),
+            "username": "alice",
+            "email": "a@example.com",
+        }
+
+
+class TestFields:
+    def test_absent_means_all_fields(self):
+        assert parse_fields(None) is None
+        assert task_projection(None) == TASK_PROJECTION
+
+    def test_id_always_included_in_response_order(self):
+        assert parse_fields("status, title") == ("id", "title", "status")
+
+    def test_projection_reads_only_requested_fields(self):
+        assert task_projection(parse_fields("title,status")) == {"title": 1, "status": 1}
+        assert task_projection(parse_fields("id")) == {"_id": 1}
+
+    def test_unknown_field_rejected(self):
+        with pytest.raises(ValueError, match="user, secret"):
+            parse_fields("title,user,secret")
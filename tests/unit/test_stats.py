@@ -0,0 +1,51 @@
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from app.stats import build_dashboard_pipeline, get_dashboard_stats
+
+
+def test_pipeline_is_scoped_to_user_and_uses_facet():
+    user_id = ObjectId()
+    pipeline = build_dashboard_pipeline(user_id)
+
+    assert pipeline[0] == {"$match": {"user": user_id}}
+    assert set(pipeline[1]["$facet"]) == {"counts", "recent"}
+
+
+class TestGetDashboardStats:
+    def test_without_counters_uses_one_aggregation_and_seeds(self):
+        task_id = ObjectId()
+        created = datetime(2025, 1, 1)
+        collection = MagicMock()
+        collection.aggregate.return_value = iter(
+            [
+                {
+                    "counts": [{"_id": "To Do", "count": 1}, {"_id": "In Progress", "count": 4}],
+                    "recent": [{"_id": task_id, "title": "T", "status": "To Do", "created_at": created}],
+                }
+            ]
+        )
+
+        with patch("app.stats.get_counters", return_value=None), patch(
+            "app.stats.seed_counters", side_effect=lambda user_id, counts: counts
+        ) as seed:
+            with patch("app.models.Task._get_collection", return_value=collection):
+                stats, recent = get_dashboard_stats(ObjectId())
+
+        assert collection.aggregate.call_count == 1
+        seed.assert_called_once()
+        assert stats == {"total": 5, "todo": 1, "in_progress": 4, "completed": 0}
+        assert recent == [{"id": str(task_id), "title": "T", "description": None, "status": "To Do", "created_at": created}]
+
+    def test_with_counters_skips_counting(self):
+        counters = {"_id": ObjectId(), "total": 3, "todo": 1, "in_progress": 1, "completed": 1}
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value.limit.return_value = []
+
+        with patch("app.stats.get_counters", return_value=counters):
+            with patch("app.models.Task._get_collection", return_value=collection):
+                stats, recent = get_dashboard_stats(ObjectId())
+
+        collection.aggregate.assert_not_called()
+        assert stats == {"total": 3, "todo": 1, "in_progress": 1, "completed": 1}
+        assert recent == []
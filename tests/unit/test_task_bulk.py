@@ -0,0 +1,145 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from app.task_bulk import BulkRequestError, parse_bulk_request, run_bulk
+
+
+class TestParseBulkRequest:
+    @pytest.mark.parametrize(
+        "data, message",
+        [
+            (None, "No data provided"),
+            ({}, "No operations provided"),
+            ({"upsert": []}, "Unknown section"),
+            ({"create": {"title": "x"}}, "create must be a list"),
+            ({"delete": [str(ObjectId()) for _ in range(3)]}, "At most 2 operations"),
+        ],
+    )
+    def test_rejects_malformed_requests(self, data, message):
+        with pytest.raises(BulkRequestError, match=message):
+            parse_bulk_request(data, max_items=2)
+
+    def test_item_errors_are_reported_per_item(self):
+        task_id = str(ObjectId())
+        parsed = parse_bulk_request(
+            {
+                "create": [{"title": "ok"}, {"title": ""}, {"title": "x", "status": "Done"}],
+                "update": [{"id": task_id}, {"id": task_id, "title": "new"}],
+                "status": [{"id": task_id, "status": "Completed"}],
+                "delete": ["nope"],
+            }
+        )
+
+        assert [error for _, _, error in parsed["create"]] == [None, "Title is required", "Invalid status"]
+        assert parsed["create"][0][1] == {"title": "ok", "status": "To Do"}
+        assert [error for _, _, error in parsed["update"]] == ["No fields to update", None]
+        assert parsed["status"][0][2] == "Task appears more than once in this request"
+        assert parsed["delete"][0][2] == "Invalid task id"
+
+
+def bulk_collection(statuses, matched=0, deleted=0, after=None):
+    """A tasks collection whose reads return ``statuses`` then ``after`` (``{id: status}``)."""
+    collection = MagicMock()
+    reads = [statuses] + ([after] if after is not None else [])
+    collection.find.side_effect = [[{"_id": oid, "status": status} for oid, status in read.items()] for read in reads]
+    collection.bulk_write.return_value.matched_count = matched
+    collection.bulk_write.return_value.deleted_count = deleted
+    return collection
+
+
+class TestRunBulk:
+    def test_single_read_and_single_unordered_bulk_write(self):
+        user_id, existing, edited, gone, missing = ObjectId(), ObjectId(), ObjectId(), ObjectId(), ObjectId()
+        collection = bulk_collection({existing: "To Do", gone: "Completed"}, matched=2, deleted=1)
+        parsed = parse_bulk_request(
+            {
+                "create": [{"title": "new", "status": "Completed"}],
+                "update": [{"id": str(edited), "title": "renamed"}],
+                "status": [{"id": str(existing), "status": "In Progress"}],
+                "delete": [str(gone), str(missing)],
+            }
+        )
+
+        with patch("app.models.Task._get_collection", return_value=collection), patch("app.task_bulk.apply_delta") as delta:
+            results = run_bulk(user_id, parsed)
+
+        collection.find.assert_called_once()
+        assert collection.find.call_args.args[0] == {"_id": {"$in": [existing, gone, missing]}, "user": user_id}
+        (requests,), kwargs = collection.bulk_write.call_args
+        assert kwargs == {"ordered": False}
+        assert [type(request) for request in requests] == [InsertOne, UpdateOne, UpdateOne, DeleteOne]
+        assert requests[2]._filter == {"_id": existing, "user": user_id, "status": "To Do"}
+        assert requests[3]._filter == {"_id": gone, "user": user_id, "status": "Completed"}
+
+        assert results["status"] == [{"index": 0, "id": str(existing)}]
+        assert results["delete"] == [{"index": 0, "id": str(gone)}, {"index": 1, "error": "Task not found"}]
+        delta.assert_called_once_with(user_id, {"total": 0, "completed": 0, "todo": -1, "in_progress": 1})
+
+    def test_items_changed_between_read_and_write_are_not_counted(self):
+        user_id, moved, deleted, edited = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+        # Another request moved one task to Completed and deleted the others
+        collection = bulk_collection({moved: "To Do", deleted: "To Do"}, matched=0, deleted=0, after={moved: "Completed"})
+        parsed = parse_bulk_request(
+            {
+                "update": [{"id": str(edited), "title": "renamed"}],
+                "status": [{"id": str(moved), "status": "In Progress"}],
+                "delete": [str(deleted)],
+            }
+        )
+
+        with patch("app.models.Task._get_collection", return_value=collection), patch("app.task_bulk.apply_delta") as delta:
+            results = run_bulk(user_id, parsed)
+
+        assert collection.find.call_count == 2
+        assert results["update"] == [{"index": 0, "error": "Task not found"}]
+        assert results["status"] == [{"index": 0, "error": "Task was changed by another request"}]
+        assert results["delete"] == [{"index": 0, "error": "Task not found"}]
+        delta.assert_called_once_with(user_id, {})
+
+    def test_delete_of_a_task_whose_status_changed_is_a_conflict(self):
+        user_id, task_id = ObjectId(), ObjectId()
+        collection = bulk_collection({task_id: "To Do"}, deleted=0, after={task_id: "Completed"})
+
+        with patch("app.models.Task._get_collection", return_value=collection), patch("app.task_bulk.apply_delta") as delta:
+            results = run_bulk(user_id, parse_bulk_request({"delete": [str(task_id)]}))
+
+        assert results["delete"] == [{"index": 0, "error": "Task was changed by another request"}]
+        delta.assert_called_once_with(user_id, {})
+
+
+class TestBulkRoute:
+    @pytest.fixture
+    def client(self):
+        from app import create_app
+        from app.user_cache import CachedUser
+
+        app = create_app()
+        app.config["TESTING"] = True
+        user = CachedUser(ObjectId(), "alice", "a@example.com")
+        with patch("app.api_keys.authenticate_api_key", return_value=user):
+            yield app.test_client()
+
+    def test_reports_per_item_results(self, client):
+        collection = MagicMock()
+        with patch("app.models.Task._get_collection", return_value=collection), patch("app.task_bulk.apply_delta"):
+            response = client.post(
+                "/api/v1/tasks/bulk",
+                json={"create": [{"title": "write report"}, {"title": ""}], "delete": ["nope"]},
+                headers={"X-API-KEY": "tf_test"},
+            )
+
+        assert response.status_code == 200
+        body = response.get_json()
+        created, invalid = body["results"]["create"]
+        assert ObjectId.is_valid(created["id"])
+        assert invalid == {"index": 1, "error": "Title is required"}
+        assert body["results"]["delete"] == [{"index": 0, "error": "Invalid task id"}]
+        assert body["summary"] == {"succeeded": 1, "failed": 2}
+        collection.bulk_write.assert_called_once()
+
+    def test_malformed_body_is_rejected(self, client):
+        response = client.post("/api/v1/tasks/bulk", json={"upsert": []}, headers={"X-API-KEY": "tf_test"})
+
+        assert response.status_code == 400
+        assert "Unknown section" in response.get_json()["error"]
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from datetime import datetime
+from bson import ObjectId
+from app.task_export import generate_csv, generate_ndjson
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for doc in self.docs:
+            self.consumed += 1
+            yield doc
+
+    def close(self):
+        self.closed = True
+
+
+def make_docs(count):
+    return [
+        {"_id": ObjectId(), "title": f"Task {i}", "description": "d", "status": "To Do", "created_at": datetime(2025, 1, 1)}
+        for i in range(count)
+    ]
+
+
+class TestExportGenerators:
+    def test_ndjson_one_task_per_line(self):
+        cursor = FakeCursor(make_docs(3))
+
+        lines = "".join(generate_ndjson(cursor)).splitlines()
+
+        assert [json.loads(line)["title"] for line in lines] == ["Task 0", "Task 1", "Task 2"]
+        assert cursor.closed
+
+    def test_csv_with_selected_fields(self):
+        docs = make_docs(2)
+
+        rows = list(csv.reader(io.StringIO("".join(generate_csv(FakeCursor(docs), ("id", "title"))))))
+
+        assert rows == [["id", "title"], [str(docs[0]["_id"]), "Task 0"], [str(docs[1]["_id"]), "Task 1"]]
+
+    def test_streams_in_chunks_without_reading_everything_first(self):
+        cursor = FakeCursor(make_docs(100))
+
+        chunks = generate_ndjson(cursor, chunk_size=500)
+        first = next(chunks)
+
+        assert 0 < cursor.consumed < 100
+        assert len(first) >= 500
+        rest = "".join(chunks)
+        assert len((first + rest).splitlines()) == 100
+        assert cursor.closed
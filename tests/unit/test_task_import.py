@@ -0,0 +1,77 @@
+import io
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from app.task_import import MAX_REPORTED_ERRORS, clean_batch, detect_format, import_tasks, iter_records
+
+
+class TestParsing:
+    def test_detect_format(self):
+        assert detect_format("tasks.CSV") == "csv"
+        assert detect_format("tasks.jsonl") == "ndjson"
+        assert detect_format("tasks.txt", "ndjson") == "ndjson"
+        assert detect_format("tasks.txt") is None
+
+    def test_csv_records(self):
+        stream = io.BytesIO(b"title,status\nOne,To Do\nTwo,Completed\n")
+
+        assert list(iter_records(stream, "csv")) == [
+            (1, {"title": "One", "status": "To Do"}),
+            (2, {"title": "Two", "status": "Completed"}),
+        ]
+
+    def test_ndjson_records_report_bad_lines(self):
+        stream = io.BytesIO(b'{"title": "One"}\n\nnope\n["x"]\n')
+
+        assert list(iter_records(stream, "ndjson")) == [
+            (1, {"title": "One"}),
+            (2, "Invalid JSON"),
+            (3, "Row must be a JSON object"),
+        ]
+
+
+class TestCleanBatch:
+    def test_applies_security_rules(self):
+        cleaned = clean_batch(
+            [
+                (1, {"title": "Safe <script>alert(1)</script>", "description": "<b>bold</b>"}),
+                (2, {"title": ""}),
+                (3, {"title": "Bad status", "status": "Done"}),
+                (4, "Invalid JSON"),
+            ]
+        )
+
+        assert cleaned[0] == (1, {"title": "Safe alert(1)", "description": "<b>bold</b>", "status": "To Do"}, [])
+        assert cleaned[1] == (2, None, ["Title is required"])
+        assert cleaned[2][1] is None
+        assert cleaned[3] == (4, None, ["Invalid JSON"])
+
+    def test_title_that_sanitizes_to_nothing_is_rejected(self):
+        cleaned = clean_batch([(1, {"title": "javascript:"}), (2, {"title": "<script></script>"})])
+
+        assert cleaned == [(1, None, ["Title is required"]), (2, None, ["Title is required"])]
+
+
+class TestImportTasks:
+    def test_writes_one_insert_many_per_batch(self):
+        user_id = ObjectId()
+        collection = MagicMock()
+        records = [(i, {"title": f"Task {i}"}) for i in range(1, 6)]
+
+        with patch("app.models.Task._get_collection", return_value=collection), patch("app.task_import.apply_delta") as delta:
+            summary = import_tasks(user_id, iter(records), batch_size=2)
+
+        assert collection.insert_many.call_count == 3
+        assert all(call.kwargs == {"ordered": False} for call in collection.insert_many.call_args_list)
+        assert collection.insert_many.call_args_list[0].args[0][0]["user"] == user_id
+        assert summary == {"accepted": 5, "rejected": 0, "errors": [], "errors_truncated": False}
+        assert delta.call_count == 3
+
+    def test_reported_errors_are_bounded(self):
+        records = ((i, "Invalid JSON") for i in range(MAX_REPORTED_ERRORS + 50))
+
+        with patch("app.models.Task._get_collection"), patch("app.task_import.apply_delta"):
+            summary = import_tasks(ObjectId(), records)
+
+        assert summary["rejected"] == MAX_REPORTED_ERRORS + 50
+        assert len(summary["errors"]) == MAX_REPORTED_ERRORS
+        assert summary["errors_truncated"] is True
@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import patch
+from bson import ObjectId
+from werkzeug.datastructures import MultiDict
+from app import create_app
+from app.task_search import (
+    SCORE,
+    SEARCH_MAX_RESULTS,
+    SEARCH_SORT,
+    decode_offset,
+    encode_offset,
+    parse_search_args,
+    search_tasks,
+)
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    app.config["TASKS_PAGE_SIZE"] = 2
+    app.config["TASKS_MAX_PAGE_SIZE"] = 3
+    with app.app_context():
+        yield app
+
+
+class TestOffsetCursor:
+    def test_round_trip(self):
+        assert decode_offset(encode_offset(40)) == 40
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_offset(-1), encode_offset(SEARCH_MAX_RESULTS)])
+    def test_malformed_cursor_is_rejected(self, cursor):
+        with pytest.raises(ValueError):
+            decode_offset(cursor)
+
+
+class TestParseSearchArgs:
+    def test_defaults(self, app):
+        assert parse_search_args(MultiDict({"q": "  report "})) == ("report", None, 2, 0)
+
+    def test_limit_is_capped_and_cursor_decoded(self, app):
+        args = MultiDict({"q": "report", "status": "Completed", "limit": "50", "cursor": encode_offset(6)})
+
+        assert parse_search_args(args) == ("report", "Completed", 3, 6)
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            {},
+            {"q": "  "},
+            {"q": "x" * 201},
+            {"q": "a", "status": "Done"},
+            {"q": "a", "limit": "0"},
+            {"q": "a", "cursor": "bad"},
+        ],
+    )
+    def test_invalid_args_raise(self, app, args):
+        with pytest.raises(ValueError):
+            parse_search_args(MultiDict(args))
+
+
+@patch("app.task_search.Task._get_collection")
+class TestSearchTasks:
+    def cursor(self, get_collection, docs):
+        cursor = get_collection.return_value.find.return_value
+        cursor.sort.return_value.skip.return_value.limit.return_value = docs
+        return cursor
+
+    def test_query_is_user_scoped_and_sorted_by_relevance(self, get_collection):
+        user_id = ObjectId()
+        cursor = self.cursor(get_collection, [])
+
+        search_tasks(user_id, "report", status="To Do", limit=5, offset=10, projection={"title": 1})
+
+        (query, projection), _ = get_collection.return_value.find.call_args
+        assert query == {"user": user_id, "$text": {"$search": "report"}, "status": "To Do"}
+        assert projection == {"title": 1, "score": SCORE}
+        cursor.sort.assert_called_once_with(SEARCH_SORT)
+        cursor.sort.return_value.skip.assert_called_once_with(10)
+        cursor.sort.return_value.skip.return_value.limit.assert_called_once_with(6)
+
+    def test_extra_result_yields_next_cursor(self, get_collection):
+        self.cursor(get_collection, [{"_id": ObjectId()} for _ in range(3)])
+
+        docs, next_cursor = search_tasks(ObjectId(), "report", limit=2, offset=4)
+
+        assert len(docs) == 2
+        assert decode_offset(next_cursor) == 6
+
+    def test_last_page_has_no_cursor(self, get_collection):
+        self.cursor(get_collection, [{"_id": ObjectId()}])
+
+        assert search_tasks(ObjectId(), "report", limit=2)[1] is None
+
+    def test_depth_is_capped(self, get_collection):
+        cursor = self.cursor(get_collection, [{"_id": ObjectId()} for _ in range(3)])
+
+        docs, next_cursor = search_tasks(ObjectId(), "report", limit=10, offset=SEARCH_MAX_RESULTS - 2)
+
+        cursor.sort.return_value.skip.return_value.limit.assert_called_once_with(3)
+        assert len(docs) == 2
+        assert next_cursor is None
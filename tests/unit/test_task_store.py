@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.task_store import delete_task_doc, find_task, update_task_fields, validate_task_fields
+
+
+class TestValidateTaskFields:
+    def test_create_defaults_status(self):
+        assert validate_task_fields({"title": "T"}, require_title=True) == ({"title": "T", "status": "To Do"}, None)
+
+    def test_update_only_picks_given_fields(self):
+        assert validate_task_fields({"description": "d", "user": "x"}) == ({"description": "d"}, None)
+
+    @pytest.mark.parametrize(
+        "data, error",
+        [({"title": ""}, "Title is required"), ({"title": "x" * 101}, "at most 100"), ({"status": "Done"}, "Invalid status")],
+    )
+    def test_errors(self, data, error):
+        fields, message = validate_task_fields(data)
+
+        assert fields is None
+        assert error in message
+
+
+@patch("app.task_store.record_status_change")
+class TestUpdateTaskFields:
+    def test_single_owner_scoped_find_one_and_update(self, record):
+        user_id, task_id = ObjectId(), ObjectId()
+        before = {"_id": task_id, "title": "Old", "status": "To Do", "created_at": datetime(2025, 1, 1)}
+        collection = MagicMock()
+        collection.find_one_and_update.return_value = before
+
+        with patch("app.models.Task._get_collection", return_value=collection):
+            doc = update_task_fields(user_id, str(task_id), {"status": "Completed"})
+
+        collection.find_one_and_update.assert_called_once()
+        (query, update), kwargs = collection.find_one_and_update.call_args
+        assert query == {"_id": task_id, "user": user_id}
+        assert set(update["$set"]) == {"status", "updated_at"}
+        assert kwargs["return_document"] == ReturnDocument.BEFORE
+        assert doc["status"] == "Completed"
+        assert doc["title"] == "Old"
+        assert doc["updated_at"] == update["$set"]["updated_at"]
+        record.assert_called_once_with(user_id, "To Do", "Completed")
+
+    def test_missing_task(self, record):
+        collection = MagicMock()
+        collection.find_one_and_update.return_value = None
+
+        with patch("app.models.Task._get_collection", return_value=collection):
+            assert update_task_fields(ObjectId(), ObjectId(), {"title": "x"}) is None
+
+        record.assert_not_called()
+
+    def test_invalid_id_skips_query(self, record):
+        with patch("app.models.Task._get_collection") as collection:
+            assert update_task_fields(ObjectId(), "not-an-id", {"title": "x"}) is None
+            assert find_task(ObjectId(), "not-an-id") is None
+
+        collection.assert_not_called()
+
+
+@patch("app.task_store.record_deleted")
+class TestDeleteTaskDoc:
+    def test_single_owner_scoped_find_one_and_delete(self, record):
+        user_id, task_id = ObjectId(), ObjectId()
+        collection = MagicMock()
+        collection.find_one_and_delete.return_value = {"_id": task_id, "status": "Completed"}
+
+        with patch("app.models.Task._get_collection", return_value=collection):
+            assert delete_task_doc(user_id, str(task_id))["_id"] == task_id
+
+        (query,), _ = collection.find_one_and_delete.call_args
+        assert query == {"_id": task_id, "user": user_id}
+        record.assert_called_once_with(user_id, "Completed")
+
+    def test_missing_task(self, record):
+        collection = MagicMock()
+        collection.find_one_and_delete.return_value = None
+
+        with patch("app.models.Task._get_collection", return_value=collection):
+            assert delete_task_doc(ObjectId(), ObjectId()) is None
+
+        record.assert_not_called()
+
+
+@patch("app.task_store.record_deleted")
+class TestSwaggerDelete:
+    @pytest.fixture
+    def client(self):
+        from app import create_app
+        from app.user_cache import CachedUser
+
+        app = create_app()
+        app.config["TESTING"] = True
+        with patch("app.api_keys.authenticate_api_key", return_value=CachedUser(ObjectId(), "alice", "a@example.com")):
+            yield app.test_client()
+
+    def test_second_delete_is_not_found_and_not_counted(self, record, client):
+        task_id = ObjectId()
+        collection = MagicMock()
+        collection.find_one_and_delete.side_effect = [{"_id": task_id, "status": "To Do"}, None]
+
+        with patch("app.models.Task._get_collection", return_value=collection):
+            first = client.delete(f"/tasks/{task_id}", headers={"X-API-KEY": "tf_test"})
+            second = client.delete(f"/tasks/{task_id}", headers={"X-API-KEY": "tf_test"})
+
+        assert (first.status_code, second.status_code) == (200, 404)
+        record.assert_called_once()
+
+    def test_invalid_id_is_not_found(self, record, client):
+        assert client.delete("/tasks/not-an-id", headers={"X-API-KEY": "tf_test"}).status_code == 404
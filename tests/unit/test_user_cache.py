@@ -0,0 +1,94 @@
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from mongoengine import signals
+from app.lru_cache import TTLCache
+from app.models import User
+from app.user_cache import CachedUser, load_user, user_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.evictions == 1
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_stats(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+
+        stats = cache.stats()
+
+        assert (stats["hits"], stats["misses"], stats["size"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+    def test_zero_size_disables(self):
+        cache = TTLCache(maxsize=0, ttl=10)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+
+
+class TestLoadUser:
+    def setup_method(self):
+        user_cache.clear()
+
+    def test_loads_once_then_serves_from_cache(self):
+        user_id = ObjectId()
+        collection = MagicMock()
+        collection.find_one.return_value = {"_id": user_id, "username": "alice", "email": "a@example.com"}
+
+        with patch.object(User, "_get_collection", return_value=collection):
+            first = load_user(str(user_id))
+            second = load_user(str(user_id))
+
+        collection.find_one.assert_called_once_with({"_id": user_id}, {"username": 1, "email": 1})
+        assert isinstance(first, CachedUser)
+        assert second is first
+        assert (first.id, first.username, first.get_id()) == (user_id, "alice", str(user_id))
+
+    def test_missing_user_is_not_cached(self):
+        collection = MagicMock()
+        collection.find_one.return_value = None
+
+        with patch.object(User, "_get_collection", return_value=collection):
+            assert load_user(str(ObjectId())) is None
+
+        assert len(user_cache) == 0
+
+    def test_invalid_id(self):
+        assert load_user("not-an-id") is None
+
+    def test_user_save_and_delete_signals_invalidate(self):
+        user = User(id=ObjectId(), username="alice", email="a@example.com")
+
+        for signal in (signals.post_save, signals.post_delete):
+            user_cache.set(user.id, CachedUser(user.id, "alice", "a@example.com"))
+            signal.send(User, document=user)
+
+            assert user_cache.get(user.id) is None